@@ -1,6 +1,6 @@
 from flask import Flask, jsonify
 from config import Config
-from app.extensions import db, cors, jwt
+from app.extensions import db, cors, jwt, configure_sqlite
 import uuid
 
 def seed_landmarks():
@@ -89,6 +89,7 @@ def create_app(config_class=Config):
     from app.routes.scan import scan_bp
     from app.routes.prediction import prediction_bp
     from app.routes.landmarks import landmarks_bp
+    from app.routes.catalog import catalog_bp
     
     print("Registering blueprints...")
     app.register_blueprint(auth_bp, url_prefix='/api/auth')
@@ -96,6 +97,7 @@ def create_app(config_class=Config):
     app.register_blueprint(scan_bp, url_prefix='/api/scans')
     app.register_blueprint(prediction_bp, url_prefix='/api')
     app.register_blueprint(landmarks_bp, url_prefix='/api')
+    app.register_blueprint(catalog_bp, url_prefix='/api')
     print("Blueprints registered successfully!")
     
     # Debug: Print all registered routes
@@ -119,13 +121,37 @@ def create_app(config_class=Config):
     
     # Create database tables
     with app.app_context():
+        configure_sqlite(app)
+        
+        # Key storage must be settled before any statement using the models is compiled
+        from app.models.types import configure_uuid_keys
+        key_storage = configure_uuid_keys(db.engine, app.config['UUID_KEY_STORAGE'])
+        if key_storage != app.config['UUID_KEY_STORAGE']:
+            print(f"WARNING: this database stores UUID keys as {key_storage}; "
+                  f"run scripts/migrate_uuid_keys.py --to {app.config['UUID_KEY_STORAGE']} to convert it")
+        
         # Import models after db is initialized with app
         from app.models.user import User
         from app.models.scan import Scan
         from app.models.token import BlacklistedToken
         from app.models.landmark import Landmark, Bookmark, Review, Booking
+        from app.models.catalog_snapshot import CatalogSnapshot
+        from app.models.gardner_sign import GardnerSign
+        from app.models.scan_stats import ScanDailyStat, ScanClassStat, refresh_scan_stats
+        from app.models.maintenance_run import MaintenanceRun
         db.create_all()
         
+        # Bring databases created by older versions up to the current models
+        from app.utils.schema import upgrade_schema
+        added_columns = upgrade_schema(db)
+        if ('landmarks', 'review_count') in added_columns or ('landmarks', 'average_rating') in added_columns:
+            Landmark.refresh_review_stats()
+        if ('users', 'scan_count') in added_columns:
+            refresh_scan_stats()
+        
+        from app.services.scan_search import install_scan_search
+        install_scan_search(db)
+        
         # Seed initial landmark data if not exists
         if Landmark.query.count() == 0:
             seed_landmarks()
@@ -135,4 +161,13 @@ def create_app(config_class=Config):
         os.makedirs(os.path.join(app.config['UPLOAD_FOLDER'], 'avatars'), exist_ok=True)
         os.makedirs(os.path.join(app.config['UPLOAD_FOLDER'], 'scans'), exist_ok=True)
     
+    from app.services.inference import init_request_clock
+    init_request_clock(app)
+    
+    from app.utils.query_stats import init_query_stats
+    init_query_stats(app)
+    
+    from app.services.maintenance import init_maintenance
+    init_maintenance(app)
+    
     return app
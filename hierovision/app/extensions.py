@@ -2,11 +2,115 @@
 Extensions module.
 Each extension is initialized in the app factory located in app/__init__.py
 """
+from flask import current_app, has_app_context
 from flask_sqlalchemy import SQLAlchemy
+from flask_sqlalchemy.session import Session
 from flask_cors import CORS
 from flask_jwt_extended import JWTManager
+from sqlalchemy import create_engine, event
+from sqlalchemy.sql.dml import UpdateBase
+from sqlalchemy.sql.elements import TextClause
+
+
+class RoutingSession(Session):
+    """
+    Session that reads through a read-only SQLite engine until it writes.
+
+    When the SQLite profile is on, SELECTs go to a pool of query-only
+    connections, which in WAL mode never wait for a writer. The first flush or
+    INSERT/UPDATE/DELETE moves the session to the primary engine for the rest
+    of the transaction, so a request always reads its own writes.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        engine = super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+        reader = current_app.extensions.get('sqlite_read_engine') if has_app_context() else None
+        if bind is not None or reader is None or engine is not self._db.engine:
+            return engine
+
+        if self._flushing or self.info.get('writing') or _is_write(clause):
+            self.info['writing'] = True
+            return engine
+        return reader
+
+
+@event.listens_for(RoutingSession, 'after_transaction_end')
+def _end_writing(session, transaction):
+    if transaction.parent is None:
+        session.info.pop('writing', None)
+
+
+def _is_write(clause):
+    if isinstance(clause, UpdateBase):
+        return True
+    if isinstance(clause, TextClause):
+        return not clause.text.lstrip().upper().startswith(('SELECT', 'WITH'))
+    return False
+
+
+def configure_sqlite(app):
+    """
+    Apply the SQLITE_PROFILE to a file-backed SQLite database.
+
+    'tuned' switches the database to WAL with synchronous=NORMAL and
+    incremental auto-vacuum, sets the busy timeout, page cache and mmap size
+    on every connection and, unless SQLITE_READ_POOL_SIZE is 0, opens a
+    separate pool of query-only connections for reads and starts transactions
+    on the primary engine with BEGIN IMMEDIATE, so concurrent writers queue on
+    the busy timeout instead of failing with "database is locked". 'default'
+    leaves SQLite as is.
+    Must run inside an app context, after db.init_app(app).
+    """
+    engine = db.engine
+    if (engine.dialect.name != 'sqlite' or app.config['SQLITE_PROFILE'] != 'tuned'
+            or engine.url.database in (None, '', ':memory:')):
+        return
+
+    pragmas = [
+        f"PRAGMA busy_timeout = {app.config['SQLITE_BUSY_TIMEOUT_MS']}",
+        f"PRAGMA cache_size = -{app.config['SQLITE_CACHE_SIZE_MB'] * 1024}",
+        f"PRAGMA mmap_size = {app.config['SQLITE_MMAP_SIZE_MB'] * 1024 * 1024}",
+        "PRAGMA synchronous = NORMAL",
+    ]
+
+    def connect_writer(dbapi_connection, connection_record):
+        if app.config['SQLITE_READ_POOL_SIZE'] > 0:
+            # Let the begin event below open transactions instead of pysqlite
+            dbapi_connection.isolation_level = None
+        cursor = dbapi_connection.cursor()
+        # Takes effect on a new database; existing ones switch on the maintenance vacuum's next full VACUUM
+        cursor.execute('PRAGMA auto_vacuum = INCREMENTAL')
+        cursor.execute('PRAGMA journal_mode = WAL')
+        for pragma in pragmas:
+            cursor.execute(pragma)
+        cursor.close()
+
+    def begin_writer(conn):
+        conn.exec_driver_sql('BEGIN IMMEDIATE')
+
+    def connect_reader(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for pragma in pragmas + ['PRAGMA query_only = ON']:
+            cursor.execute(pragma)
+        cursor.close()
+
+    event.listen(engine, 'connect', connect_writer)
+    engine.dispose()
+
+    # Without a read pool every read would take the write lock, so transactions stay deferred
+    if app.config['SQLITE_READ_POOL_SIZE'] > 0:
+        event.listen(engine, 'begin', begin_writer)
+        reader = create_engine(
+            engine.url,
+            pool_size=app.config['SQLITE_READ_POOL_SIZE'],
+            max_overflow=app.config['SQLITE_READ_POOL_SIZE'],
+            pool_timeout=app.config['SQLALCHEMY_ENGINE_OPTIONS'].get('pool_timeout', 30)
+        )
+        event.listen(reader, 'connect', connect_reader)
+        app.extensions['sqlite_read_engine'] = reader
+
 
 # Create extensions objects
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 cors = CORS()
 jwt = JWTManager()
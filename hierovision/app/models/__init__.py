@@ -2,3 +2,4 @@
 from app.models.user import User
 from app.models.scan import Scan
 from app.models.token import BlacklistedToken
+from app.models.scan_stats import ScanDailyStat, ScanClassStat
@@ -0,0 +1,15 @@
+from datetime import datetime
+from app.extensions import db
+
+
+class CatalogSnapshot(db.Model):
+    """A published version of the offline catalog, kept so clients can be sent deltas from it."""
+
+    __tablename__ = 'catalog_snapshots'
+
+    version = db.Column(db.String(16), primary_key=True)  # Content hash of the document
+    content = db.Column(db.Text, nullable=False)  # Canonical JSON document
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+
+    def __repr__(self):
+        return f'<CatalogSnapshot {self.version}>'
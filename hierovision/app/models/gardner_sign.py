@@ -0,0 +1,19 @@
+from app.extensions import db
+
+
+class GardnerSign(db.Model):
+    """
+    Database copy of the Gardner sign catalog (app/data/gardner_signs.json).
+
+    Lets SQL, such as the scan search index, resolve a scan's predicted class
+    to its Gardner code. Kept in sync with the catalog at startup.
+    """
+
+    __tablename__ = 'gardner_signs'
+
+    class_index = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    code = db.Column(db.String(16), nullable=False)
+    description = db.Column(db.Text, nullable=False)
+
+    def __repr__(self):
+        return f'<GardnerSign {self.code}>'
@@ -1,10 +1,11 @@
 from app.extensions import db
+from app.models.types import UUIDKey
 from datetime import datetime
 
 class Landmark(db.Model):
     __tablename__ = 'landmarks'
     
-    id = db.Column(db.String(36), primary_key=True)
+    id = db.Column(UUIDKey, primary_key=True)
     name = db.Column(db.String(200), nullable=False)
     location = db.Column(db.String(100), nullable=False)
     type = db.Column(db.String(50), nullable=False)
@@ -13,6 +14,11 @@ class Landmark(db.Model):
     hieroglyph_name = db.Column(db.String(100), nullable=False)
     price = db.Column(db.Float, nullable=False, default=0.0)
     tours = db.Column(db.JSON, nullable=True)  # Store as JSON array
+    review_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    rating_sum = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    average_rating = db.Column(db.Float, nullable=False, default=0.0, server_default='0')
+    # Bumped with every change to the review aggregates, for data_version()
+    stats_version = db.Column(db.Integer, nullable=False, default=0, server_default='0')
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
@@ -21,6 +27,92 @@ class Landmark(db.Model):
     reviews = db.relationship('Review', backref='landmark', lazy=True, cascade='all, delete-orphan')
     bookings = db.relationship('Booking', backref='landmark', lazy=True)
     
+    # Filters and facet counts of the landmark listing, and one index per sort
+    # key ending in id, so every cursor page is a range read
+    __table_args__ = (
+        db.Index('ix_landmarks_location', 'location'),
+        db.Index('ix_landmarks_type', 'type'),
+        db.Index('ix_landmarks_name', 'name', 'id'),
+        db.Index('ix_landmarks_price', 'price', 'id'),
+        db.Index('ix_landmarks_rating', 'average_rating', 'id'),
+        db.Index('ix_landmarks_reviews', 'review_count', 'id'),
+    )
+    
+    @classmethod
+    def _average_of(cls, count, total):
+        """SQL expression for the average rating given review count and rating sum expressions."""
+        return db.case((count > 0, total * 1.0 / count), else_=0.0)
+    
+    @classmethod
+    def data_version(cls):
+        """
+        Marker that changes whenever a landmark or its review statistics change.
+        
+        Read from the landmark rows alone, so the reviews table is never
+        scanned. Sums of review counts and ratings can come back to the same
+        values after changes on two landmarks, so every aggregate change also
+        bumps the landmark's stats_version, whose sum only grows.
+        """
+        landmark_count, landmarks_updated, stats_version = db.session.query(
+            db.func.count(cls.id), db.func.max(cls.updated_at), db.func.sum(cls.stats_version)
+        ).one()
+        return f"{landmark_count}:{landmarks_updated}:{stats_version}"
+    
+    @classmethod
+    def adjust_review_stats(cls, landmark_id, count_delta, rating_delta):
+        """
+        Apply a review change to the landmark's aggregates in the current transaction.
+        
+        The increment happens in SQL, so concurrent reviews never overwrite each
+        other's counts. updated_at is left alone: a review is not a change to
+        the landmark itself.
+        """
+        count, total = cls.review_count + count_delta, cls.rating_sum + rating_delta
+        cls.query.filter_by(id=landmark_id).update({
+            cls.review_count: count,
+            cls.rating_sum: total,
+            cls.average_rating: cls._average_of(count, total),
+            cls.stats_version: cls.stats_version + 1,
+            cls.updated_at: cls.updated_at
+        }, synchronize_session=False)
+    
+    @classmethod
+    def refresh_review_stats(cls):
+        """
+        Recompute review_count and rating_sum from the reviews table, and
+        average_rating from them.
+        
+        Returns:
+            list: (landmark id, stored (count, sum), actual (count, sum)) for every landmark that was wrong
+        """
+        actual = dict(
+            (landmark_id, (count, total)) for landmark_id, count, total in db.session.query(
+                Review.landmark_id, db.func.count(Review.id), db.func.sum(Review.rating)
+            ).group_by(Review.landmark_id)
+        )
+        
+        drift = []
+        for landmark_id, count, total in db.session.query(cls.id, cls.review_count, cls.rating_sum):
+            expected = actual.get(landmark_id, (0, 0))
+            if (count, total) != expected:
+                drift.append((landmark_id, (count, total), expected))
+                cls.query.filter_by(id=landmark_id).update({
+                    cls.review_count: expected[0],
+                    cls.rating_sum: expected[1],
+                    cls.stats_version: cls.stats_version + 1,
+                    cls.updated_at: cls.updated_at
+                }, synchronize_session=False)
+        
+        db.session.query(cls).filter(
+            cls.average_rating != cls._average_of(cls.review_count, cls.rating_sum)
+        ).update({
+            cls.average_rating: cls._average_of(cls.review_count, cls.rating_sum),
+            cls.stats_version: cls.stats_version + 1,
+            cls.updated_at: cls.updated_at
+        }, synchronize_session=False)
+        db.session.commit()
+        return drift
+    
     def to_dict(self, include_stats=True):
         data = {
             'id': self.id,
@@ -37,23 +129,18 @@ class Landmark(db.Model):
         }
         
         if include_stats:
-            # Calculate average rating and review count
-            if self.reviews:
-                ratings = [review.rating for review in self.reviews]
-                data['averageRating'] = sum(ratings) / len(ratings)
-                data['reviewCount'] = len(ratings)
-            else:
-                data['averageRating'] = 0
-                data['reviewCount'] = 0
+            # Aggregates are kept up to date by the review routes
+            data['averageRating'] = self.average_rating
+            data['reviewCount'] = self.review_count
                 
         return data
 
 class Bookmark(db.Model):
     __tablename__ = 'bookmarks'
     
-    id = db.Column(db.String(36), primary_key=True)
-    user_id = db.Column(db.String(36), db.ForeignKey('users.uid'), nullable=False)
-    landmark_id = db.Column(db.String(36), db.ForeignKey('landmarks.id'), nullable=False)
+    id = db.Column(UUIDKey, primary_key=True)
+    user_id = db.Column(UUIDKey, db.ForeignKey('users.uid'), nullable=False)
+    landmark_id = db.Column(UUIDKey, db.ForeignKey('landmarks.id'), nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
     # Unique constraint to prevent duplicate bookmarks
@@ -70,16 +157,30 @@ class Bookmark(db.Model):
 class Review(db.Model):
     __tablename__ = 'reviews'
     
-    id = db.Column(db.String(36), primary_key=True)
-    user_id = db.Column(db.String(36), db.ForeignKey('users.uid'), nullable=False)
-    landmark_id = db.Column(db.String(36), db.ForeignKey('landmarks.id'), nullable=False)
+    id = db.Column(UUIDKey, primary_key=True)
+    user_id = db.Column(UUIDKey, db.ForeignKey('users.uid'), nullable=False)
+    landmark_id = db.Column(UUIDKey, db.ForeignKey('landmarks.id'), nullable=False)
     rating = db.Column(db.Integer, nullable=False)  # 1-5 stars
     comment = db.Column(db.Text, nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
-    # Unique constraint to allow only one review per user per landmark
-    __table_args__ = (db.UniqueConstraint('user_id', 'landmark_id', name='unique_user_landmark_review'),)
+    # Unique constraint to allow only one review per user per landmark;
+    # the index serves the newest-first, cursor-paginated review listing
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'landmark_id', name='unique_user_landmark_review'),
+        db.Index('ix_reviews_landmark_created', 'landmark_id', 'created_at', 'id'),
+    )
+    
+    @classmethod
+    def rating_histogram(cls, landmark_id):
+        """Count a landmark's reviews per star rating, computed in SQL."""
+        counts = dict(
+            db.session.query(cls.rating, db.func.count(cls.id))
+            .filter(cls.landmark_id == landmark_id)
+            .group_by(cls.rating)
+        )
+        return {str(stars): counts.get(stars, 0) for stars in range(1, 6)}
     
     def to_dict(self):
         return {
@@ -96,9 +197,9 @@ class Review(db.Model):
 class Booking(db.Model):
     __tablename__ = 'bookings'
     
-    id = db.Column(db.String(36), primary_key=True)
-    user_id = db.Column(db.String(36), db.ForeignKey('users.uid'), nullable=False)
-    landmark_id = db.Column(db.String(36), db.ForeignKey('landmarks.id'), nullable=False)
+    id = db.Column(UUIDKey, primary_key=True)
+    user_id = db.Column(UUIDKey, db.ForeignKey('users.uid'), nullable=False)
+    landmark_id = db.Column(UUIDKey, db.ForeignKey('landmarks.id'), nullable=False)
     date = db.Column(db.DateTime, nullable=False)
     visitors = db.Column(db.Integer, nullable=False, default=1)
     tour_type = db.Column(db.String(100), nullable=False)
@@ -110,6 +211,9 @@ class Booking(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    # Serves the newest-first listing of a user's bookings
+    __table_args__ = (db.Index('ix_bookings_user_created', 'user_id', 'created_at'),)
+    
     def to_dict(self):
         return {
             'id': self.id,
@@ -0,0 +1,32 @@
+from app.extensions import db
+
+
+class MaintenanceRun(db.Model):
+    """One run of a database maintenance task (see app/services/maintenance.py)."""
+
+    __tablename__ = 'maintenance_runs'
+
+    id = db.Column(db.Integer, primary_key=True)
+    task = db.Column(db.String(32), nullable=False)
+    trigger = db.Column(db.String(16), nullable=False)  # 'scheduler' or 'cli'
+    status = db.Column(db.String(16), nullable=False)  # running, ok, timeout, interrupted, failed, skipped, deferred
+    started_at = db.Column(db.DateTime, nullable=False)
+    finished_at = db.Column(db.DateTime)
+    duration_ms = db.Column(db.Integer)
+    detail = db.Column(db.Text)
+
+    __table_args__ = (db.Index('ix_maintenance_runs_task_started', 'task', 'started_at'),)
+
+    def to_dict(self):
+        return {
+            'task': self.task,
+            'trigger': self.trigger,
+            'status': self.status,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None,
+            'duration_ms': self.duration_ms,
+            'detail': self.detail
+        }
+
+    def __repr__(self):
+        return f'<MaintenanceRun {self.task} {self.status}>'
@@ -1,6 +1,7 @@
 from datetime import datetime
 import uuid
 from app.extensions import db
+from app.models.types import UUIDKey
 
 
 class Scan(db.Model):
@@ -8,14 +9,17 @@ class Scan(db.Model):
     
     __tablename__ = 'scans'
     
-    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    user_uid = db.Column(db.String(36), db.ForeignKey('users.uid'), nullable=False)
+    id = db.Column(UUIDKey, primary_key=True, default=lambda: str(uuid.uuid4()))
+    user_uid = db.Column(UUIDKey, db.ForeignKey('users.uid'), nullable=False)
     image_url = db.Column(db.String(255), nullable=False)
     description = db.Column(db.Text, nullable=False)
     predicted_class = db.Column(db.Integer)
     confidence_score = db.Column(db.Float)
     timestamp = db.Column(db.DateTime, default=datetime.utcnow, index=True)
     
+    # Serves a user's scan history newest first, page by page
+    __table_args__ = (db.Index('ix_scans_user_timestamp', 'user_uid', 'timestamp', 'id'),)
+    
     def __repr__(self):
         return f'<Scan {self.id}>'
     
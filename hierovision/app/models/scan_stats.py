@@ -0,0 +1,136 @@
+from app.extensions import db
+from app.models.scan import Scan
+from app.models.types import UUIDKey
+from app.models.user import User
+from sqlalchemy import event, inspect
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+
+class ScanDailyStat(db.Model):
+    """Number of scans a user made on one (UTC) day."""
+
+    __tablename__ = 'scan_daily_stats'
+
+    user_uid = db.Column(UUIDKey, db.ForeignKey('users.uid', ondelete='CASCADE'), primary_key=True)
+    day = db.Column(db.Date, primary_key=True)
+    scan_count = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f'<ScanDailyStat {self.user_uid} {self.day}: {self.scan_count}>'
+
+
+class ScanClassStat(db.Model):
+    """Number of a user's scans predicted as one Gardner class."""
+
+    __tablename__ = 'scan_class_stats'
+
+    user_uid = db.Column(UUIDKey, db.ForeignKey('users.uid', ondelete='CASCADE'), primary_key=True)
+    class_index = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    scan_count = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f'<ScanClassStat {self.user_uid} {self.class_index}: {self.scan_count}>'
+
+
+def _increment(connection, table, keys, delta):
+    """Add delta to the scan_count of the row with keys, creating it when missing; drop rows that reach zero."""
+    dialect = connection.dialect.name
+    if dialect in ('sqlite', 'postgresql'):
+        insert = (sqlite_insert if dialect == 'sqlite' else postgresql_insert)(table).values(**keys, scan_count=delta)
+        connection.execute(insert.on_conflict_do_update(
+            index_elements=list(keys), set_={'scan_count': table.c.scan_count + insert.excluded.scan_count}
+        ))
+    else:
+        match = [table.c[key] == value for key, value in keys.items()]
+        result = connection.execute(table.update().where(*match).values(scan_count=table.c.scan_count + delta))
+        if result.rowcount == 0:
+            connection.execute(table.insert().values(**keys, scan_count=delta))
+
+    if delta < 0:
+        connection.execute(table.delete().where(
+            *[table.c[key] == value for key, value in keys.items()], table.c.scan_count <= 0
+        ))
+
+
+def record_scan(connection, user_uid, timestamp, class_index, delta):
+    """
+    Apply one scan being added (delta=1) or removed (delta=-1) to its owner's statistics.
+
+    Runs on the flush's connection, so the counters commit or roll back with the scan.
+    """
+    users = User.__table__
+    connection.execute(
+        users.update().where(users.c.uid == user_uid)
+        .values(scan_count=users.c.scan_count + delta, updated_at=users.c.updated_at)
+    )
+    if timestamp is not None:
+        _increment(connection, ScanDailyStat.__table__, {'user_uid': user_uid, 'day': timestamp.date()}, delta)
+    if class_index is not None:
+        _increment(connection, ScanClassStat.__table__, {'user_uid': user_uid, 'class_index': class_index}, delta)
+
+
+@event.listens_for(Scan, 'after_insert')
+def _scan_inserted(mapper, connection, scan):
+    record_scan(connection, scan.user_uid, scan.timestamp, scan.predicted_class, 1)
+
+
+@event.listens_for(Scan, 'after_delete')
+def _scan_deleted(mapper, connection, scan):
+    record_scan(connection, scan.user_uid, scan.timestamp, scan.predicted_class, -1)
+
+
+@event.listens_for(Scan, 'after_update')
+def _scan_updated(mapper, connection, scan):
+    state = inspect(scan)
+    tracked = ('user_uid', 'timestamp', 'predicted_class')
+    if not any(state.attrs[name].history.has_changes() for name in tracked):
+        return
+
+    before = {}
+    for name in tracked:
+        history = state.attrs[name].history
+        before[name] = history.deleted[0] if history.deleted else getattr(scan, name)
+    record_scan(connection, before['user_uid'], before['timestamp'], before['predicted_class'], -1)
+    record_scan(connection, scan.user_uid, scan.timestamp, scan.predicted_class, 1)
+
+
+def refresh_scan_stats():
+    """
+    Rebuild every user's scan counters and rollup rows from the scans table.
+
+    Returns:
+        list: (user uid, stored count, actual count) for every user whose total was wrong
+    """
+    day = db.func.date(Scan.timestamp)
+    actual = dict(
+        db.session.query(Scan.user_uid, db.func.count(Scan.id)).group_by(Scan.user_uid)
+    )
+    drift = [
+        (uid, stored, actual.get(uid, 0))
+        for uid, stored in db.session.query(User.uid, User.scan_count)
+        if stored != actual.get(uid, 0)
+    ]
+
+    users = User.__table__
+    db.session.execute(users.update().values(
+        scan_count=db.select(db.func.count(Scan.id)).where(Scan.user_uid == users.c.uid).scalar_subquery(),
+        updated_at=users.c.updated_at
+    ))
+
+    ScanDailyStat.query.delete()
+    db.session.execute(ScanDailyStat.__table__.insert().from_select(
+        ['user_uid', 'day', 'scan_count'],
+        db.select(Scan.user_uid, day, db.func.count(Scan.id))
+        .where(Scan.timestamp.isnot(None)).group_by(Scan.user_uid, day)
+    ))
+
+    ScanClassStat.query.delete()
+    db.session.execute(ScanClassStat.__table__.insert().from_select(
+        ['user_uid', 'class_index', 'scan_count'],
+        db.select(Scan.user_uid, Scan.predicted_class, db.func.count(Scan.id))
+        .where(Scan.predicted_class.isnot(None)).group_by(Scan.user_uid, Scan.predicted_class)
+    ))
+
+    db.session.commit()
+    return drift
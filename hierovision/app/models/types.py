@@ -0,0 +1,77 @@
+import uuid
+from sqlalchemy import LargeBinary, String, Uuid, inspect
+from sqlalchemy.dialects.postgresql import UUID as PostgresUUID
+from sqlalchemy.types import TypeDecorator
+
+
+class UUIDKey(TypeDecorator):
+    """
+    UUID key column that is a canonical 36-character string in Python.
+
+    Stored as VARCHAR(36) ('string' storage) or as 16 raw bytes ('binary'
+    storage; the native uuid type on PostgreSQL), which makes every primary
+    key, foreign key and index entry less than half the size. Models, routes
+    and the JSON API see the same strings either way.
+
+    The storage is chosen once per process by configure_uuid_keys(), before
+    any statement is compiled.
+    """
+
+    impl = String(36)
+    cache_ok = True
+
+    storage = 'string'
+
+    def load_dialect_impl(self, dialect):
+        if self.storage == 'binary':
+            if dialect.name == 'postgresql':
+                return dialect.type_descriptor(PostgresUUID(as_uuid=False))
+            return dialect.type_descriptor(LargeBinary(16))
+        return dialect.type_descriptor(String(36))
+
+    def process_bind_param(self, value, dialect):
+        if value is None or self.storage != 'binary' or dialect.name == 'postgresql':
+            return value
+        return uuid_to_bytes(value)
+
+    def process_result_value(self, value, dialect):
+        if isinstance(value, (bytes, memoryview)):
+            return bytes_to_uuid(value)
+        return str(value) if value is not None else None
+
+
+def uuid_to_bytes(value):
+    """16-byte form of a UUID string; strings that are not UUIDs keep their UTF-8 bytes and match nothing."""
+    try:
+        return uuid.UUID(str(value)).bytes
+    except ValueError:
+        return str(value).encode('utf-8')
+
+
+def bytes_to_uuid(value):
+    value = bytes(value)
+    return str(uuid.UUID(bytes=value)) if len(value) == 16 else value.decode('utf-8')
+
+
+def stored_uuid_key_storage(engine):
+    """Storage of the users.uid column in an existing database, or None when there is no users table."""
+    inspector = inspect(engine)
+    if 'users' not in inspector.get_table_names():
+        return None
+    column = next(column for column in inspector.get_columns('users') if column['name'] == 'uid')
+    return 'binary' if isinstance(column['type'], (LargeBinary, Uuid)) else 'string'
+
+
+def configure_uuid_keys(engine, preferred):
+    """
+    Pick the UUID key storage for this process.
+
+    An existing database keeps the storage it was created with, so switching
+    UUID_KEY_STORAGE never misreads old keys; scripts/migrate_uuid_keys.py
+    converts it. New databases use the preferred storage.
+
+    Returns:
+        str: The storage in use
+    """
+    UUIDKey.storage = stored_uuid_key_storage(engine) or preferred
+    return UUIDKey.storage
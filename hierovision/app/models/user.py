@@ -1,6 +1,7 @@
 from datetime import datetime
 import uuid
 from app.extensions import db
+from app.models.types import UUIDKey
 
 
 class User(db.Model):
@@ -8,12 +9,14 @@ class User(db.Model):
     
     __tablename__ = 'users'
     
-    uid = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    uid = db.Column(UUIDKey, primary_key=True, default=lambda: str(uuid.uuid4()))
     full_name = db.Column(db.String(100), nullable=False)
     email = db.Column(db.String(120), unique=True, nullable=False, index=True)
     password_hash = db.Column(db.LargeBinary, nullable=False)
     selected_country = db.Column(db.String(50), default='Egypt')
     avatar_url = db.Column(db.String(255))
+    # Kept up to date by the scan mapper events in app/models/scan_stats.py
+    scan_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
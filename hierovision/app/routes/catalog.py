@@ -0,0 +1,50 @@
+from flask import Blueprint, request, jsonify, current_app
+from app.services.catalog_snapshot import current_snapshot, load_snapshot, diff_documents
+from app.utils.http_cache import cached_json_response
+
+catalog_bp = Blueprint('catalog', __name__)
+
+@catalog_bp.route('/catalog/snapshot', methods=['GET'])
+def get_catalog_snapshot():
+    """Get the sign catalog, categories and landmarks in one versioned bundle"""
+    try:
+        version, document = current_snapshot(current_app.config['CATALOG_SNAPSHOT_RETENTION'])
+        return cached_json_response(
+            ('catalog_snapshot',),
+            version,
+            lambda: {'version': version, **document},
+            max_age=current_app.config['LANDMARKS_CACHE_MAX_AGE']
+        )
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@catalog_bp.route('/catalog/delta', methods=['GET'])
+def get_catalog_delta():
+    """Get the catalog entries that changed since the version a client holds"""
+    try:
+        since = request.args.get('since', '').strip()
+        if not since:
+            return jsonify({'error': 'The since version is required'}), 400
+
+        version, document = current_snapshot(current_app.config['CATALOG_SNAPSHOT_RETENTION'])
+
+        def build():
+            if since == version:
+                return {'version': version, 'since': since, 'changes': {}}
+            previous = load_snapshot(since)
+            return {'version': version, 'since': since, 'changes': diff_documents(previous, document)}
+
+        if since != version and load_snapshot(since) is None:
+            return jsonify({
+                'error': 'Unknown or expired catalog version; download the full snapshot',
+                'version': version
+            }), 410
+
+        return cached_json_response(
+            ('catalog_delta', since),
+            version,
+            build,
+            max_age=current_app.config['LANDMARKS_CACHE_MAX_AGE']
+        )
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
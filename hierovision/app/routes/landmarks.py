@@ -1,45 +1,187 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app.models.landmark import Landmark, Bookmark, Review, Booking
 from app.models.user import User
 from app.extensions import db
+from app.utils.http_cache import cached_json_response
+from app.utils.pagination import keyset_page, InvalidCursor
+from app.utils.query_stats import query_budget
+from sqlalchemy.orm import joinedload
+from werkzeug.exceptions import NotFound
 import uuid
 from datetime import datetime
 
 landmarks_bp = Blueprint('landmarks', __name__)
 
+# Sort keys of the landmark listing; prefix with '-' for descending
+LANDMARK_SORTS = {
+    'name': Landmark.name,
+    'price': Landmark.price,
+    'rating': Landmark.average_rating,
+    'reviews': Landmark.review_count,
+}
+
+def _number_arg(name, low, high=None):
+    """Read an optional numeric query argument, raising ValueError when it is malformed or out of range."""
+    value = request.args.get(name, '').strip()
+    if not value:
+        return None
+    try:
+        number = float(value)
+    except ValueError:
+        raise ValueError(f"{name} must be a number")
+    if not (low <= number <= (high if high is not None else float('inf'))):
+        raise ValueError(f"{name} must be between {low} and {high}" if high is not None else f"{name} must be at least {low}")
+    return number
+
+def _landmark_filters():
+    """
+    Parse the listing's filter and sort arguments.
+    
+    location and type may be repeated to match any of several values.
+    
+    Returns:
+        dict: Normalized arguments, also used as the response cache key
+    
+    Raises:
+        ValueError: An argument is malformed
+    """
+    sort = request.args.get('sort', 'name')
+    if sort.lstrip('-') not in LANDMARK_SORTS:
+        raise ValueError(f"sort must be one of {', '.join(sorted(LANDMARK_SORTS))}, optionally prefixed with '-'")
+    
+    filters = {
+        'location': tuple(sorted({value.strip() for value in request.args.getlist('location') if value.strip()})),
+        'type': tuple(sorted({value.strip() for value in request.args.getlist('type') if value.strip()})),
+        'min_price': _number_arg('min_price', 0),
+        'max_price': _number_arg('max_price', 0),
+        'min_rating': _number_arg('min_rating', 0, 5),
+        'sort': sort,
+        'limit': max(1, min(request.args.get('limit', 20, type=int), 100)),
+        'cursor': request.args.get('cursor') or None
+    }
+    if filters['min_price'] is not None and filters['max_price'] is not None and filters['min_price'] > filters['max_price']:
+        raise ValueError('min_price cannot exceed max_price')
+    return filters
+
+def _filter_conditions(filters, facet=None):
+    """SQL conditions for the filters, leaving out the one on the facet column being counted."""
+    conditions = []
+    if filters['location'] and facet != 'location':
+        conditions.append(Landmark.location.in_(filters['location']))
+    if filters['type'] and facet != 'type':
+        conditions.append(Landmark.type.in_(filters['type']))
+    if filters['min_price'] is not None:
+        conditions.append(Landmark.price >= filters['min_price'])
+    if filters['max_price'] is not None:
+        conditions.append(Landmark.price <= filters['max_price'])
+    if filters['min_rating'] is not None:
+        conditions.append(Landmark.average_rating >= filters['min_rating'])
+    return conditions
+
+def _facet_counts(filters, facet):
+    """
+    Count matching landmarks per value of a facet column.
+    
+    Each facet is counted with every filter except its own, so the chips
+    show how many results choosing another value would give. Selected values
+    are always listed, with 0 when nothing else matches them.
+    """
+    column = getattr(Landmark, facet)
+    counts = dict(
+        db.session.query(column, db.func.count())
+        .filter(*_filter_conditions(filters, facet))
+        .group_by(column)
+    )
+    for value in filters[facet]:
+        counts.setdefault(value, 0)
+    return dict(sorted(counts.items()))
+
 @landmarks_bp.route('/landmarks', methods=['GET'])
+@query_budget(4)
 def get_landmarks():
-    """Get all landmarks with statistics"""
+    """Get one page of landmarks matching the filters, with facet counts"""
     try:
-        landmarks = Landmark.query.all()
-        return jsonify({
-            'landmarks': [landmark.to_dict() for landmark in landmarks],
-            'total': len(landmarks)
-        }), 200
+        try:
+            filters = _landmark_filters()
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        def build():
+            sort = filters['sort']
+            query = Landmark.query.filter(*_filter_conditions(filters))
+            landmarks, next_cursor = keyset_page(
+                query, (LANDMARK_SORTS[sort.lstrip('-')], Landmark.id), filters['limit'], filters['cursor'],
+                descending=sort.startswith('-')
+            )
+            
+            facets = {facet: _facet_counts(filters, facet) for facet in ('location', 'type')}
+            # The location facet applies every other filter, so the matching total falls out of it
+            total = sum(
+                count for location, count in facets['location'].items()
+                if not filters['location'] or location in filters['location']
+            )
+            return {
+                'landmarks': [landmark.to_dict() for landmark in landmarks],
+                'total': total,
+                'next_cursor': next_cursor,
+                'has_more': next_cursor is not None,
+                'facets': facets
+            }
+        
+        return cached_json_response(
+            ('landmarks', tuple(filters.items())), Landmark.data_version(), build,
+            max_age=current_app.config['LANDMARKS_CACHE_MAX_AGE']
+        )
+    except InvalidCursor as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @landmarks_bp.route('/landmarks/<landmark_id>', methods=['GET'])
+@query_budget(3)
 def get_landmark(landmark_id):
     """Get a specific landmark by ID"""
     try:
-        landmark = Landmark.query.get_or_404(landmark_id)
-        return jsonify({'landmark': landmark.to_dict()}), 200
+        return cached_json_response(
+            ('landmark', landmark_id),
+            Landmark.data_version(),
+            lambda: {'landmark': Landmark.query.get_or_404(landmark_id).to_dict()},
+            max_age=current_app.config['LANDMARKS_CACHE_MAX_AGE']
+        )
+    except NotFound:
+        return jsonify({'error': 'Landmark not found'}), 404
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @landmarks_bp.route('/landmarks/<landmark_id>/reviews', methods=['GET'])
+@query_budget(4)
 def get_landmark_reviews(landmark_id):
-    """Get all reviews for a specific landmark"""
+    """Get a landmark's reviews, newest first, one page per cursor"""
     try:
         landmark = Landmark.query.get_or_404(landmark_id)
-        reviews = Review.query.filter_by(landmark_id=landmark_id).order_by(Review.created_at.desc()).all()
+        limit = max(1, min(request.args.get('limit', 20, type=int), 100))
         
-        return jsonify({
+        query = Review.query.filter_by(landmark_id=landmark_id).options(joinedload(Review.user))
+        try:
+            reviews, next_cursor = keyset_page(query, (Review.created_at, Review.id), limit, request.args.get('cursor'))
+        except InvalidCursor as e:
+            return jsonify({'error': str(e)}), 400
+        
+        response = {
             'reviews': [review.to_dict() for review in reviews],
-            'total': len(reviews)
-        }), 200
+            'total': landmark.review_count,
+            'next_cursor': next_cursor,
+            'has_more': next_cursor is not None
+        }
+        
+        if request.args.get('summary', '').lower() in ('1', 'true'):
+            response['summary'] = {
+                'average_rating': landmark.average_rating,
+                'histogram': Review.rating_histogram(landmark_id)
+            }
+        
+        return jsonify(response), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -86,6 +228,7 @@ def add_review(landmark_id):
         )
         
         db.session.add(review)
+        Landmark.adjust_review_stats(landmark_id, 1, rating)
         db.session.commit()
         
         return jsonify({'review': review.to_dict()}), 201
@@ -121,11 +264,19 @@ def update_review(review_id):
         if not comment:
             return jsonify({'error': 'Comment cannot be empty'}), 400
         
-        # Update review
-        review.rating = rating
-        review.comment = comment
-        review.updated_at = datetime.utcnow()
-        
+        # Update review only if it still has the rating read above, so the
+        # aggregate delta is exact even when requests for it race
+        old_rating = review.rating
+        updated = Review.query.filter_by(id=review_id, rating=old_rating).update({
+            Review.rating: rating,
+            Review.comment: comment,
+            Review.updated_at: datetime.utcnow()
+        }, synchronize_session='evaluate')
+        if not updated:
+            db.session.rollback()
+            return jsonify({'error': 'The review was changed by another request, please try again'}), 409
+        
+        Landmark.adjust_review_stats(review.landmark_id, 0, rating - old_rating)
         db.session.commit()
         
         return jsonify({'review': review.to_dict()}), 200
@@ -146,7 +297,13 @@ def delete_review(review_id):
         if review.user_id != current_user_id:
             return jsonify({'error': 'You can only delete your own reviews'}), 403
         
-        db.session.delete(review)
+        # Only the request whose DELETE removed the row adjusts the aggregates
+        deleted = Review.query.filter_by(id=review_id, rating=review.rating).delete(synchronize_session=False)
+        if not deleted:
+            db.session.rollback()
+            return jsonify({'error': 'The review was changed or deleted by another request'}), 409
+        
+        Landmark.adjust_review_stats(review.landmark_id, -1, -review.rating)
         db.session.commit()
         
         return jsonify({'message': 'Review deleted successfully'}), 200
@@ -156,6 +313,7 @@ def delete_review(review_id):
         return jsonify({'error': str(e)}), 500
 
 @landmarks_bp.route('/bookmarks', methods=['GET'])
+@query_budget(2)
 @jwt_required()
 def get_bookmarks():
     """Get user's bookmarks"""
@@ -236,12 +394,16 @@ def remove_bookmark(landmark_id):
         return jsonify({'error': str(e)}), 500
 
 @landmarks_bp.route('/bookings', methods=['GET'])
+@query_budget(2)
 @jwt_required()
 def get_bookings():
     """Get user's bookings"""
     try:
         current_user_id = get_jwt_identity()
-        bookings = Booking.query.filter_by(user_id=current_user_id).order_by(Booking.created_at.desc()).all()
+        bookings = (
+            Booking.query.filter_by(user_id=current_user_id).options(joinedload(Booking.landmark))
+            .order_by(Booking.created_at.desc()).all()
+        )
         
         return jsonify({
             'bookings': [booking.to_dict() for booking in bookings],
@@ -298,6 +460,7 @@ def create_booking():
         return jsonify({'error': str(e)}), 500
 
 @landmarks_bp.route('/bookings/<booking_id>', methods=['GET'])
+@query_budget(3)
 @jwt_required()
 def get_booking(booking_id):
     """Get a specific booking"""
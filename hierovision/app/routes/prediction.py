@@ -1,17 +1,94 @@
-from flask import Blueprint, request, jsonify
-from app.services.ml_service import get_predictor
+from flask import Blueprint, request, jsonify, current_app
+from app.services.gardner import get_sign_catalog
+from app.services.glyph_renderer import get_glyph_renderer, IMAGE_FORMATS
+from app.services.sign_search import get_sign_search_index
+from app.services.inference import get_inference_backend, request_schedule
+from app.services.inference_queue import DeadlineExceeded
+from app.services.translation import get_translation_backend
+from app.services.model_registry import ModelNotFoundError
 from app.utils.auth import optional_token
+from app.utils.file_handler import RAW_IMAGE_CONTENT_TYPE, read_raw_images
+from app.utils.http_cache import cached_json_response
 import logging
 
 prediction_bp = Blueprint('prediction', __name__, url_prefix='/predict')
 logger = logging.getLogger(__name__)
 
 
+def _requested_model():
+    """Get the optional model reference ('name' or 'name:version') from the form or query string."""
+    return request.form.get('model') or request.args.get('model')
+
+
+def _predict_raw_images(user, top_k=None):
+    """
+    Classify a pre-decoded image body (RAW_IMAGE_CONTENT_TYPE).
+    
+    The body holds one or more packed 224x224 RGB images, so it skips image
+    decoding and resizing entirely. Results come back in body order.
+    """
+    try:
+        buffer, count = read_raw_images(
+            request.stream, request.content_length, current_app.config.get('INFERENCE_MAX_RAW_IMAGES', 8)
+        )
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+
+    priority, deadline = request_schedule(user)
+    backend = get_inference_backend()
+    try:
+        if top_k is None:
+            result = backend.predict_raw(
+                buffer, count, model=request.args.get('model'), priority=priority, deadline=deadline
+            )
+        else:
+            result = backend.get_top_predictions_raw(
+                buffer, count, top_k=top_k, model=request.args.get('model'), priority=priority, deadline=deadline
+            )
+    except ModelNotFoundError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    except DeadlineExceeded:
+        return _deadline_exceeded_response()
+
+    if not result['success']:
+        return jsonify({
+            'success': False,
+            'error': result['error']
+        }), 500
+
+    if user:
+        logger.info(f"Raw predictions made by user {user.email}: {count} images")
+    else:
+        logger.info(f"Anonymous raw predictions: {count} images")
+
+    return jsonify({
+        'success': True,
+        'model': result['model'],
+        'results': result['results']
+    }), 200
+
+
+def _deadline_exceeded_response():
+    return jsonify({
+        'success': False,
+        'error': 'Request deadline exceeded'
+    }), 504
+
+
 @prediction_bp.route('/predict', methods=['POST'])
 @optional_token
 def predict_hieroglyph(user):
     """Predict hieroglyph from uploaded image."""
     try:
+        if request.mimetype == RAW_IMAGE_CONTENT_TYPE:
+            return _predict_raw_images(user)
+
         if 'file' not in request.files:
             return jsonify({
                 'success': False,
@@ -26,11 +103,19 @@ def predict_hieroglyph(user):
                 'error': 'No file selected'
             }), 400
 
-        # Get predictor instance
-        predictor = get_predictor()
-        
-        # Make prediction
-        result = predictor.predict(file)
+        # Make prediction with the requested model
+        try:
+            priority, deadline = request_schedule(user)
+            result = get_inference_backend().predict(
+                file, model=_requested_model(), priority=priority, deadline=deadline
+            )
+        except ModelNotFoundError as e:
+            return jsonify({
+                'success': False,
+                'error': str(e)
+            }), 400
+        except DeadlineExceeded:
+            return _deadline_exceeded_response()
         
         if result['success']:
             # Log prediction for analytics (if user is authenticated)
@@ -41,6 +126,7 @@ def predict_hieroglyph(user):
             
             return jsonify({
                 'success': True,
+                'model': result['model'],
                 'predicted_class_index': result['predicted_class_index'],
                 'confidence_score': result['confidence_score'],
                 'description': result['description']
@@ -64,6 +150,9 @@ def predict_hieroglyph(user):
 def predict_top_hieroglyphs(user):
     """Get top N predictions for uploaded image."""
     try:
+        if request.mimetype == RAW_IMAGE_CONTENT_TYPE:
+            return _predict_raw_images(user, top_k=max(1, min(request.args.get('top_k', 5, type=int), 10)))
+
         if 'file' not in request.files:
             return jsonify({
                 'success': False,
@@ -71,7 +160,7 @@ def predict_top_hieroglyphs(user):
             }), 400
 
         file = request.files['file']
-        top_k = min(request.form.get('top_k', 5, type=int), 10)  # Max 10 predictions
+        top_k = max(1, min(request.form.get('top_k', 5, type=int), 10))  # Max 10 predictions
         
         if file.filename == '':
             return jsonify({
@@ -79,11 +168,19 @@ def predict_top_hieroglyphs(user):
                 'error': 'No file selected'
             }), 400
 
-        # Get predictor instance
-        predictor = get_predictor()
-        
-        # Make top predictions
-        result = predictor.get_top_predictions(file, top_k=top_k)
+        # Make top predictions with the requested model
+        try:
+            priority, deadline = request_schedule(user)
+            result = get_inference_backend().get_top_predictions(
+                file, top_k=top_k, model=_requested_model(), priority=priority, deadline=deadline
+            )
+        except ModelNotFoundError as e:
+            return jsonify({
+                'success': False,
+                'error': str(e)
+            }), 400
+        except DeadlineExceeded:
+            return _deadline_exceeded_response()
         
         if result['success']:
             # Log prediction for analytics
@@ -94,6 +191,7 @@ def predict_top_hieroglyphs(user):
             
             return jsonify({
                 'success': True,
+                'model': result['model'],
                 'predictions': result['predictions']
             }), 200
         else:
@@ -110,19 +208,69 @@ def predict_top_hieroglyphs(user):
         }), 500
 
 
+@prediction_bp.route('/models', methods=['GET'])
+def list_models():
+    """List the classification models available for prediction."""
+    try:
+        models = get_inference_backend().list_models()
+        
+        return jsonify({
+            'success': True,
+            'default_model': models['default_model'],
+            'models': models['models']
+        }), 200
+
+    except Exception as e:
+        logger.error(f"List models error: {e}")
+        return jsonify({
+            'success': False,
+            'error': 'Failed to list models'
+        }), 500
+
+
+@prediction_bp.route('/inference/stats', methods=['GET'])
+def get_inference_stats():
+    """Report inference queue depth and wait times per priority class."""
+    try:
+        return jsonify({
+            'success': True,
+            'queue': get_inference_backend().queue_stats()
+        }), 200
+
+    except Exception as e:
+        logger.error(f"Inference stats error: {e}")
+        return jsonify({
+            'success': False,
+            'error': 'Failed to get inference stats'
+        }), 500
+
+
+def _sign_summary(sign):
+    return {
+        'class_index': sign.class_index,
+        'code': sign.code,
+        'description': sign.description,
+        'glyph': sign.glyph
+    }
+
+
 @prediction_bp.route('/info/<int:class_index>', methods=['GET'])
 def get_hieroglyph_info(class_index):
     """Get information about a specific hieroglyph class."""
     try:
-        predictor = get_predictor()
-        
-        if class_index in predictor.gardner_descriptions:
-            description = predictor.gardner_descriptions[class_index]
-            return jsonify({
-                'success': True,
-                'class_index': class_index,
-                'description': description
-            }), 200
+        catalog = get_sign_catalog()
+        sign = catalog.get(class_index)
+        if sign:
+            return cached_json_response(
+                ('info', class_index),
+                catalog.version,
+                lambda: {
+                    'success': True,
+                    'class_index': class_index,
+                    'description': sign.to_dict()
+                },
+                max_age=current_app.config['CATALOG_CACHE_MAX_AGE']
+            )
         else:
             return jsonify({
                 'success': False,
@@ -137,43 +285,81 @@ def get_hieroglyph_info(class_index):
         }), 500
 
 
+@prediction_bp.route('/info/<code>', methods=['GET'])
+def get_hieroglyph_info_by_code(code):
+    """Get information about a hieroglyph by its Gardner code (e.g. A1)."""
+    try:
+        catalog = get_sign_catalog()
+        sign = catalog.by_code(code)
+        if sign:
+            return cached_json_response(
+                ('info', sign.class_index),
+                catalog.version,
+                lambda: {
+                    'success': True,
+                    'class_index': sign.class_index,
+                    'description': sign.to_dict()
+                },
+                max_age=current_app.config['CATALOG_CACHE_MAX_AGE']
+            )
+        else:
+            return jsonify({
+                'success': False,
+                'error': 'Hieroglyph code not found'
+            }), 404
+
+    except Exception as e:
+        logger.error(f"Get hieroglyph info error: {e}")
+        return jsonify({
+            'success': False,
+            'error': 'Failed to get hieroglyph information'
+        }), 500
+
+
 @prediction_bp.route('/classes', methods=['GET'])
 def get_all_classes():
-    """Get information about all hieroglyph classes."""
+    """Get information about all hieroglyph classes, optionally within one Gardner category."""
     try:
-        predictor = get_predictor()
+        catalog = get_sign_catalog()
         
         # Get pagination parameters
         page = request.args.get('page', 1, type=int)
         per_page = min(request.args.get('per_page', 50, type=int), 100)
+        category = request.args.get('category')
         
-        # Calculate pagination
-        total_classes = len(predictor.gardner_descriptions)
-        start_idx = (page - 1) * per_page
-        end_idx = start_idx + per_page
-        
-        # Get subset of classes
-        all_classes = []
-        for class_idx in sorted(predictor.gardner_descriptions.keys())[start_idx:end_idx]:
-            description = predictor.gardner_descriptions[class_idx]
-            all_classes.append({
-                'class_index': class_idx,
-                'code': description['code'],
-                'description': description['description']
-            })
+        if category and category not in catalog.categories:
+            return jsonify({
+                'success': False,
+                'error': 'Unknown Gardner category'
+            }), 400
         
-        return jsonify({
-            'success': True,
-            'classes': all_classes,
-            'pagination': {
-                'page': page,
-                'per_page': per_page,
-                'total': total_classes,
-                'pages': (total_classes + per_page - 1) // per_page,
-                'has_next': end_idx < total_classes,
-                'has_prev': page > 1
+        def build():
+            signs = catalog.category(category) if category else catalog.signs
+            
+            # Calculate pagination
+            total_classes = len(signs)
+            start_idx = (page - 1) * per_page
+            end_idx = start_idx + per_page
+            
+            return {
+                'success': True,
+                'classes': [_sign_summary(sign) for sign in signs[start_idx:end_idx]],
+                'pagination': {
+                    'page': page,
+                    'per_page': per_page,
+                    'total': total_classes,
+                    'pages': (total_classes + per_page - 1) // per_page,
+                    'has_next': end_idx < total_classes,
+                    'has_prev': page > 1
+                }
             }
-        }), 200
+        
+        return cached_json_response(
+            ('classes', page, per_page, category),
+            catalog.version,
+            build,
+            max_age=current_app.config['CATALOG_CACHE_MAX_AGE']
+        )
 
     except Exception as e:
         logger.error(f"Get all classes error: {e}")
@@ -183,11 +369,37 @@ def get_all_classes():
         }), 500
 
 
+@prediction_bp.route('/categories', methods=['GET'])
+def get_categories():
+    """Get the Gardner categories with their sign counts."""
+    try:
+        catalog = get_sign_catalog()
+        return cached_json_response(
+            ('categories',),
+            catalog.version,
+            lambda: {
+                'success': True,
+                'categories': [
+                    {'category': category, 'name': name, 'count': count}
+                    for category, name, count in catalog.category_counts()
+                ]
+            },
+            max_age=current_app.config['CATALOG_CACHE_MAX_AGE']
+        )
+
+    except Exception as e:
+        logger.error(f"Get categories error: {e}")
+        return jsonify({
+            'success': False,
+            'error': 'Failed to get hieroglyph categories'
+        }), 500
+
+
 @prediction_bp.route('/search', methods=['GET'])
 def search_hieroglyphs():
-    """Search hieroglyphs by code or description."""
+    """Search hieroglyphs by code or description, best matches first."""
     try:
-        query = request.args.get('q', '').strip().lower()
+        query = request.args.get('q', '').strip()
         
         if not query:
             return jsonify({
@@ -195,24 +407,11 @@ def search_hieroglyphs():
                 'error': 'Search query is required'
             }), 400
         
-        predictor = get_predictor()
-        
-        # Search through descriptions
-        matching_classes = []
-        for class_idx, description in predictor.gardner_descriptions.items():
-            code = description['code'].lower()
-            desc_text = description['description'].lower()
-            
-            if query in code or query in desc_text:
-                matching_classes.append({
-                    'class_index': class_idx,
-                    'code': description['code'],
-                    'description': description['description']
-                })
-        
-        # Limit results
         max_results = min(request.args.get('limit', 20, type=int), 100)
-        matching_classes = matching_classes[:max_results]
+        matching_classes = [
+            {**_sign_summary(sign), 'score': score}
+            for sign, score in get_sign_search_index().search(query, limit=max_results)
+        ]
         
         return jsonify({
             'success': True,
@@ -229,6 +428,34 @@ def search_hieroglyphs():
         }), 500
 
 
+@prediction_bp.route('/search/suggest', methods=['GET'])
+def suggest_hieroglyphs():
+    """Complete a partly typed Gardner code or description word."""
+    try:
+        query = request.args.get('q', '').strip()
+        
+        if not query:
+            return jsonify({
+                'success': False,
+                'error': 'Search query is required'
+            }), 400
+        
+        max_results = min(request.args.get('limit', 10, type=int), 16)
+        
+        return jsonify({
+            'success': True,
+            'query': query,
+            'suggestions': get_sign_search_index().suggest(query, limit=max_results)
+        }), 200
+
+    except Exception as e:
+        logger.error(f"Suggest hieroglyphs error: {e}")
+        return jsonify({
+            'success': False,
+            'error': 'Suggest failed'
+        }), 500
+
+
 @prediction_bp.route('/translate', methods=['POST'])
 @optional_token
 def translate_hieroglyph(user):
@@ -248,11 +475,19 @@ def translate_hieroglyph(user):
                 'error': 'No file selected'
             }), 400
 
-        # Get predictor instance
-        predictor = get_predictor()
-        
-        # Make prediction
-        result = predictor.predict(file)
+        # Make prediction with the requested model
+        try:
+            priority, deadline = request_schedule(user)
+            result = get_inference_backend().predict(
+                file, model=_requested_model(), priority=priority, deadline=deadline
+            )
+        except ModelNotFoundError as e:
+            return jsonify({
+                'success': False,
+                'error': str(e)
+            }), 400
+        except DeadlineExceeded:
+            return _deadline_exceeded_response()
         
         if result['success']:
             # Format response for translation
@@ -267,6 +502,7 @@ def translate_hieroglyph(user):
             
             return jsonify({
                 'success': True,
+                'model': result['model'],
                 'predicted_class_index': result['predicted_class_index'],
                 'confidence_score': result['confidence_score'],
                 'hieroglyph_code': hieroglyph_code,
@@ -308,60 +544,15 @@ def translate_english_to_hieroglyphs(user):
                 'error': 'Empty text provided'
             }), 400
 
-        # Mock translation based on common words
-        # In a real implementation, this would call an AI service or translation API
-        word_translations = {
-            "pharaoh": "𓂋𓄿𓇯",
-            "king": "𓂋𓄿𓇯",
-            "sun": "𓇳",
-            "god": "𓊹",
-            "life": "𓋹",
-            "water": "𓈖",
-            "bird": "𓅿",
-            "house": "𓉐",
-            "man": "𓊃",
-            "woman": "𓊪",
-            "eye": "𓁹",
-            "hand": "𓂝",
-            "mouth": "𓂋",
-            "bread": "𓏏",
-            "gold": "𓈓",
-            "love": "𓂋𓄿𓇯𓋴",
-            "peace": "𓐍𓏤",
-            "wisdom": "𓄿𓇯𓂋",
-            "river": "𓈗",
-            "temple": "𓉟",
-            "cat": "𓅓",
-            "dog": "𓃛",
-            "fire": "𓊖",
-            "earth": "𓇾",
-            "sky": "𓊪𓏏",
-            "star": "𓇽",
-            "moon": "𓇹",
-            "mountain": "𓈋",
-            "tree": "𓈎",
-            "flower": "𓆸"
-        }
-
-        words = english_text.lower().split()
-        hieroglyphs = []
-        transliteration = []
-        
-        for word in words:
-            if word in word_translations:
-                hieroglyphs.append(word_translations[word])
-                transliteration.append(word)
-            else:
-                # Default hieroglyphs for unknown words
-                hieroglyphs.append("𓊪𓏏𓇯")
-                transliteration.append(word)
-
+        translation = get_translation_backend().translate(english_text)
         result = {
             'success': True,
             'original_text': english_text,
-            'hieroglyphs': ' '.join(hieroglyphs) if hieroglyphs else "𓂋𓄿𓇯𓋴 𓊪𓏏𓇯",
-            'confidence_score': 0.85,
-            'transliteration': ' '.join(transliteration)
+            'hieroglyphs': translation['hieroglyphs'],
+            'confidence_score': translation['confidence_score'],
+            'transliteration': translation['transliteration'],
+            'unknown_words': translation['unknown_words'],
+            'source': translation['source']
         }
 
         # Log translation for analytics (if user is authenticated)
@@ -378,3 +569,154 @@ def translate_english_to_hieroglyphs(user):
             'success': False,
             'error': 'Translation failed'
         }), 500
+
+
+@prediction_bp.route('/translate/english-to-hieroglyphs/batch', methods=['POST'])
+@optional_token
+def translate_english_to_hieroglyphs_batch(user):
+    """Translate many English texts to hieroglyphs in one request."""
+    try:
+        data = request.get_json()
+        
+        if not data or not isinstance(data.get('texts'), list):
+            return jsonify({
+                'success': False,
+                'error': 'A list of texts is required'
+            }), 400
+        
+        texts = data['texts']
+        max_texts = current_app.config.get('TRANSLATION_BATCH_LIMIT', 1000)
+        if len(texts) > max_texts:
+            return jsonify({
+                'success': False,
+                'error': f"At most {max_texts} texts can be translated at once"
+            }), 400
+        
+        if not all(isinstance(text, str) for text in texts):
+            return jsonify({
+                'success': False,
+                'error': 'Every text must be a string'
+            }), 400
+        
+        translations = get_translation_backend().translate_many(texts)
+        results = []
+        for text, translation in zip(texts, translations):
+            results.append({
+                'original_text': text,
+                'hieroglyphs': translation['hieroglyphs'],
+                'confidence_score': translation['confidence_score'],
+                'transliteration': translation['transliteration'],
+                'unknown_words': translation['unknown_words'],
+                'source': translation['source']
+            })
+        
+        if user:
+            logger.info(f"Batch English to hieroglyphs translation by user {user.email}: {len(texts)} texts")
+        else:
+            logger.info(f"Anonymous batch English to hieroglyphs translation: {len(texts)} texts")
+        
+        return jsonify({
+            'success': True,
+            'results': results,
+            'total': len(results)
+        }), 200
+
+    except Exception as e:
+        logger.error(f"Batch English to hieroglyphs translation error: {e}")
+        return jsonify({
+            'success': False,
+            'error': 'Translation failed'
+        }), 500
+
+
+@prediction_bp.route('/render', methods=['GET', 'POST'])
+def render_hieroglyphs():
+    """
+    Render hieroglyph text to a PNG or WebP image for clients without a hieroglyph font.
+    
+    Takes 'text' (hieroglyphs) or 'english' (translated first) from the query
+    string or JSON body, plus optional 'size', 'format', 'color' and 'background'.
+    """
+    try:
+        params = (request.get_json(silent=True) or {}) if request.method == 'POST' else request.args
+        if not isinstance(params, dict) or any(
+            params.get(key) is not None and not isinstance(params[key], str)
+            for key in ('text', 'english', 'format', 'color', 'background')
+        ):
+            return jsonify({
+                'success': False,
+                'error': 'Text, english, format, color and background must be strings'
+            }), 400
+        
+        size = params.get('size')
+        try:
+            if isinstance(size, bool):
+                raise TypeError(size)
+            size = int(size) if size not in (None, '') else None
+        except (TypeError, ValueError):
+            return jsonify({
+                'success': False,
+                'error': 'Size must be an integer'
+            }), 400
+        
+        text = params.get('text')
+        if not text and params.get('english'):
+            text = get_translation_backend().translate(params['english'])['hieroglyphs']
+        
+        if not text:
+            return jsonify({
+                'success': False,
+                'error': 'Text to render is required'
+            }), 400
+        
+        max_chars = current_app.config.get('GLYPH_RENDER_MAX_CHARS', 500)
+        if len(text) > max_chars:
+            return jsonify({
+                'success': False,
+                'error': f"At most {max_chars} characters can be rendered at once"
+            }), 400
+        
+        image_format = params.get('format')
+        if not image_format:
+            image_format = 'webp' if request.accept_mimetypes.best_match(['image/png', 'image/webp']) == 'image/webp' else 'png'
+        
+        try:
+            renderer = get_glyph_renderer()
+        except FileNotFoundError:
+            logger.error(f"Glyph font not found at {current_app.config.get('GLYPH_FONT_PATH')}")
+            return jsonify({
+                'success': False,
+                'error': 'Glyph rendering is not available'
+            }), 503
+        
+        try:
+            body, etag, missing = renderer.render(
+                text,
+                size=size,
+                image_format=image_format,
+                color=params.get('color') or '000000',
+                background=params.get('background')
+            )
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'error': str(e)
+            }), 400
+        
+        headers = {
+            'ETag': f'"{etag}"',
+            'Cache-Control': f"public, max-age={current_app.config['CATALOG_CACHE_MAX_AGE']}",
+            'Vary': 'Accept',
+            'X-Missing-Glyphs': str(missing)
+        }
+        if request.if_none_match.contains_weak(etag):
+            return current_app.response_class(status=304, headers=headers)
+        
+        return current_app.response_class(body, status=200, headers=headers, mimetype=IMAGE_FORMATS[image_format])
+
+    except Exception as e:
+        logger.error(f"Render hieroglyphs error: {e}")
+        return jsonify({
+            'success': False,
+            'error': 'Rendering failed'
+        }), 500
@@ -1,14 +1,124 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app, stream_with_context
+from datetime import datetime
 from app.extensions import db
 from app.models.scan import Scan
 from app.utils.auth import token_required, optional_token
 from app.utils.file_handler import save_uploaded_file, delete_file
-from app.services.ml_service import get_predictor
+from app.utils.pagination import keyset_page, encode_cursor, decode_offset_cursor, InvalidCursor, CountCache
+from app.utils.query_stats import query_budget
+from app.services import scan_search, scan_export
+from app.services.inference import get_inference_backend, request_schedule
 import logging
 
 scan_bp = Blueprint('scan', __name__, url_prefix='/scans')
 logger = logging.getLogger(__name__)
 
+# Search result totals per user, reported by cursor-paginated searches on request
+scan_totals = CountCache(ttl=300)
+
+
+def _search_total(user, key, count):
+    """
+    A search's cached total. users.scan_count is the version, so a save or
+    delete through any worker recounts; edits are invalidated in this worker.
+    """
+    return scan_totals.get(user.uid, key, count, version=user.scan_count)
+
+
+def _cursor_page(scans_query, total):
+    """
+    Fetch one cursor page of a user's scans, newest first.
+    
+    Listings switch to cursor pagination when the request carries a 'cursor'
+    parameter (empty for the first page). total() is only called when
+    include_total is set.
+    
+    Returns:
+        tuple: (scans, pagination dict)
+    
+    Raises:
+        InvalidCursor: The cursor cannot be decoded
+    """
+    per_page = max(1, min(request.args.get('per_page', 20, type=int), 100))
+    scans, next_cursor = keyset_page(
+        scans_query, (Scan.timestamp, Scan.id), per_page, request.args.get('cursor') or None
+    )
+    
+    pagination = {
+        'per_page': per_page,
+        'next_cursor': next_cursor,
+        'has_next': next_cursor is not None
+    }
+    if request.args.get('include_total', '').lower() in ('1', 'true'):
+        pagination['total'] = total()
+    return scans, pagination
+
+
+def _ranked_search(user, query, page, per_page):
+    """
+    Serve scan search results ranked by the full-text index.
+    
+    Supports the same offset (page) and cursor modes as the other listings; the
+    cursor holds the offset, since relevance order has no column to seek on.
+    """
+    per_page = max(1, per_page)
+    cursor_mode = 'cursor' in request.args
+    if cursor_mode:
+        try:
+            offset = decode_offset_cursor(request.args['cursor']) if request.args['cursor'] else 0
+        except InvalidCursor as e:
+            return _invalid_cursor_response(e)
+    else:
+        offset = (max(1, page) - 1) * per_page
+    
+    hits = scan_search.search(db, user.uid, query, per_page + 1, offset)
+    has_next = len(hits) > per_page
+    hits = hits[:per_page]
+    
+    scans = {scan.id: scan for scan in Scan.query.filter(Scan.id.in_([scan_id for scan_id, _, _ in hits]))}
+    scans_list = [
+        {**scans[scan_id].to_dict(), 'score': score, 'snippet': snippet}
+        for scan_id, score, snippet in hits if scan_id in scans
+    ]
+    
+    def count():
+        return scan_search.count(db, user.uid, query)
+    
+    if cursor_mode:
+        pagination = {
+            'per_page': per_page,
+            'next_cursor': encode_cursor([offset + per_page]) if has_next else None,
+            'has_next': has_next
+        }
+        if request.args.get('include_total', '').lower() in ('1', 'true'):
+            pagination['total'] = _search_total(user, ('search', query), count)
+    else:
+        # Offset clients page by this total, so it is counted exactly
+        total_found = count()
+        pages = (total_found + per_page - 1) // per_page
+        pagination = {
+            'page': page,
+            'per_page': per_page,
+            'total': total_found,
+            'pages': pages,
+            'has_next': page < pages,
+            'has_prev': page > 1
+        }
+    
+    return jsonify({
+        'success': True,
+        'scans': scans_list,
+        'query': query,
+        'pagination': pagination
+    }), 200
+
+
+def _invalid_cursor_response(error):
+    return jsonify({
+        'success': False,
+        'message': str(error)
+    }), 400
+
 
 @scan_bp.route('/save', methods=['POST'])
 @token_required
@@ -81,9 +191,9 @@ def save_scan(user):
             confidence_score = None
             
             try:
-                predictor = get_predictor()
                 file.seek(0)  # Reset file pointer
-                prediction_result = predictor.predict(file)
+                priority, deadline = request_schedule(user)
+                prediction_result = get_inference_backend().predict(file, priority=priority, deadline=deadline)
                 
                 if prediction_result['success']:
                     predicted_class = prediction_result['predicted_class_index']
@@ -108,6 +218,7 @@ def save_scan(user):
         
         db.session.add(new_scan)
         db.session.commit()
+        scan_totals.invalidate(user.uid)
         
         logger.info(f"Scan saved for user {user.email}: {new_scan.id}")
         
@@ -127,19 +238,34 @@ def save_scan(user):
 
 
 @scan_bp.route('/user', methods=['GET'])
+@query_budget(4)
 @token_required
 def get_user_scans(user):
     """Get all scans for the authenticated user."""
     try:
-        # Get pagination parameters
+        if 'cursor' in request.args:
+            try:
+                scans, pagination = _cursor_page(Scan.query.filter_by(user_uid=user.uid), lambda: user.scan_count)
+            except InvalidCursor as e:
+                return _invalid_cursor_response(e)
+            
+            return jsonify({
+                'success': True,
+                'scans': [scan.to_dict() for scan in scans],
+                'pagination': pagination
+            }), 200
+        
+        # Offset pagination (page/per_page), kept for older clients
         page = request.args.get('page', 1, type=int)
         per_page = min(request.args.get('per_page', 20, type=int), 100)  # Max 100 per page
         
-        # Query user's scans with pagination
-        scans_query = Scan.query.filter_by(user_uid=user.uid).order_by(Scan.timestamp.desc())
-        paginated_scans = scans_query.paginate(
-            page=page, per_page=per_page, error_out=False
+        # Query user's scans with pagination; the total is the user's scan counter
+        scans_query = Scan.query.filter_by(user_uid=user.uid)
+        paginated_scans = scans_query.order_by(Scan.timestamp.desc()).paginate(
+            page=page, per_page=per_page, error_out=False, count=False
         )
+        total = user.scan_count
+        pages = (total + per_page - 1) // per_page
         
         scans_list = [scan.to_dict() for scan in paginated_scans.items]
         
@@ -149,10 +275,10 @@ def get_user_scans(user):
             'pagination': {
                 'page': page,
                 'per_page': per_page,
-                'total': paginated_scans.total,
-                'pages': paginated_scans.pages,
-                'has_next': paginated_scans.has_next,
-                'has_prev': paginated_scans.has_prev
+                'total': total,
+                'pages': pages,
+                'has_next': page < pages,
+                'has_prev': page > 1
             }
         }), 200
         
@@ -165,6 +291,7 @@ def get_user_scans(user):
 
 
 @scan_bp.route('/<scan_id>', methods=['GET'])
+@query_budget(3)
 @token_required
 def get_scan_by_id(user, scan_id):
     """Get a specific scan by ID."""
@@ -214,6 +341,7 @@ def update_scan(user, scan_id):
         
         scan.description = new_description
         db.session.commit()
+        scan_totals.invalidate(user.uid)
         
         logger.info(f"Scan updated by user {user.email}: {scan_id}")
         
@@ -252,6 +380,7 @@ def delete_scan(user, scan_id):
         # Delete from database
         db.session.delete(scan)
         db.session.commit()
+        scan_totals.invalidate(user.uid)
         
         logger.info(f"Scan deleted by user {user.email}: {scan_id}")
         
@@ -269,10 +398,56 @@ def delete_scan(user, scan_id):
         }), 500
 
 
+# export format -> (MIME type, file extension)
+EXPORT_FORMATS = {
+    'ndjson': ('application/x-ndjson', 'ndjson'),
+    'csv': ('text/csv', 'csv'),
+    'zip': ('application/zip', 'zip')
+}
+
+
+@scan_bp.route('/export', methods=['GET'])
+@token_required
+def export_scans(user):
+    """Stream the user's whole scan history as NDJSON, CSV or a zip with the images."""
+    try:
+        export_format = request.args.get('format', 'ndjson').lower()
+        if export_format not in EXPORT_FORMATS:
+            return jsonify({
+                'success': False,
+                'message': f"Unknown format, expected one of {', '.join(EXPORT_FORMATS)}"
+            }), 400
+        
+        batch_size = current_app.config['SCAN_EXPORT_BATCH_SIZE']
+        if export_format == 'zip':
+            body = scan_export.zip_chunks(user.uid, batch_size, current_app.config['UPLOAD_FOLDER'])
+        elif export_format == 'csv':
+            body = scan_export.csv_chunks(scan_export.iter_scans(user.uid, batch_size))
+        else:
+            body = scan_export.ndjson_chunks(scan_export.iter_scans(user.uid, batch_size))
+        
+        mimetype, extension = EXPORT_FORMATS[export_format]
+        filename = f"hierovision-scans-{datetime.utcnow():%Y%m%d}.{extension}"
+        return current_app.response_class(
+            stream_with_context(body),
+            status=200,
+            mimetype=mimetype,
+            headers={'Content-Disposition': f'attachment; filename="{filename}"', 'X-Accel-Buffering': 'no'}
+        )
+        
+    except Exception as e:
+        logger.error(f"Export scans error: {e}")
+        return jsonify({
+            'success': False, 
+            'message': 'Failed to export scans'
+        }), 500
+
+
 @scan_bp.route('/search', methods=['GET'])
+@query_budget(5)
 @token_required
 def search_scans(user):
-    """Search user's scans by description."""
+    """Search user's scans by description and Gardner code, best matches first."""
     try:
         query = request.args.get('q', '').strip()
         page = request.args.get('page', 1, type=int)
@@ -284,15 +459,35 @@ def search_scans(user):
                 'message': 'Search query is required'
             }), 400
         
-        # Search in descriptions
+        if scan_search.search_backend is not None:
+            return _ranked_search(user, query, page, per_page)
+        
+        # No full-text index on this database: substring match, newest first
         scans_query = Scan.query.filter(
             Scan.user_uid == user.uid,
             Scan.description.contains(query)
-        ).order_by(Scan.timestamp.desc())
+        )
         
-        paginated_scans = scans_query.paginate(
-            page=page, per_page=per_page, error_out=False
+        if 'cursor' in request.args:
+            try:
+                scans, pagination = _cursor_page(
+                    scans_query, lambda: _search_total(user, ('search', query), scans_query.count)
+                )
+            except InvalidCursor as e:
+                return _invalid_cursor_response(e)
+            
+            return jsonify({
+                'success': True,
+                'scans': [scan.to_dict() for scan in scans],
+                'query': query,
+                'pagination': pagination
+            }), 200
+        
+        paginated_scans = scans_query.order_by(Scan.timestamp.desc()).paginate(
+            page=page, per_page=per_page, error_out=False, count=False
         )
+        total = scans_query.count()
+        pages = (total + per_page - 1) // per_page
         
         scans_list = [scan.to_dict() for scan in paginated_scans.items]
         
@@ -303,10 +498,10 @@ def search_scans(user):
             'pagination': {
                 'page': page,
                 'per_page': per_page,
-                'total': paginated_scans.total,
-                'pages': paginated_scans.pages,
-                'has_next': paginated_scans.has_next,
-                'has_prev': paginated_scans.has_prev
+                'total': total,
+                'pages': pages,
+                'has_next': page < pages,
+                'has_prev': page > 1
             }
         }), 200
         
@@ -319,6 +514,7 @@ def search_scans(user):
 
 
 @scan_bp.route('/recent', methods=['GET'])
+@query_budget(3)
 @optional_token
 def get_recent_scans(user):
     """Get recent scans (public endpoint with optional authentication)."""
@@ -3,6 +3,7 @@ from app.extensions import db
 from app.models.user import User
 from app.utils.auth import token_required
 from app.utils.file_handler import save_uploaded_file, delete_file
+from app.utils.query_stats import query_budget
 import logging
 
 user_bp = Blueprint('user', __name__, url_prefix='/user')
@@ -10,6 +11,7 @@ logger = logging.getLogger(__name__)
 
 
 @user_bp.route('/profile', methods=['GET'])
+@query_budget(2)
 @token_required
 def get_user_profile(user):
     """Get user profile information."""
@@ -192,26 +194,36 @@ def delete_user_avatar(user):
 
 
 @user_bp.route('/stats', methods=['GET'])
+@query_budget(4)
 @token_required
 def get_user_stats(user):
-    """Get user statistics."""
+    """Get user statistics, read from the rollups kept by the scan mapper events."""
     try:
-        from app.models.scan import Scan
+        from app.models.scan_stats import ScanDailyStat, ScanClassStat
+        from app.services.gardner import describe_class
+        from datetime import datetime, timedelta
         
-        # Count user's scans
-        total_scans = Scan.query.filter_by(user_uid=user.uid).count()
+        # Daily activity for the last `days` days (default and minimum 30, max 365)
+        days = max(30, min(request.args.get('days', 30, type=int), 365))
+        today = datetime.utcnow().date()
+        daily = ScanDailyStat.query.filter(
+            ScanDailyStat.user_uid == user.uid,
+            ScanDailyStat.day > today - timedelta(days=days)
+        ).order_by(ScanDailyStat.day).all()
         
-        # Get recent scans count (last 30 days)
-        from datetime import datetime, timedelta
-        thirty_days_ago = datetime.utcnow() - timedelta(days=30)
-        recent_scans = Scan.query.filter(
-            Scan.user_uid == user.uid,
-            Scan.timestamp >= thirty_days_ago
-        ).count()
+        top_classes = ScanClassStat.query.filter_by(user_uid=user.uid)\
+                                         .order_by(ScanClassStat.scan_count.desc(), ScanClassStat.class_index)\
+                                         .limit(5).all()
         
         stats = {
-            'total_scans': total_scans,
-            'recent_scans': recent_scans,
+            'total_scans': user.scan_count,
+            # Scans on the last 30 UTC days, today included
+            'recent_scans': sum(row.scan_count for row in daily if row.day > today - timedelta(days=30)),
+            'daily_activity': [{'date': row.day.isoformat(), 'scans': row.scan_count} for row in daily],
+            'top_classes': [
+                {'class_index': row.class_index, 'scans': row.scan_count, **describe_class(row.class_index)}
+                for row in top_classes
+            ],
             'member_since': user.created_at.isoformat() if user.created_at else None,
             'selected_country': user.selected_country
         }
@@ -0,0 +1,122 @@
+"""
+Versioned offline catalog for the mobile app.
+
+The sign catalog, Gardner categories and landmarks (with their tours) are
+bundled into one document whose version is a hash of its canonical JSON, so
+the same content always has the same version. Every published version is
+stored in catalog_snapshots, which lets the delta endpoint send a client only
+the entries that changed since the version it already holds.
+"""
+
+import hashlib
+import json
+import threading
+from sqlalchemy.exc import IntegrityError
+from app.extensions import db
+from app.models.catalog_snapshot import CatalogSnapshot
+from app.models.landmark import Landmark
+from app.services.gardner import get_sign_catalog
+
+# Collections in the document and the field identifying an entry in each
+COLLECTION_KEYS = {
+    'categories': 'prefix',
+    'signs': 'code',
+    'landmarks': 'id'
+}
+
+_current = None
+_current_lock = threading.Lock()
+
+
+def _canonical_json(document):
+    return json.dumps(document, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+
+
+def build_document():
+    """Collect the current catalog contents."""
+    catalog = get_sign_catalog()
+    return {
+        'categories': [{'prefix': prefix, 'name': name} for prefix, name in catalog.categories.items()],
+        'signs': [
+            {
+                'class_index': sign.class_index,
+                'code': sign.code,
+                'description': sign.description,
+                'glyph': sign.glyph,
+                'category': sign.category
+            }
+            for sign in catalog
+        ],
+        'landmarks': [landmark.to_dict(include_stats=False) for landmark in Landmark.query.order_by(Landmark.id)]
+    }
+
+
+def _publish(version, content, retention):
+    """Store a new version and drop the oldest ones beyond retention."""
+    if db.session.get(CatalogSnapshot, version) is not None:
+        return
+
+    try:
+        db.session.add(CatalogSnapshot(version=version, content=content))
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()  # Another worker published the same version first
+        return
+
+    stale = [
+        row.version for row in
+        CatalogSnapshot.query.order_by(CatalogSnapshot.created_at.desc()).offset(retention).all()
+    ]
+    if stale:
+        CatalogSnapshot.query.filter(CatalogSnapshot.version.in_(stale)).delete(synchronize_session=False)
+        db.session.commit()
+
+
+def current_snapshot(retention=20):
+    """
+    Return (version, document) for the current catalog, publishing it if it is new.
+
+    The document is only rebuilt and hashed when the sign catalog or landmark
+    data version changes.
+    """
+    global _current
+    source_version = (get_sign_catalog().version, Landmark.data_version())
+
+    with _current_lock:
+        if _current is not None and _current[0] == source_version:
+            return _current[1], _current[2]
+
+    document = build_document()
+    content = _canonical_json(document)
+    version = hashlib.sha256(content.encode('utf-8')).hexdigest()[:16]
+    _publish(version, content, retention)
+
+    with _current_lock:
+        _current = (source_version, version, document)
+    return version, document
+
+
+def load_snapshot(version):
+    """Return the document of a published version, or None if it is unknown or expired."""
+    row = db.session.get(CatalogSnapshot, version)
+    return json.loads(row.content) if row else None
+
+
+def diff_documents(old, new):
+    """
+    Compare two catalog documents.
+
+    Returns:
+        dict: For each collection that changed, 'upserted' (new or changed
+        entries) and 'removed' (keys of entries that no longer exist)
+    """
+    changes = {}
+    for collection, key in COLLECTION_KEYS.items():
+        before = {entry[key]: entry for entry in old.get(collection, [])}
+        after = {entry[key]: entry for entry in new.get(collection, [])}
+
+        upserted = [entry for entry_key, entry in after.items() if before.get(entry_key) != entry]
+        removed = [entry_key for entry_key in before if entry_key not in after]
+        if upserted or removed:
+            changes[collection] = {'upserted': upserted, 'removed': removed}
+    return changes
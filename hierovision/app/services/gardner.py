@@ -0,0 +1,137 @@
+"""
+Gardner sign catalog used by the classification model.
+Maps each class index the model predicts to its Gardner code, description and Unicode glyph.
+Kept free of heavy imports so web workers can serve sign metadata without loading torch.
+"""
+
+import hashlib
+import json
+import os
+import re
+from bisect import bisect_left, bisect_right
+from typing import NamedTuple, Optional
+
+CATALOG_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'gardner_signs.json')
+
+# Category prefix, sign number and variant letter, e.g. 'Aa' 15 '' or 'W' 24 'a'
+_CODE_PATTERN = re.compile(r'([A-Z][a-z]?)(\d+)([A-Za-z]?)')
+
+UNKNOWN_SIGN = {'code': 'Unknown', 'description': 'Unknown hieroglyph'}
+
+
+class Sign(NamedTuple):
+    """One entry of the Gardner sign list."""
+
+    class_index: int
+    code: str
+    description: str
+    glyph: Optional[str]
+    category: str
+
+    def to_dict(self):
+        return {'code': self.code, 'description': self.description, 'glyph': self.glyph}
+
+
+def _gardner_order(sign):
+    """Sort key giving the conventional Gardner order (A1, A2, ..., A12, ..., Aa1)."""
+    match = _CODE_PATTERN.fullmatch(sign.code)
+    if match is None:
+        return (sign.category, 0, sign.code)
+    return (match.group(1), int(match.group(2)), match.group(3))
+
+
+class SignCatalog:
+    """
+    Immutable, indexed view of the Gardner sign list.
+
+    Signs are stored in a tuple by class index. A dict maps upper-cased codes to
+    signs, and a second tuple keeps the signs in Gardner order with the start
+    and end offsets of each category, so a category is a single slice.
+    """
+
+    def __init__(self, signs, categories, version=''):
+        """
+        Args:
+            signs: Sign tuples, one per class index in order
+            categories: Mapping of category prefix to its name, in display order
+            version: Marker that changes whenever the catalog data changes
+        """
+        self.signs = tuple(signs)
+        self.categories = dict(categories)
+        self.version = version
+        self._by_code = {sign.code.upper(): sign for sign in self.signs}
+
+        self._ordered = tuple(sorted(self.signs, key=_gardner_order))
+        keys = [sign.category for sign in self._ordered]
+        self._category_ranges = {
+            category: (bisect_left(keys, category), bisect_right(keys, category))
+            for category in self.categories
+        }
+
+    @classmethod
+    def load(cls, path=CATALOG_PATH):
+        """Load the catalog from its JSON data file."""
+        with open(path, 'rb') as f:
+            raw = f.read()
+        data = json.loads(raw)
+
+        signs = []
+        for index, entry in enumerate(data['signs']):
+            if entry['class_index'] != index:
+                raise ValueError(f"Sign catalog entries must be ordered by class index (found {entry['class_index']} at {index})")
+            match = _CODE_PATTERN.fullmatch(entry['code'])
+            category = match.group(1) if match else ''
+            signs.append(Sign(index, entry['code'], entry['description'], entry.get('glyph'), category))
+
+        return cls(signs, data['categories'], version=hashlib.sha256(raw).hexdigest()[:16])
+
+    def __len__(self):
+        return len(self.signs)
+
+    def __iter__(self):
+        return iter(self.signs)
+
+    def get(self, class_index):
+        """Return the sign for a class index, or None."""
+        if 0 <= class_index < len(self.signs):
+            return self.signs[class_index]
+        return None
+
+    def by_code(self, code):
+        """Return the sign with a Gardner code (case-insensitive), or None."""
+        return self._by_code.get(code.strip().upper())
+
+    def in_gardner_order(self):
+        """Return all signs in Gardner order."""
+        return self._ordered
+
+    def category(self, category):
+        """Return the signs of one category in Gardner order, or an empty tuple."""
+        start, end = self._category_ranges.get(category, (0, 0))
+        return self._ordered[start:end]
+
+    def category_counts(self):
+        """Return (prefix, name, sign count) for every category, in display order."""
+        counts = []
+        for category, name in self.categories.items():
+            start, end = self._category_ranges[category]
+            counts.append((category, name, end - start))
+        return counts
+
+
+# Global catalog instance
+catalog = None
+
+
+def get_sign_catalog():
+    """Get or load the process-wide sign catalog."""
+    global catalog
+    if catalog is None:
+        catalog = SignCatalog.load()
+    return catalog
+
+
+def describe_class(class_index):
+    """Get the Gardner code, description and glyph for a predicted class index."""
+    sign = get_sign_catalog().get(class_index)
+    return sign.to_dict() if sign else UNKNOWN_SIGN
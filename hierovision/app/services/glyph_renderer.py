@@ -0,0 +1,251 @@
+"""
+Server-side rendering of Egyptian hieroglyph text to PNG or WebP.
+
+Clients without a hieroglyph font show tofu, so the app can ask for an image
+instead. Every glyph of the Unicode block is rasterized once into an atlas per
+configured size; a request only slices glyph columns out of the atlas and copies
+them onto a canvas, with no text layout. Encoded images are kept in a
+byte-bounded LRU keyed by a hash of the text and render options.
+"""
+
+import hashlib
+import io
+import math
+import threading
+from collections import OrderedDict
+import numpy as np
+from flask import current_app
+from PIL import Image, ImageDraw, ImageFont
+
+# Egyptian Hieroglyphs block (U+13000-U+1342F)
+HIEROGLYPH_RANGE = range(0x13000, 0x13430)
+
+# Egyptian Hieroglyph Format Controls (quadrat joiners); rendered as zero width, one sign after another
+FORMAT_CONTROL_RANGE = range(0x13430, 0x13460)
+
+IMAGE_FORMATS = {'png': 'image/png', 'webp': 'image/webp'}
+
+# Codepoint that no font maps, used to recognise the font's .notdef box
+_UNMAPPED = chr(0x10FFFD)
+
+
+class GlyphAtlas:
+    """
+    Rasterized glyphs of one font at one pixel size.
+
+    All glyphs share one row of cells in a single uint8 coverage array of
+    height line_height; offsets maps a codepoint to the (start, end) columns of
+    its cell.
+    """
+
+    def __init__(self, font, size):
+        self.size = size
+        ascent, descent = font.getmetrics()
+        self.line_height = ascent + descent
+        self.space_width = max(1, size // 3)
+
+        notdef = self._rasterize(font, _UNMAPPED)
+        cells = []
+        self.offsets = {}
+        position = 0
+        for codepoint in HIEROGLYPH_RANGE:
+            cell = self._rasterize(font, chr(codepoint))
+            if cell.shape == notdef.shape and np.array_equal(cell, notdef):
+                continue  # The font has no glyph for this codepoint
+
+            width = cell.shape[1]
+            cells.append(cell)
+            self.offsets[codepoint] = (position, position + width)
+            position += width
+
+        self.pixels = np.hstack(cells) if cells else np.zeros((self.line_height, 0), dtype=np.uint8)
+
+    def _rasterize(self, font, char):
+        """Draw one character into a cell as tall as a line and as wide as its advance or ink."""
+        left, _, right, _ = font.getbbox(char)
+        shift = max(0, -left)
+        width = max(math.ceil(font.getlength(char)), right) + shift
+        cell = Image.new('L', (max(1, width), self.line_height))
+        ImageDraw.Draw(cell).text((shift, 0), char, font=font, fill=255)
+        return np.asarray(cell)
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def compose(self, text):
+        """
+        Blit the glyphs of text onto a coverage canvas.
+
+        Lines are split on newlines; spaces advance by space_width and characters
+        the atlas does not hold are skipped.
+
+        Returns:
+            tuple: (uint8 array of shape (height, width), number of skipped characters)
+        """
+        lines = []
+        missing = 0
+        for line in text.split('\n'):
+            runs = []
+            for char in line:
+                codepoint = ord(char)
+                if codepoint in self.offsets:
+                    runs.append(self.offsets[codepoint])
+                elif char.isspace():
+                    runs.append(None)
+                elif codepoint not in FORMAT_CONTROL_RANGE:
+                    missing += 1
+            lines.append(runs)
+
+        def run_width(run):
+            return self.space_width if run is None else run[1] - run[0]
+
+        width = max(1, max(sum(run_width(run) for run in runs) for runs in lines))
+        canvas = np.zeros((self.line_height * len(lines), width), dtype=np.uint8)
+
+        for row, runs in enumerate(lines):
+            top = row * self.line_height
+            x = 0
+            for run in runs:
+                if run is not None:
+                    start, end = run
+                    canvas[top:top + self.line_height, x:x + end - start] = self.pixels[:, start:end]
+                x += run_width(run)
+
+        return canvas, missing
+
+
+class RenderCache:
+    """Least-recently-used cache of encoded images, bounded by total size in bytes."""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key, entry):
+        with self._lock:
+            if key in self._entries:
+                return
+            self._entries[key] = entry
+            self.size += len(entry[0])
+            while self.size > self.max_bytes and self._entries:
+                _, (body, _) = self._entries.popitem(last=False)
+                self.size -= len(body)
+
+
+def _parse_color(value):
+    """Parse 'rrggbb' or '#rrggbb' into an (r, g, b) tuple."""
+    value = value.lstrip('#')
+    if len(value) != 6:
+        raise ValueError(f"Invalid color '{value}', expected rrggbb")
+    return tuple(int(value[i:i + 2], 16) for i in (0, 2, 4))
+
+
+class GlyphRenderer:
+    """Renders hieroglyph text with prebuilt atlases for a fixed set of sizes."""
+
+    def __init__(self, font_path, sizes, cache_bytes=32 * 1024 * 1024):
+        """
+        Args:
+            font_path: TrueType/OpenType font covering the Egyptian Hieroglyphs block
+            sizes: Pixel sizes to build atlases for; requests must use one of them
+            cache_bytes: Budget for cached encoded images
+        """
+        with open(font_path, 'rb') as f:
+            font_bytes = f.read()
+        self.font_version = hashlib.sha256(font_bytes).hexdigest()[:16]
+
+        self.atlases = {}
+        for size in sorted(set(sizes)):
+            self.atlases[size] = GlyphAtlas(ImageFont.truetype(io.BytesIO(font_bytes), size), size)
+
+        self.default_size = min(self.atlases)
+        self.cache = RenderCache(cache_bytes)
+
+    def render(self, text, size=None, image_format='png', color='000000', background=None):
+        """
+        Render text to an encoded image.
+
+        Args:
+            text: Hieroglyph text, optionally with spaces and newlines
+            size: One of the atlas sizes, or None for the smallest
+            image_format: 'png' or 'webp' (lossless)
+            color: Glyph color as rrggbb
+            background: Background color as rrggbb, or None for transparent
+
+        Returns:
+            tuple: (image bytes, ETag, number of characters the font could not draw)
+
+        Raises:
+            ValueError: Unsupported size, format or color
+        """
+        size = size or self.default_size
+        if size not in self.atlases:
+            raise ValueError(f"Unsupported size {size}; available sizes: {', '.join(map(str, self.atlases))}")
+        if image_format not in IMAGE_FORMATS:
+            raise ValueError(f"Unsupported format '{image_format}'; use png or webp")
+        foreground = _parse_color(color)
+        backdrop = _parse_color(background) if background else None
+
+        key = hashlib.sha256(
+            f"{self.font_version}\0{size}\0{image_format}\0{foreground}\0{backdrop}\0{text}".encode('utf-8')
+        ).hexdigest()[:32]
+        cached = self.cache.get(key)
+        if cached is not None:
+            body, missing = cached
+            return body, key, missing
+
+        coverage, missing = self.atlases[size].compose(text)
+
+        if backdrop is None:
+            pixels = np.empty(coverage.shape + (4,), dtype=np.uint8)
+            pixels[..., :3] = foreground
+            pixels[..., 3] = coverage
+            image = Image.fromarray(pixels, 'RGBA')
+        else:
+            alpha = coverage[..., None].astype(np.float32) / 255
+            pixels = np.asarray(backdrop, dtype=np.float32) * (1 - alpha) + np.asarray(foreground, dtype=np.float32) * alpha
+            image = Image.fromarray(pixels.round().astype(np.uint8), 'RGB')
+
+        output = io.BytesIO()
+        if image_format == 'webp':
+            image.save(output, format='WEBP', lossless=True)
+        else:
+            image.save(output, format='PNG')
+        body = output.getvalue()
+
+        self.cache.put(key, (body, missing))
+        return body, key, missing
+
+
+# Global renderer instance
+renderer = None
+_renderer_lock = threading.Lock()
+
+
+def get_glyph_renderer():
+    """
+    Get or build the process-wide glyph renderer from the app configuration.
+
+    Raises:
+        FileNotFoundError: The configured glyph font is not installed
+    """
+    global renderer
+    if renderer is None:
+        with _renderer_lock:
+            if renderer is None:
+                config = current_app.config
+                renderer = GlyphRenderer(
+                    config['GLYPH_FONT_PATH'],
+                    config.get('GLYPH_SIZES', [48]),
+                    cache_bytes=config.get('GLYPH_RENDER_CACHE_MB', 32) * 1024 * 1024
+                )
+    return renderer
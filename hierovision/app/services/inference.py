@@ -0,0 +1,248 @@
+"""
+Inference backends used by the prediction routes.
+
+'local' runs the classifier inside the web worker through the model registry.
+'ipc' forwards images to the standalone inference server (inference_server.py),
+so web workers never import torch.
+"""
+
+import logging
+import time
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from flask import current_app, g, request
+from app.services.gardner import describe_class
+from app.services.inference_queue import DeadlineExceeded, PRIORITY_CLASSES, remaining_seconds
+from app.services.model_registry import get_model_registry, ModelNotFoundError
+
+logger = logging.getLogger(__name__)
+
+
+def request_schedule(user):
+    """
+    Work out the priority class and deadline for the current prediction request.
+    
+    Authenticated users are scheduled as 'interactive' and everyone else as
+    'anonymous'. Clients may demote their own request with 'X-Priority: background'
+    but never promote it. The deadline comes from 'X-Request-Deadline-Ms' or
+    INFERENCE_DEFAULT_DEADLINE_MS and counts from when the request arrived, so
+    reading and decoding the upload spend the same budget as the model.
+    
+    Returns:
+        tuple: (priority class, deadline as a time.monotonic() value, or None)
+    """
+    priority = 'interactive' if user else 'anonymous'
+    requested = (request.headers.get('X-Priority') or '').strip().lower()
+    if requested in PRIORITY_CLASSES and PRIORITY_CLASSES.index(requested) > PRIORITY_CLASSES.index(priority):
+        priority = requested
+
+    deadline_ms = request.headers.get('X-Request-Deadline-Ms', type=int)
+    if not deadline_ms or deadline_ms <= 0:
+        deadline_ms = current_app.config.get('INFERENCE_DEFAULT_DEADLINE_MS') or None
+    if not deadline_ms:
+        return priority, None
+    return priority, g.get('request_arrived', time.monotonic()) + deadline_ms / 1000
+
+
+def init_request_clock(app):
+    """Note when each request arrived, the start of its inference deadline."""
+    @app.before_request
+    def _note_arrival():
+        g.request_arrived = time.monotonic()
+
+
+def _prediction_fields(class_index, confidence):
+    return {
+        'predicted_class_index': class_index,
+        'confidence_score': float(confidence),
+        'description': describe_class(class_index)
+    }
+
+
+def _top_prediction_fields(predictions):
+    return [
+        {
+            'class_index': class_index,
+            'confidence': float(confidence),
+            'description': describe_class(class_index)
+        }
+        for class_index, confidence in predictions
+    ]
+
+
+class _InferenceBackend:
+    """
+    Formats classifier output for the routes.
+    
+    Subclasses implement _classify and _classify_raw, which return the resolved
+    model key with (class_index, confidence) pairs, and may raise DeadlineExceeded
+    or ModelNotFoundError for the routes to handle. Deadlines are absolute
+    time.monotonic() values from request_schedule().
+    """
+
+    def predict(self, image_file, model=None, priority='interactive', deadline=None):
+        try:
+            model_key, predictions = self._classify(image_file, 1, model, priority, deadline)
+        except (DeadlineExceeded, ModelNotFoundError):
+            raise
+        except Exception as e:
+            logger.error(f"Prediction error: {e}")
+            return {
+                'success': False,
+                'model': model,
+                'predicted_class_index': None,
+                'confidence_score': None,
+                'description': None,
+                'error': str(e)
+            }
+
+        return {'success': True, 'model': model_key, **_prediction_fields(*predictions[0]), 'error': None}
+
+    def get_top_predictions(self, image_file, top_k=5, model=None, priority='interactive', deadline=None):
+        try:
+            model_key, predictions = self._classify(image_file, top_k, model, priority, deadline)
+        except (DeadlineExceeded, ModelNotFoundError):
+            raise
+        except Exception as e:
+            logger.error(f"Top predictions error: {e}")
+            return {'success': False, 'model': model, 'predictions': [], 'error': str(e)}
+
+        return {'success': True, 'model': model_key, 'predictions': _top_prediction_fields(predictions), 'error': None}
+
+    def predict_raw(self, buffer, count, model=None, priority='interactive', deadline=None):
+        """Classify pre-decoded images; 'results' holds one prediction per image, in order."""
+        try:
+            model_key, results = self._classify_raw(buffer, count, 1, model, priority, deadline)
+        except (DeadlineExceeded, ModelNotFoundError):
+            raise
+        except Exception as e:
+            logger.error(f"Prediction error: {e}")
+            return {'success': False, 'model': model, 'results': [], 'error': str(e)}
+
+        return {
+            'success': True,
+            'model': model_key,
+            'results': [_prediction_fields(*predictions[0]) for predictions in results],
+            'error': None
+        }
+
+    def get_top_predictions_raw(self, buffer, count, top_k=5, model=None, priority='interactive', deadline=None):
+        """Classify pre-decoded images; 'results' holds the top predictions of each image, in order."""
+        try:
+            model_key, results = self._classify_raw(buffer, count, top_k, model, priority, deadline)
+        except (DeadlineExceeded, ModelNotFoundError):
+            raise
+        except Exception as e:
+            logger.error(f"Top predictions error: {e}")
+            return {'success': False, 'model': model, 'results': [], 'error': str(e)}
+
+        return {
+            'success': True,
+            'model': model_key,
+            'results': [{'predictions': _top_prediction_fields(predictions)} for predictions in results],
+            'error': None
+        }
+
+
+class LocalInferenceBackend(_InferenceBackend):
+    """
+    Runs predictions in this process with models from the registry.
+    
+    Images are decoded on the request thread; the model runs on a shared
+    inference queue so concurrent requests are batched and scheduled by priority.
+    """
+
+    def __init__(self, max_batch_size=32, max_delay_ms=5.0, timeout=30.0):
+        from app.services.inference_queue import InferenceQueue
+        from app.services.ml_service import run_predict_batch
+
+        self.timeout = timeout
+        self.queue = InferenceQueue(run_predict_batch, max_batch_size=max_batch_size, max_delay_ms=max_delay_ms)
+        self.queue.start()
+
+    def _run(self, preprocess, top_k, model, priority, deadline):
+        """Preprocess with the leased model and wait for the queue to run it."""
+        from app.services.ml_service import PredictJob
+
+        registry = get_model_registry()
+        model_key = registry.resolve(model)
+
+        with registry.lease(model_key) as predictor:
+            tensor = preprocess(predictor)
+            top_k = max(1, min(top_k, predictor.num_classes))
+            timeout = remaining_seconds(deadline, self.timeout)
+            future = self.queue.submit(
+                model_key, PredictJob(predictor, tensor, top_k), priority, deadline, size=len(tensor)
+            )
+            try:
+                results = future.result(timeout=timeout)
+            except FutureTimeoutError:
+                future.cancel()
+                raise DeadlineExceeded('Request deadline exceeded')
+
+        return model_key, results
+
+    def _classify(self, image_file, top_k, model, priority, deadline):
+        model_key, results = self._run(
+            lambda predictor: predictor.preprocess(image_file), top_k, model, priority, deadline
+        )
+        return model_key, results[0]
+
+    def _classify_raw(self, buffer, count, top_k, model, priority, deadline):
+        return self._run(
+            lambda predictor: predictor.preprocess_raw(buffer, count), top_k, model, priority, deadline
+        )
+
+    def list_models(self):
+        registry = get_model_registry()
+        return {'default_model': registry.default_key, 'models': registry.list_models()}
+
+    def queue_stats(self):
+        return self.queue.stats()
+
+
+class IpcInferenceBackend(_InferenceBackend):
+    """Sends predictions to the inference server over its Unix socket."""
+
+    def __init__(self, client):
+        self.client = client
+
+    def _classify(self, image_file, top_k, model, priority, deadline):
+        return self.client.get_top_predictions(
+            image_file, top_k=top_k, model=model, priority=priority, deadline=deadline
+        )
+
+    def _classify_raw(self, buffer, count, top_k, model, priority, deadline):
+        return self.client.get_top_predictions_raw(
+            buffer, count, top_k=top_k, model=model, priority=priority, deadline=deadline
+        )
+
+    def list_models(self):
+        return self.client.list_models()
+
+    def queue_stats(self):
+        return self.client.queue_stats()
+
+
+# Global backend instance
+backend = None
+
+
+def get_inference_backend():
+    """Get or create the inference backend selected by INFERENCE_BACKEND."""
+    global backend
+    if backend is None:
+        config = current_app.config
+        if config.get('INFERENCE_BACKEND', 'local') == 'ipc':
+            from app.services.inference_client import InferenceClient
+            backend = IpcInferenceBackend(InferenceClient(
+                config['INFERENCE_SOCKET_PATH'],
+                timeout=config.get('INFERENCE_TIMEOUT', 30.0),
+                use_shared_memory=config.get('INFERENCE_SHARED_MEMORY', True)
+            ))
+        else:
+            backend = LocalInferenceBackend(
+                max_batch_size=config.get('INFERENCE_MAX_BATCH_SIZE', 32),
+                max_delay_ms=config.get('INFERENCE_MAX_BATCH_DELAY_MS', 5.0),
+                timeout=config.get('INFERENCE_TIMEOUT', 30.0)
+            )
+    return backend
@@ -0,0 +1,290 @@
+import atexit
+import itertools
+import json
+import logging
+import os
+import socket
+import threading
+import time
+from functools import partial
+from multiprocessing import shared_memory
+from app.services import inference_protocol as protocol
+from app.services.inference_queue import DeadlineExceeded, PRIORITY_CLASSES
+from app.services.model_registry import ModelNotFoundError
+
+logger = logging.getLogger(__name__)
+
+
+# Extra time the client waits past a request's deadline for the server's own answer
+DEADLINE_GRACE_SECONDS = 1.0
+
+
+class InferenceServerError(Exception):
+    """Raised when the inference server is unreachable or rejects a request."""
+
+
+def _recv_exact(sock, size):
+    """Receive exactly size bytes from a socket."""
+    buffer = bytearray(size)
+    view = memoryview(buffer)
+    received = 0
+    while received < size:
+        count = sock.recv_into(view[received:])
+        if count == 0:
+            raise ConnectionError('Inference server closed the connection')
+        received += count
+    return bytes(buffer)
+
+
+def _read_into(stream, view):
+    """Fill a memoryview from a file-like object, avoiding an intermediate bytes copy when possible."""
+    readinto = getattr(stream, 'readinto', None)
+    if readinto is None:
+        data = stream.read(len(view))
+        view[:len(data)] = data
+        return len(data)
+
+    filled = 0
+    while filled < len(view):
+        count = readinto(view[filled:])
+        if not count:
+            break
+        filled += count
+    return filled
+
+
+def _copy_into(data, view):
+    """Fill a memoryview from a bytes-like object."""
+    view[:len(data)] = data
+    return len(data)
+
+
+class _SegmentPool:
+    """Reusable shared-memory segments that carry images to the inference server."""
+
+    def __init__(self, max_idle=8):
+        self.max_idle = max_idle
+        self._idle = []
+        self._lock = threading.Lock()
+        atexit.register(self.close)
+
+    def acquire(self, size):
+        with self._lock:
+            for index, segment in enumerate(self._idle):
+                if segment.size >= size:
+                    return self._idle.pop(index)
+
+        # Round up to a power of two (at least 1 MB) so segments are reusable for later uploads
+        capacity = max(1024 * 1024, 1 << max(size - 1, 1).bit_length())
+        return shared_memory.SharedMemory(create=True, size=capacity)
+
+    def release(self, segment):
+        with self._lock:
+            if len(self._idle) < self.max_idle:
+                self._idle.append(segment)
+                return
+        self.discard(segment)
+
+    def discard(self, segment):
+        """Free a segment that must not be reused, e.g. one the server may still be reading."""
+        segment.close()
+        segment.unlink()
+
+    def close(self):
+        with self._lock:
+            for segment in self._idle:
+                segment.close()
+                segment.unlink()
+            self._idle.clear()
+
+
+class InferenceClient:
+    """
+    Client for the out-of-process inference server.
+
+    Connections are pooled and kept alive between requests. With shared memory
+    enabled, uploads are read straight into a shared segment and only a small
+    descriptor is sent over the socket.
+    """
+
+    def __init__(self, socket_path, timeout=30.0, use_shared_memory=True):
+        self.socket_path = socket_path
+        self.timeout = timeout
+        self._segments = _SegmentPool() if use_shared_memory else None
+        self._idle_connections = []
+        self._lock = threading.Lock()
+        self._request_ids = itertools.count(1)
+
+    def _checkout(self):
+        with self._lock:
+            if self._idle_connections:
+                return self._idle_connections.pop()
+
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        sock.connect(self.socket_path)
+        return sock
+
+    def _checkin(self, sock):
+        with self._lock:
+            self._idle_connections.append(sock)
+
+    def _request(self, op, model='', top_k=0, payload_kind=protocol.PAYLOAD_NONE, payload=b'',
+                 priority=0, deadline=None):
+        """Send one request and return (status, count, body); deadline is a time.monotonic() value."""
+        request_id = next(self._request_ids) & 0xFFFFFFFF
+        message = protocol.encode_request(
+            request_id, op, model, top_k, payload_kind, payload, priority, deadline
+        )
+        if deadline is not None:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise DeadlineExceeded('Request deadline exceeded')
+            timeout = remaining + DEADLINE_GRACE_SECONDS
+        else:
+            timeout = self.timeout
+
+        # A pooled connection may have been closed by a server restart; retry once on a fresh one
+        for attempt in range(2):
+            sock = None
+            try:
+                sock = self._checkout()
+                sock.settimeout(timeout)
+                sock.sendall(message)
+                header = _recv_exact(sock, protocol.RESPONSE_HEADER.size)
+                status, response_id, count, body_len = protocol.decode_response_header(header)
+                body = _recv_exact(sock, body_len)
+            except socket.timeout:
+                # The server may still answer later, so the connection cannot be reused
+                if sock is not None:
+                    sock.close()
+                if deadline is not None:
+                    raise DeadlineExceeded('Request deadline exceeded')
+                raise InferenceServerError('Inference server timed out')
+            except (OSError, ConnectionError, protocol.ProtocolError) as e:
+                if sock is not None:
+                    sock.close()
+                if attempt == 1:
+                    raise InferenceServerError(f"Inference server unavailable: {e}")
+                continue
+
+            if response_id != request_id:
+                sock.close()
+                raise InferenceServerError('Inference server response out of order')
+
+            self._checkin(sock)
+            return status, count, body
+
+    def _raise_for_status(self, status, body):
+        if status == protocol.STATUS_OK:
+            return
+        message = body.decode('utf-8', errors='replace')
+        if status == protocol.STATUS_MODEL_NOT_FOUND:
+            raise ModelNotFoundError(message)
+        if status == protocol.STATUS_DEADLINE_EXCEEDED:
+            raise DeadlineExceeded(message)
+        raise InferenceServerError(message)
+
+    def _predict(self, fill, size, top_k, model, priority, deadline, flags=0):
+        """
+        Send size bytes of image data, written by fill(view), and return the server's answer.
+        
+        Returns:
+            tuple: (resolved model key, [(class_index, confidence), ...] for all images)
+        """
+        schedule = {'priority': PRIORITY_CLASSES.index(priority), 'deadline': deadline}
+
+        if self._segments is None:
+            buffer = bytearray(size)
+            size = fill(memoryview(buffer))
+            status, count, body = self._request(
+                protocol.OP_PREDICT, model or '', top_k, protocol.PAYLOAD_INLINE | flags, buffer[:size], **schedule
+            )
+        else:
+            segment = self._segments.acquire(size)
+            answered = False
+            try:
+                view = segment.buf[:size]
+                try:
+                    size = fill(view)
+                finally:
+                    view.release()
+
+                descriptor = protocol.encode_shm_descriptor(segment.name, 0, size)
+                status, count, body = self._request(
+                    protocol.OP_PREDICT, model or '', top_k, protocol.PAYLOAD_SHM | flags, descriptor, **schedule
+                )
+                answered = True
+            finally:
+                # Without an answer the server may still be reading the segment; reusing it
+                # could hand another request's pixels to this one, so it is unlinked instead
+                if answered:
+                    self._segments.release(segment)
+                else:
+                    self._segments.discard(segment)
+
+        self._raise_for_status(status, body)
+        return protocol.decode_predictions(body, count)
+
+    def get_top_predictions(self, image_file, top_k=5, model=None, priority='interactive', deadline=None):
+        """
+        Classify an uploaded image on the inference server.
+
+        Args:
+            image_file: File-like object (or werkzeug FileStorage) holding the encoded image
+            top_k: Number of predictions to return
+            model: Optional model reference ('name' or 'name:version')
+            priority: Scheduling class, one of PRIORITY_CLASSES
+            deadline: time.monotonic() value by which the request must finish, or None for the client timeout
+
+        Returns:
+            tuple: (resolved model key, [(class_index, confidence), ...])
+        """
+        stream = getattr(image_file, 'stream', image_file)
+        stream.seek(0, os.SEEK_END)
+        size = stream.tell()
+        stream.seek(0)
+
+        return self._predict(partial(_read_into, stream), size, top_k, model, priority, deadline)
+
+    def get_top_predictions_raw(self, buffer, count, top_k=5, model=None, priority='interactive', deadline=None):
+        """
+        Classify pre-decoded images on the inference server.
+
+        Args:
+            buffer: Bytes-like object holding count packed 224x224 RGB uint8 images
+            count: Number of images in the buffer
+            top_k: Number of predictions to return per image
+            model: Optional model reference ('name' or 'name:version')
+            priority: Scheduling class, one of PRIORITY_CLASSES
+            deadline: time.monotonic() value by which the request must finish, or None for the client timeout
+
+        Returns:
+            tuple: (resolved model key, [[(class_index, confidence), ...] for each image])
+        """
+        model_key, predictions = self._predict(
+            partial(_copy_into, buffer), len(buffer), top_k, model, priority, deadline,
+            flags=protocol.PAYLOAD_RAW_RGB8
+        )
+        per_image = len(predictions) // count
+        return model_key, [predictions[i * per_image:(i + 1) * per_image] for i in range(count)]
+
+    def list_models(self):
+        """Return the server's model registry listing."""
+        status, _, body = self._request(protocol.OP_MODELS)
+        self._raise_for_status(status, body)
+        return json.loads(body)
+
+    def queue_stats(self):
+        """Return the server's inference queue statistics per priority class."""
+        status, _, body = self._request(protocol.OP_STATS)
+        self._raise_for_status(status, body)
+        return json.loads(body)
+
+    def ping(self):
+        """Return True if the inference server answers."""
+        try:
+            status, _, _ = self._request(protocol.OP_PING)
+            return status == protocol.STATUS_OK
+        except InferenceServerError:
+            return False
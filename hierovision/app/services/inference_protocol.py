@@ -0,0 +1,146 @@
+"""
+Binary protocol spoken between web workers and the inference server.
+
+Every message is a fixed little-endian header followed by a variable body, so
+neither side parses JSON or text on the prediction path.
+
+Request:  header | model name (utf-8) | payload
+Response: header | body
+
+A payload is either the image bytes themselves (PAYLOAD_INLINE) or a
+descriptor naming a shared-memory segment that already holds them
+(PAYLOAD_SHM), in which case the image never crosses the socket. Either kind
+may carry the PAYLOAD_RAW_RGB8 flag, meaning the bytes are pre-decoded 224x224
+RGB images rather than an encoded file; predictions for several images come
+back as one list, top_k per image.
+
+A request's deadline is an absolute time.monotonic() value. Both ends run on
+one host (the socket is a Unix socket), so they read the same clock and the
+deadline set when the web request arrived holds unchanged on the server.
+"""
+
+import struct
+
+MAGIC = b'HV'
+PROTOCOL_VERSION = 4
+
+# Operations
+OP_PREDICT = 1
+OP_MODELS = 2
+OP_PING = 3
+OP_STATS = 4
+
+# Payload kinds
+PAYLOAD_NONE = 0
+PAYLOAD_INLINE = 1
+PAYLOAD_SHM = 2
+
+# Payload flags
+PAYLOAD_RAW_RGB8 = 0x10
+
+# Response statuses
+STATUS_OK = 0
+STATUS_ERROR = 1
+STATUS_BAD_REQUEST = 2
+STATUS_MODEL_NOT_FOUND = 3
+STATUS_DEADLINE_EXCEEDED = 4
+
+# magic, version, op, request id, top k, model name length, payload kind,
+# priority class index, deadline as time.monotonic() seconds (0 = none), payload length
+REQUEST_HEADER = struct.Struct('<2sBBIHHBBdI')
+
+# magic, version, status, request id, result count, body length
+RESPONSE_HEADER = struct.Struct('<2sBBIHI')
+
+# offset, length, segment name length (the name follows)
+SHM_DESCRIPTOR = struct.Struct('<QQH')
+
+# class index, confidence
+PREDICTION = struct.Struct('<Hf')
+
+# model key length (the key follows, then the predictions)
+MODEL_KEY = struct.Struct('<H')
+
+
+class ProtocolError(Exception):
+    """Raised when a peer sends a malformed or incompatible message."""
+
+
+def read_exact(stream, size):
+    """Read exactly size bytes from a buffered stream into a new bytearray or raise ConnectionError."""
+    data = bytearray(size)
+    if size and stream.readinto(data) != size:
+        raise ConnectionError('Connection closed mid-message')
+    return data
+
+
+def encode_request(request_id, op, model='', top_k=0, payload_kind=PAYLOAD_NONE, payload=b'',
+                   priority=0, deadline=None):
+    """Encode a request header with its model name and payload."""
+    model_bytes = model.encode('utf-8') if model else b''
+    header = REQUEST_HEADER.pack(
+        MAGIC, PROTOCOL_VERSION, op, request_id, top_k,
+        len(model_bytes), payload_kind, priority, deadline or 0.0, len(payload)
+    )
+    return header + model_bytes + payload
+
+
+def decode_request_header(data):
+    """Decode a request header into a dict, validating magic and version."""
+    (magic, version, op, request_id, top_k, model_len, payload_kind,
+     priority, deadline, payload_len) = REQUEST_HEADER.unpack(data)
+    if magic != MAGIC or version != PROTOCOL_VERSION:
+        raise ProtocolError(f"Unsupported request (magic={magic!r}, version={version})")
+    return {
+        'op': op,
+        'request_id': request_id,
+        'top_k': top_k,
+        'model_len': model_len,
+        'payload_kind': payload_kind,
+        'priority': priority,
+        'deadline': deadline or None,
+        'payload_len': payload_len
+    }
+
+
+def encode_shm_descriptor(name, offset, length):
+    """Describe where in a shared-memory segment the image bytes live."""
+    name_bytes = name.encode('utf-8')
+    return SHM_DESCRIPTOR.pack(offset, length, len(name_bytes)) + name_bytes
+
+
+def decode_shm_descriptor(data):
+    """Return (segment name, offset, length) from a PAYLOAD_SHM payload."""
+    offset, length, name_len = SHM_DESCRIPTOR.unpack_from(data)
+    name = data[SHM_DESCRIPTOR.size:SHM_DESCRIPTOR.size + name_len].decode('utf-8')
+    return name, offset, length
+
+
+def encode_response(request_id, status, body=b'', count=0):
+    """Encode a response header followed by its body."""
+    return RESPONSE_HEADER.pack(MAGIC, PROTOCOL_VERSION, status, request_id, count, len(body)) + body
+
+
+def decode_response_header(data):
+    """Return (status, request id, count, body length) from a response header."""
+    magic, version, status, request_id, count, body_len = RESPONSE_HEADER.unpack(data)
+    if magic != MAGIC or version != PROTOCOL_VERSION:
+        raise ProtocolError(f"Unsupported response (magic={magic!r}, version={version})")
+    return status, request_id, count, body_len
+
+
+def encode_predictions(model_key, predictions):
+    """Encode the resolved model key and (class index, confidence) pairs."""
+    key_bytes = model_key.encode('utf-8')
+    parts = [MODEL_KEY.pack(len(key_bytes)), key_bytes]
+    parts.extend(PREDICTION.pack(class_index, confidence) for class_index, confidence in predictions)
+    return b''.join(parts)
+
+
+def decode_predictions(body, count):
+    """Return (model key, [(class index, confidence), ...]) from a prediction body."""
+    (key_len,) = MODEL_KEY.unpack_from(body)
+    offset = MODEL_KEY.size + key_len
+    model_key = body[MODEL_KEY.size:offset].decode('utf-8')
+    predictions = [PREDICTION.unpack_from(body, offset + i * PREDICTION.size) for i in range(count)]
+    return model_key, predictions
@@ -0,0 +1,231 @@
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+
+logger = logging.getLogger(__name__)
+
+# Scheduling classes, highest priority first
+PRIORITY_CLASSES = ('interactive', 'anonymous', 'background')
+
+# Number of recent queue waits kept per class for percentile reporting
+WAIT_SAMPLE_SIZE = 1000
+
+
+class DeadlineExceeded(Exception):
+    """Raised when a job's deadline passes before the model could run it."""
+
+
+def remaining_seconds(deadline, default):
+    """
+    Seconds left until an absolute time.monotonic() deadline, or default when there is none.
+
+    Raises:
+        DeadlineExceeded: The deadline has already passed
+    """
+    if deadline is None:
+        return default
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        raise DeadlineExceeded('Request deadline exceeded')
+    return remaining
+
+
+class _QueuedJob:
+    """A job waiting in the queue together with the future its submitter waits on."""
+
+    __slots__ = ('group', 'job', 'size', 'priority', 'enqueued_at', 'deadline', 'future')
+
+    def __init__(self, group, job, size, priority, deadline):
+        self.group = group
+        self.job = job
+        self.size = size
+        self.priority = priority
+        self.enqueued_at = time.monotonic()
+        self.deadline = deadline
+        self.future = Future()
+
+
+class _ClassStats:
+    """Counters and recent queue waits for one priority class."""
+
+    def __init__(self):
+        self.submitted = 0
+        self.completed = 0
+        self.expired = 0
+        self.waits = deque(maxlen=WAIT_SAMPLE_SIZE)
+
+    def to_dict(self, depth):
+        waits = sorted(self.waits)
+
+        def percentile(pct):
+            return round(waits[min(len(waits) - 1, int(pct / 100 * len(waits)))] * 1000, 2) if waits else None
+
+        return {
+            'queued': depth,
+            'submitted': self.submitted,
+            'completed': self.completed,
+            'expired': self.expired,
+            'wait_ms': {
+                'p50': percentile(50),
+                'p95': percentile(95),
+                'max': round(waits[-1] * 1000, 2) if waits else None
+            }
+        }
+
+
+class InferenceQueue:
+    """
+    Schedules inference jobs into micro-batches for a single worker thread.
+
+    Jobs carry a priority class and a deadline. The worker always serves the
+    highest-priority class first, fills the batch with jobs for the same group
+    (the model they target) across classes in priority order, and drops jobs whose
+    deadline has passed before they reach the model.
+    """
+
+    def __init__(self, run_batch, max_batch_size=32, max_delay_ms=5.0):
+        """
+        Args:
+            run_batch: Callable(group, jobs) returning one result per job, in order
+            max_batch_size: Most images in one batch passed to run_batch
+            max_delay_ms: How long the first job may wait for a batch to fill
+        """
+        self.run_batch = run_batch
+        self.max_batch_size = max_batch_size
+        self.max_delay = max_delay_ms / 1000
+        self._pending = {priority: deque() for priority in PRIORITY_CLASSES}
+        self._stats = {priority: _ClassStats() for priority in PRIORITY_CLASSES}
+        self._condition = threading.Condition()
+        self._worker = None
+
+    def start(self):
+        """Start the worker thread."""
+        if self._worker is None:
+            self._worker = threading.Thread(target=self._work, name='inference-queue', daemon=True)
+            self._worker.start()
+
+    def submit(self, group, job, priority='interactive', deadline=None, size=1):
+        """
+        Queue a job and return a Future resolved with its result.
+
+        Args:
+            group: Key of the model the job targets; only jobs of one group share a batch
+            job: Opaque job passed to run_batch
+            priority: One of PRIORITY_CLASSES
+            deadline: time.monotonic() value after which the job is dropped, or None
+            size: Number of images in the job; a job larger than max_batch_size runs alone
+        """
+        if priority not in self._pending:
+            raise ValueError(f"Unknown priority class '{priority}'")
+
+        queued = _QueuedJob(group, job, size, priority, deadline)
+
+        with self._condition:
+            self._pending[priority].append(queued)
+            self._stats[priority].submitted += 1
+            self._condition.notify()
+        queued.future.add_done_callback(self._wake_on_cancel)
+        return queued.future
+
+    def _wake_on_cancel(self, future):
+        """Let the worker drop a job as soon as its submitter gives up on it."""
+        if future.cancelled():
+            with self._condition:
+                self._condition.notify()
+
+    def stats(self):
+        """Queue depth, throughput and recent queue wait percentiles per priority class."""
+        with self._condition:
+            return {
+                priority: self._stats[priority].to_dict(
+                    sum(1 for queued in self._pending[priority] if not queued.future.cancelled())
+                )
+                for priority in PRIORITY_CLASSES
+            }
+
+    def _depth(self):
+        """Images waiting in the queue."""
+        return sum(queued.size for jobs in self._pending.values() for queued in jobs)
+
+    def _is_live(self, queued, now):
+        """Drop a job whose deadline passed or whose submitter stopped waiting."""
+        if not queued.future.cancelled() and (queued.deadline is None or queued.deadline > now):
+            return True
+
+        self._stats[queued.priority].expired += 1
+        if queued.future.set_running_or_notify_cancel():
+            queued.future.set_exception(DeadlineExceeded('Request deadline exceeded while queued'))
+        return False
+
+    def _next_batch(self):
+        """Block until a batch is ready and remove it from the queue."""
+        with self._condition:
+            while True:
+                while not self._depth():
+                    self._condition.wait()
+
+                # Give concurrent requests a moment to join the batch
+                deadline = time.monotonic() + self.max_delay
+                while self._depth() < self.max_batch_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._condition.wait(remaining)
+
+                now = time.monotonic()
+                group = None
+                batch = []
+                images = 0
+                for priority in PRIORITY_CLASSES:
+                    kept = deque()
+                    for queued in self._pending[priority]:
+                        if not self._is_live(queued, now):
+                            continue
+                        if group is None:
+                            group = queued.group
+                        # The first job always runs, even when it alone exceeds the batch size
+                        if queued.group == group and (not batch or images + queued.size <= self.max_batch_size):
+                            batch.append(queued)
+                            images += queued.size
+                        else:
+                            kept.append(queued)
+                    self._pending[priority] = kept
+
+                if not batch:
+                    continue  # Everything queued had expired
+
+                for queued in batch:
+                    self._stats[queued.priority].waits.append(now - queued.enqueued_at)
+
+                return group, batch
+
+    def _work(self):
+        while True:
+            group, batch = self._next_batch()
+
+            # Submitters that gave up after the batch was formed have cancelled their futures
+            running = [queued for queued in batch if queued.future.set_running_or_notify_cancel()]
+            if len(running) < len(batch):
+                with self._condition:
+                    for queued in batch:
+                        if queued.future.cancelled():
+                            self._stats[queued.priority].expired += 1
+            batch = running
+            if not batch:
+                continue
+
+            try:
+                results = self.run_batch(group, [queued.job for queued in batch])
+                for queued, result in zip(batch, results):
+                    queued.future.set_result(result)
+            except Exception as e:
+                logger.error(f"Inference batch for {group} failed: {e}")
+                for queued in batch:
+                    queued.future.set_exception(e)
+                continue
+
+            with self._condition:
+                for queued in batch:
+                    self._stats[queued.priority].completed += 1
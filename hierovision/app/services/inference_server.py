@@ -0,0 +1,193 @@
+import io
+import json
+import logging
+import os
+import socketserver
+from contextlib import contextmanager
+from multiprocessing import resource_tracker, shared_memory
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from app.services import inference_protocol as protocol
+from app.services.inference_queue import InferenceQueue, DeadlineExceeded, PRIORITY_CLASSES, remaining_seconds
+from app.services.ml_service import PredictJob, run_predict_batch
+from app.services.model_registry import build_model_registry, ModelNotFoundError
+from app.utils.file_handler import raw_image_count
+
+logger = logging.getLogger(__name__)
+
+
+class _InferenceRequestHandler(socketserver.StreamRequestHandler):
+    """Serves binary protocol requests from one web worker connection until it closes."""
+
+    def handle(self):
+        while True:
+            header_bytes = self.rfile.read(protocol.REQUEST_HEADER.size)
+            if len(header_bytes) < protocol.REQUEST_HEADER.size:
+                return  # Client closed the connection
+
+            try:
+                header = protocol.decode_request_header(header_bytes)
+                model = protocol.read_exact(self.rfile, header['model_len']).decode('utf-8')
+                payload = protocol.read_exact(self.rfile, header['payload_len'])
+            except (ConnectionError, protocol.ProtocolError) as e:
+                logger.warning(f"Dropping inference connection: {e}")
+                return
+
+            self.wfile.write(self.server.dispatch(header, model, payload))
+
+
+class InferenceServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """
+    Owns the classification models and serves predictions over a Unix socket.
+
+    Each connection is handled on its own thread, which decodes and preprocesses
+    the image; the model itself runs on the inference queue's single worker so
+    concurrent requests are batched together.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, socket_path, registry, max_batch_size=32, max_delay_ms=5.0, timeout=30.0):
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+
+        super().__init__(socket_path, _InferenceRequestHandler)
+        self.socket_path = socket_path
+        self.registry = registry
+        self.timeout = timeout
+        self.queue = InferenceQueue(run_predict_batch, max_batch_size=max_batch_size, max_delay_ms=max_delay_ms)
+
+    def dispatch(self, header, model, payload):
+        """Handle one decoded request and return the encoded response."""
+        request_id = header['request_id']
+        try:
+            if header['op'] == protocol.OP_PREDICT:
+                return self._predict(header, model, payload)
+
+            if header['op'] == protocol.OP_MODELS:
+                body = json.dumps({
+                    'default_model': self.registry.default_key,
+                    'models': self.registry.list_models()
+                }).encode('utf-8')
+                return protocol.encode_response(request_id, protocol.STATUS_OK, body)
+
+            if header['op'] == protocol.OP_STATS:
+                body = json.dumps(self.queue.stats()).encode('utf-8')
+                return protocol.encode_response(request_id, protocol.STATUS_OK, body)
+
+            if header['op'] == protocol.OP_PING:
+                return protocol.encode_response(request_id, protocol.STATUS_OK)
+
+            return protocol.encode_response(request_id, protocol.STATUS_BAD_REQUEST, b'Unknown operation')
+
+        except ModelNotFoundError as e:
+            return protocol.encode_response(request_id, protocol.STATUS_MODEL_NOT_FOUND, str(e).encode('utf-8'))
+        except DeadlineExceeded as e:
+            return protocol.encode_response(request_id, protocol.STATUS_DEADLINE_EXCEEDED, str(e).encode('utf-8'))
+        except Exception as e:
+            logger.error(f"Inference request failed: {e}")
+            return protocol.encode_response(request_id, protocol.STATUS_ERROR, str(e).encode('utf-8'))
+
+    def _predict(self, header, model, payload):
+        request_id = header['request_id']
+        model_key = self.registry.resolve(model or None)
+
+        if header['priority'] >= len(PRIORITY_CLASSES):
+            return protocol.encode_response(request_id, protocol.STATUS_BAD_REQUEST, b'Unknown priority class')
+        priority = PRIORITY_CLASSES[header['priority']]
+        deadline = header['deadline']
+        remaining_seconds(deadline, self.timeout)  # Drop requests that expired on the way here
+
+        raw = header['payload_kind'] & protocol.PAYLOAD_RAW_RGB8
+        payload_kind = header['payload_kind'] & ~protocol.PAYLOAD_RAW_RGB8
+
+        with self.registry.lease(model_key) as predictor:
+            try:
+                # Preprocessing copies the pixels, so the segment is unmapped before the model runs
+                with self._image_buffer(payload_kind, payload) as images:
+                    if raw:
+                        tensor = predictor.preprocess_raw(images, raw_image_count(len(images)))
+                    else:
+                        tensor = predictor.preprocess(io.BytesIO(images))
+            except Exception as e:
+                return protocol.encode_response(request_id, protocol.STATUS_BAD_REQUEST, f"Invalid image: {e}".encode('utf-8'))
+
+            top_k = max(1, min(header['top_k'] or 1, predictor.num_classes))
+            timeout = remaining_seconds(deadline, self.timeout)
+            future = self.queue.submit(
+                model_key, PredictJob(predictor, tensor, top_k), priority, deadline, size=len(tensor)
+            )
+            try:
+                results = future.result(timeout=timeout)
+            except FutureTimeoutError:
+                future.cancel()
+                raise DeadlineExceeded('Request deadline exceeded')
+
+        predictions = [prediction for image_predictions in results for prediction in image_predictions]
+        body = protocol.encode_predictions(model_key, predictions)
+        return protocol.encode_response(request_id, protocol.STATUS_OK, body, count=len(predictions))
+
+    @contextmanager
+    def _image_buffer(self, payload_kind, payload):
+        """
+        Yield a writable buffer over the request's image bytes.
+
+        A shared-memory segment is mapped for this request only: the client may
+        unlink it after a failed request, and a mapping shared between requests
+        could be closed while another handler thread still reads from it.
+        """
+        if payload_kind == protocol.PAYLOAD_INLINE:
+            yield payload
+            return
+
+        if payload_kind != protocol.PAYLOAD_SHM:
+            raise ValueError('Request has no image payload')
+
+        name, offset, length = protocol.decode_shm_descriptor(payload)
+        segment = shared_memory.SharedMemory(name=name)
+        # The client owns the segment; stop this process's resource tracker
+        # from unlinking it when the mapping is closed
+        resource_tracker.unregister(segment._name, 'shared_memory')
+        view = segment.buf[offset:offset + length]
+        try:
+            yield view
+        finally:
+            try:
+                view.release()
+                segment.close()
+            except BufferError:
+                # A failed preprocess can still reference the view from its traceback;
+                # the mapping is closed when that is garbage-collected
+                pass
+
+    def server_close(self):
+        super().server_close()
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+
+def serve(config):
+    """
+    Load the default model and serve predictions until interrupted.
+
+    Args:
+        config: Mapping with the same keys as the Flask app configuration
+    """
+    registry = build_model_registry(config)
+
+    # Load the default model before accepting connections so the first request is not slow
+    registry.get_default()
+
+    server = InferenceServer(
+        config['INFERENCE_SOCKET_PATH'],
+        registry,
+        max_batch_size=config.get('INFERENCE_MAX_BATCH_SIZE', 32),
+        max_delay_ms=config.get('INFERENCE_MAX_BATCH_DELAY_MS', 5.0),
+        timeout=config.get('INFERENCE_TIMEOUT', 30.0)
+    )
+    server.queue.start()
+
+    logger.info(f"Inference server listening on {config['INFERENCE_SOCKET_PATH']}")
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
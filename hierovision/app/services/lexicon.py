@@ -0,0 +1,154 @@
+"""
+English-to-hieroglyph lexicon used for text translation.
+
+Entries (single words or multi-word phrases) are compiled once into a word trie.
+Translation walks the trie from each position and takes the longest phrase
+that matches, so the cost per word depends on phrase length, not vocabulary size.
+"""
+
+import json
+import os
+import re
+import unicodedata
+
+LEXICON_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'english_lexicon.json')
+
+_WORD_PATTERN = re.compile(r"[a-z0-9]+(?:'[a-z]+)?")
+
+_APOSTROPHES = str.maketrans({'’': "'", '‘': "'", 'ʼ': "'", '`': "'"})
+
+# (suffix, replacement) pairs tried in order when a word is not in the lexicon as written
+_SUFFIX_RULES = (
+    ("'s", ''), ("s'", ''),
+    ('ies', 'y'), ('ves', 'f'), ('ves', 'fe'), ('es', ''), ('s', ''),
+    ('ing', ''), ('ing', 'e'), ('ed', ''), ('ed', 'e'),
+)
+
+# Words shorter than this are never stemmed ('is', 'as', 'bed')
+MIN_STEM_LENGTH = 3
+
+
+def normalize(text):
+    """Lower-case text, fold compatibility characters and unify apostrophes."""
+    return unicodedata.normalize('NFKC', text).translate(_APOSTROPHES).lower()
+
+
+def tokenize(text):
+    """Split text into normalized words, dropping punctuation."""
+    return _WORD_PATTERN.findall(normalize(text))
+
+
+def word_forms(word):
+    """Return the word followed by its candidate stems, most likely first."""
+    forms = [word]
+    for suffix, replacement in _SUFFIX_RULES:
+        if word.endswith(suffix):
+            stem = word[:-len(suffix)] + replacement
+            if len(stem) >= MIN_STEM_LENGTH and stem not in forms:
+                forms.append(stem)
+    return forms
+
+
+class _PhraseNode:
+    __slots__ = ('children', 'glyphs')
+
+    def __init__(self):
+        self.children = {}
+        self.glyphs = None
+
+
+class Lexicon:
+    """Compiled phrase trie mapping English words and phrases to hieroglyphs."""
+
+    def __init__(self, entries, fallback, empty):
+        """
+        Args:
+            entries: Mapping of English word or phrase to its hieroglyphs
+            fallback: Hieroglyphs written for a word the lexicon does not know
+            empty: Hieroglyphs returned when the text has no words at all
+        """
+        self.fallback = fallback
+        self.empty = empty
+        self.size = 0
+        self._root = _PhraseNode()
+
+        for phrase, glyphs in entries.items():
+            words = tokenize(phrase)
+            if not words:
+                continue
+            node = self._root
+            for word in words:
+                node = node.children.setdefault(word, _PhraseNode())
+            node.glyphs = glyphs
+            self.size += 1
+
+    @classmethod
+    def load(cls, path=LEXICON_PATH):
+        """Load the lexicon from its JSON data file."""
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        return cls(data['entries'], data['fallback'], data['empty'])
+
+    def _longest_match(self, forms, start):
+        """Return (end, node) for the longest entry starting at word start, or (start, None)."""
+        node = self._root
+        best = (start, None)
+        for position in range(start, len(forms)):
+            for form in forms[position]:
+                child = node.children.get(form)
+                if child is not None:
+                    node = child
+                    break
+            else:
+                break
+            if node.glyphs is not None:
+                best = (position + 1, node)
+        return best
+
+    def translate(self, text):
+        """
+        Translate English text into hieroglyphs.
+
+        Returns:
+            dict: hieroglyphs, transliteration, confidence_score (share of words
+            the lexicon recognised) and the list of unknown words
+        """
+        words = tokenize(text)
+        if not words:
+            return {'hieroglyphs': self.empty, 'transliteration': '', 'confidence_score': 0.0, 'unknown_words': []}
+
+        forms = [word_forms(word) for word in words]
+        hieroglyphs = []
+        transliteration = []
+        unknown = []
+        position = 0
+        while position < len(words):
+            end, node = self._longest_match(forms, position)
+            if node is None:
+                hieroglyphs.append(self.fallback)
+                transliteration.append(words[position])
+                unknown.append(words[position])
+                position += 1
+            else:
+                hieroglyphs.append(node.glyphs)
+                transliteration.append(' '.join(words[position:end]))
+                position = end
+
+        return {
+            'hieroglyphs': ' '.join(hieroglyphs),
+            'transliteration': ' '.join(transliteration),
+            'confidence_score': round(1 - len(unknown) / len(words), 2),
+            'unknown_words': unknown
+        }
+
+
+# Global lexicon instance
+lexicon = None
+
+
+def get_lexicon():
+    """Get or load the process-wide lexicon."""
+    global lexicon
+    if lexicon is None:
+        lexicon = Lexicon.load()
+    return lexicon
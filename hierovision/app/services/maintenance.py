@@ -0,0 +1,437 @@
+"""
+Database maintenance for SQLite: planner statistics and free-space reclamation.
+
+Tasks:
+    optimize  PRAGMA optimize with a bounded analysis_limit; cheap, and only
+              re-analyzes tables whose statistics look stale
+    analyze   A full ANALYZE, so the planner's statistics match the data
+    vacuum    Hands free pages back to the filesystem: PRAGMA incremental_vacuum
+              in steps when auto_vacuum is INCREMENTAL, otherwise one full
+              VACUUM once enough of the file is free (which also switches the
+              database to incremental mode), then truncates the WAL
+
+Every run is recorded in maintenance_runs, which is also how several worker
+processes agree on when a task last ran. Only completed runs start a task's
+interval; one that was interrupted, timed out or failed is retried after
+MAINTENANCE_RETRY_MINUTES, doubling for each consecutive such run. Each run has a time budget enforced
+through SQLite's progress handler: a statement still running when the budget
+is spent is interrupted and rolled back, while incremental vacuum keeps the
+steps it finished. The optional in-process scheduler only starts a task when
+its worker has had little traffic, and interrupts it as soon as a request
+arrives. Other workers may still be writing, so it only runs optimize and the
+incremental vacuum steps, each statement limited to
+MAINTENANCE_STATEMENT_BUDGET_SECONDS so no writer waits out its busy timeout;
+the full ANALYZE and the full VACUUM hold the write lock for as long as they
+take and are left to scripts/run_maintenance.py, which runs the same tasks
+from the command line or cron.
+"""
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import deque, namedtuple
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from flask import g
+from sqlalchemy import select
+from app.extensions import db
+from app.models.maintenance_run import MaintenanceRun
+
+logger = logging.getLogger(__name__)
+
+MaintenanceTask = namedtuple('MaintenanceTask', ['name', 'interval', 'budget', 'run'])
+
+# Pages freed per incremental_vacuum step; each step commits on its own
+VACUUM_STEP_PAGES = 1000
+
+# SQLite virtual machine instructions between two budget checks
+_PROGRESS_INSTRUCTIONS = 10000
+
+_AUTO_VACUUM_MODES = {0: 'NONE', 1: 'FULL', 2: 'INCREMENTAL'}
+
+# Run statuses that count as the task having been done
+_COMPLETED = ('ok', 'skipped')
+
+# Latest runs read to find the last completed one and the retry backoff
+_HISTORY_LIMIT = 10
+
+# Tasks the in-process scheduler runs; the others hold the write lock unbounded
+SCHEDULED_TASKS = ('optimize', 'vacuum')
+
+
+class _Deferred(Exception):
+    """A task needs a statement a scheduled run may not execute; left to scripts/run_maintenance.py."""
+
+
+class RequestLoad:
+    """Requests in flight in this worker and how many started in the last minute."""
+
+    def __init__(self, window_seconds=60):
+        self.window = window_seconds
+        self.active = 0
+        self._starts = deque()
+        self._lock = threading.Lock()
+
+    def started(self):
+        now = time.monotonic()
+        with self._lock:
+            self.active += 1
+            self._starts.append(now)
+            self._prune(now)
+
+    def finished(self):
+        with self._lock:
+            self.active = max(0, self.active - 1)
+
+    def per_minute(self):
+        with self._lock:
+            self._prune(time.monotonic())
+            return len(self._starts) * 60 / self.window
+
+    def _prune(self, now):
+        while self._starts and self._starts[0] < now - self.window:
+            self._starts.popleft()
+
+
+class _Budget:
+    """
+    Decides when a running task must stop: its deadline or the current
+    statement's passed, or requests arrived.
+    """
+
+    def __init__(self, seconds, load=None, statement_seconds=None):
+        self.deadline = time.monotonic() + seconds if seconds else None
+        self.load = load
+        self.statement_seconds = statement_seconds
+        self.statement_deadline = None
+        self.reason = None
+
+    @property
+    def bounded(self):
+        """Whether every statement has its own limit, i.e. unbounded statements are not allowed."""
+        return self.statement_seconds is not None
+
+    @contextmanager
+    def statement(self):
+        """Apply the per-statement limit to the statement run inside the block."""
+        if self.bounded:
+            self.statement_deadline = time.monotonic() + self.statement_seconds
+        try:
+            yield
+        finally:
+            self.statement_deadline = None
+
+    def exceeded(self):
+        if self.reason is None:
+            now = time.monotonic()
+            if any(deadline is not None and now > deadline for deadline in (self.deadline, self.statement_deadline)):
+                self.reason = 'timeout'
+            elif self.load is not None and self.load.active > 0:
+                self.reason = 'interrupted'
+        return self.reason is not None
+
+
+def _pragma(connection, name):
+    return connection.execute(f"PRAGMA {name}").fetchone()[0]
+
+
+def _optimize(connection, config, budget):
+    connection.execute(f"PRAGMA analysis_limit = {config['MAINTENANCE_ANALYSIS_LIMIT']}")
+    with budget.statement():
+        connection.execute('PRAGMA optimize').fetchall()
+    return 'statistics refreshed where stale'
+
+
+def _analyze(connection, config, budget):
+    if budget.bounded:
+        raise _Deferred('a full ANALYZE is left to scripts/run_maintenance.py')
+    connection.execute('PRAGMA analysis_limit = 0')
+    connection.execute('ANALYZE')
+    tables = connection.execute('SELECT count(DISTINCT tbl) FROM sqlite_stat1').fetchone()[0]
+    return f"analyzed {tables} tables"
+
+
+def _vacuum(connection, config, budget):
+    page_size = _pragma(connection, 'page_size')
+    free = _pragma(connection, 'freelist_count')
+    pages = _pragma(connection, 'page_count')
+    mode = _AUTO_VACUUM_MODES.get(_pragma(connection, 'auto_vacuum'), 'NONE')
+
+    if mode == 'INCREMENTAL':
+        freed = 0
+        while free and not budget.exceeded():
+            with budget.statement():
+                connection.execute(f"PRAGMA incremental_vacuum({VACUUM_STEP_PAGES})").fetchall()
+            remaining = _pragma(connection, 'freelist_count')
+            if remaining >= free:
+                break
+            freed, free = freed + free - remaining, remaining
+        detail = f"freed {freed * page_size / 2**20:.1f} MB, {free * page_size / 2**20:.1f} MB still free"
+    elif mode == 'NONE' and pages and free / pages >= config['MAINTENANCE_VACUUM_MIN_FREE_RATIO']:
+        if budget.bounded:
+            raise _Deferred(
+                f"{free * page_size / 2**20:.1f} MB free needs a full VACUUM, left to scripts/run_maintenance.py"
+            )
+        # A full VACUUM is the only way to shrink the file; it also applies the incremental mode
+        connection.execute('PRAGMA auto_vacuum = INCREMENTAL')
+        connection.execute('VACUUM')
+        detail = f"full VACUUM freed {free * page_size / 2**20:.1f} MB; auto_vacuum is now INCREMENTAL"
+    else:
+        detail = f"{free * page_size / 2**20:.1f} MB free of {pages * page_size / 2**20:.1f} MB (auto_vacuum {mode}), nothing to do"
+
+    if _pragma(connection, 'journal_mode') == 'wal':
+        with budget.statement():
+            connection.execute('PRAGMA wal_checkpoint(TRUNCATE)').fetchall()
+    return detail
+
+
+def get_tasks(config):
+    """Maintenance tasks with their intervals and time budgets from the app config."""
+    return {
+        name: MaintenanceTask(
+            name,
+            timedelta(hours=config[f"MAINTENANCE_{name.upper()}_INTERVAL_HOURS"]),
+            config[f"MAINTENANCE_{name.upper()}_BUDGET_SECONDS"],
+            run
+        )
+        for name, run in (('optimize', _optimize), ('analyze', _analyze), ('vacuum', _vacuum))
+    }
+
+
+def _recent_runs(conn, task, trigger):
+    """
+    (started_at, status) of the task's latest runs, newest first.
+
+    Deferred runs only count for the scheduler, so they hold it back without
+    delaying the command line run that can do the task.
+    """
+    runs = MaintenanceRun.__table__
+    query = select(runs.c.started_at, runs.c.status).where(runs.c.task == task.name)
+    if trigger != 'scheduler':
+        query = query.where(runs.c.status != 'deferred')
+    return conn.execute(query.order_by(runs.c.started_at.desc()).limit(_HISTORY_LIMIT)).all()
+
+
+def _next_due(task, recent, retry, now):
+    """
+    When a task is next due, given its recent runs; None when it is due now.
+
+    A completed run makes the task due again after its interval. Later runs
+    that did not complete (or are still running, or died with their worker)
+    make it due retry after the latest of them, doubled for each consecutive
+    one and at most the interval.
+    """
+    due = None
+    incomplete = 0
+    for started_at, status in recent:
+        if status in _COMPLETED:
+            due = started_at + task.interval
+            break
+        incomplete += 1
+    if incomplete:
+        retry_at = recent[0][0] + min(retry * 2 ** (incomplete - 1), task.interval)
+        due = max(due, retry_at) if due else retry_at
+    return due if due is not None and due > now else None
+
+
+def _retry_delay(config):
+    return timedelta(minutes=config['MAINTENANCE_RETRY_MINUTES'])
+
+
+def _claim(task, trigger, force, retry):
+    """
+    Record a run of task as started, unless it is not due (see _next_due).
+
+    Runs on the primary engine in one transaction, so two workers checking at
+    the same moment cannot both claim it.
+
+    Returns:
+        int: The new run's id, or None when the task is not due
+    """
+    runs = MaintenanceRun.__table__
+    now = datetime.utcnow()
+    with db.engine.begin() as conn:
+        if not force and _next_due(task, _recent_runs(conn, task, trigger), retry, now) is not None:
+            return None
+        return conn.execute(runs.insert().values(
+            task=task.name, trigger=trigger, status='running', started_at=now
+        )).inserted_primary_key[0]
+
+
+def _finish(run_id, status, started, detail, history_days):
+    runs = MaintenanceRun.__table__
+    now = datetime.utcnow()
+    with db.engine.begin() as conn:
+        conn.execute(runs.update().where(runs.c.id == run_id).values(
+            status=status, finished_at=now, duration_ms=int((time.monotonic() - started) * 1000), detail=detail
+        ))
+        conn.execute(runs.delete().where(runs.c.started_at < now - timedelta(days=history_days)))
+
+
+def run_task(name, config, trigger='cli', force=False, budget_seconds=None, load=None, note=None,
+             statement_seconds=None):
+    """
+    Run one maintenance task if it is due (or force is set) and record the run.
+
+    Args:
+        name: Task name, a key of get_tasks()
+        config: The app config
+        trigger: 'cli' or 'scheduler', stored with the run
+        force: Run even if the task ran within its interval
+        budget_seconds: Time budget overriding the configured one; 0 for none
+        load: RequestLoad whose requests interrupt the task, or None
+        note: Text prepended to the recorded detail
+        statement_seconds: Limit for each statement, or None for none; a task
+            that needs an unbounded statement (full ANALYZE, full VACUUM) is
+            then recorded as 'deferred' without running it
+
+    Returns:
+        dict: The recorded run, or None when the task was not due
+    """
+    task = get_tasks(config)[name]
+    run_id = _claim(task, trigger, force, _retry_delay(config))
+    if run_id is None:
+        return None
+
+    started = time.monotonic()
+    budget = _Budget(task.budget if budget_seconds is None else budget_seconds, load, statement_seconds)
+    engine = db.engine
+    if engine.dialect.name != 'sqlite':
+        status, detail = 'skipped', f"SQLite only; {engine.dialect.name} relies on its own autovacuum"
+    else:
+        raw = engine.raw_connection()
+        connection = raw.driver_connection
+        connection.set_progress_handler(budget.exceeded, _PROGRESS_INSTRUCTIONS)
+        try:
+            detail = task.run(connection, config, budget)
+            status = budget.reason or 'ok'
+        except _Deferred as e:
+            status, detail = 'deferred', str(e)
+        except Exception as e:
+            if isinstance(e, sqlite3.OperationalError) and budget.reason is not None:
+                status = budget.reason
+                cause = 'time budget spent' if status == 'timeout' else 'a request arrived'
+                detail = f"stopped, {cause}; the unfinished statement was rolled back"
+            else:
+                logger.error(f"Maintenance task {name} failed: {e}")
+                status, detail = 'failed', str(e)
+        finally:
+            connection.set_progress_handler(None, 0)
+            raw.close()
+
+    if note:
+        detail = f"{note}; {detail}"
+    _finish(run_id, status, started, detail, config['MAINTENANCE_HISTORY_DAYS'])
+    logger.info(f"Maintenance task {name}: {status} ({detail})")
+    return MaintenanceRun.query.get(run_id).to_dict()
+
+
+def maintenance_status(config, trigger='cli'):
+    """
+    The latest run of every task and when it is next due for trigger.
+
+    Returns:
+        dict: Task name -> {'last_run': dict or None, 'next_due': ISO timestamp or None (due now)}
+    """
+    status = {}
+    now = datetime.utcnow()
+    for name, task in get_tasks(config).items():
+        last = (
+            MaintenanceRun.query.filter_by(task=name)
+            .order_by(MaintenanceRun.started_at.desc()).first()
+        )
+        with db.engine.connect() as conn:
+            next_due = _next_due(task, _recent_runs(conn, task, trigger), _retry_delay(config), now)
+        status[name] = {
+            'last_run': last.to_dict() if last else None,
+            'next_due': next_due.isoformat() if next_due else None
+        }
+    return status
+
+
+def _lower_thread_priority():
+    """Give the calling thread the lowest CPU priority (Linux schedules threads individually)."""
+    try:
+        os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), 19)
+    except (AttributeError, OSError):
+        pass
+
+
+class MaintenanceScheduler:
+    """
+    Background thread that runs due maintenance tasks while the worker is quiet.
+
+    Every MAINTENANCE_CHECK_INTERVAL_SECONDS it looks for due SCHEDULED_TASKS.
+    A due task is postponed while a request is in flight or more than
+    MAINTENANCE_MAX_REQUESTS_PER_MINUTE started in the last minute, and a
+    running task is interrupted as soon as a request arrives. This only sees
+    its own worker's requests, so every statement is also held to
+    MAINTENANCE_STATEMENT_BUDGET_SECONDS.
+    """
+
+    def __init__(self, app, load):
+        self.app = app
+        self.load = load
+        self.postponed = {}
+        self._stop = threading.Event()
+        self._worker = None
+
+    def start(self):
+        if self._worker is None:
+            self._worker = threading.Thread(target=self._work, name='db-maintenance', daemon=True)
+            self._worker.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _work(self):
+        _lower_thread_priority()
+        while not self._stop.wait(self.app.config['MAINTENANCE_CHECK_INTERVAL_SECONDS']):
+            try:
+                with self.app.app_context():
+                    self.tick()
+            except Exception as e:
+                logger.error(f"Maintenance scheduler error: {e}")
+
+    def busy(self):
+        return self.load.active > 0 or self.load.per_minute() > self.app.config['MAINTENANCE_MAX_REQUESTS_PER_MINUTE']
+
+    def tick(self):
+        """Run every scheduled task that is due, unless the worker is busy."""
+        config = self.app.config
+        for name, entry in maintenance_status(config, trigger='scheduler').items():
+            if name not in SCHEDULED_TASKS or entry['next_due'] is not None:
+                continue
+            if self.busy():
+                self.postponed[name] = self.postponed.get(name, 0) + 1
+                continue
+            postponed = self.postponed.pop(name, 0)
+            note = f"postponed {postponed} times by request load" if postponed else None
+            run_task(
+                name, config, trigger='scheduler', load=self.load, note=note,
+                statement_seconds=config['MAINTENANCE_STATEMENT_BUDGET_SECONDS']
+            )
+            db.session.remove()
+
+
+def init_maintenance(app):
+    """Count this worker's requests and, when MAINTENANCE_SCHEDULER is set, start the scheduler."""
+    load = RequestLoad()
+    app.extensions['request_load'] = load
+
+    @app.before_request
+    def _count_request():
+        g.maintenance_counted = True
+        load.started()
+
+    @app.teardown_request
+    def _uncount_request(exc):
+        if g.pop('maintenance_counted', False):
+            load.finished()
+
+    if app.config['MAINTENANCE_SCHEDULER']:
+        scheduler = MaintenanceScheduler(app, load)
+        app.extensions['maintenance_scheduler'] = scheduler
+        scheduler.start()
@@ -0,0 +1,230 @@
+import logging
+import re
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from functools import partial
+from flask import current_app
+
+logger = logging.getLogger(__name__)
+
+
+class ModelNotFoundError(LookupError):
+    """Raised when a requested model is not declared in the registry."""
+
+
+class _LoadedModel:
+    """A resident predictor together with its reference count and memory footprint."""
+
+    def __init__(self, predictor, memory_bytes):
+        self.predictor = predictor
+        self.memory_bytes = memory_bytes
+        self.refcount = 0
+
+
+def _version_sort_key(version):
+    """Sort versions naturally so that '10' comes after '9'."""
+    return [int(part) if part.isdigit() else part for part in re.split(r'(\d+)', version)]
+
+
+class ModelRegistry:
+    """
+    Loads classification models by name and version on demand.
+
+    Models are shared across requests and reference counted while in use. When the
+    resident models exceed the memory budget, idle models are evicted in
+    least-recently-used order. The default model is pinned and never evicted.
+    """
+
+    def __init__(self, models, default_model, loader, memory_budget_mb=None):
+        """
+        Args:
+            models: Mapping of model name -> version -> spec dict (must include 'path')
+            default_model: Reference ('name' or 'name:version') used when none is requested
+            loader: Callable taking a spec dict and returning a loaded predictor
+            memory_budget_mb: Soft limit for resident model memory, or None for unlimited
+        """
+        self.models = models
+        self.loader = loader
+        self.memory_budget = memory_budget_mb * 1024 * 1024 if memory_budget_mb else None
+        self.default_key = self.resolve(default_model)
+        self._loaded = OrderedDict()
+        self._load_locks = {}
+        self._lock = threading.Lock()
+
+    def resolve(self, model_ref=None):
+        """
+        Resolve a model reference to its canonical 'name:version' key.
+
+        A bare name selects the highest declared version of that model.
+        """
+        if not model_ref:
+            return self.default_key
+
+        name, _, version = model_ref.partition(':')
+        versions = self.models.get(name)
+        if not versions:
+            raise ModelNotFoundError(f"Unknown model '{model_ref}'")
+
+        if not version:
+            version = max(versions, key=_version_sort_key)
+        elif version not in versions:
+            raise ModelNotFoundError(f"Unknown model '{model_ref}'")
+
+        return f"{name}:{version}"
+
+    def acquire(self, model_ref=None):
+        """Return the predictor for a model, loading it if needed, and take a reference."""
+        key = self.resolve(model_ref)
+
+        with self._lock:
+            entry = self._loaded.get(key)
+            if entry is not None:
+                entry.refcount += 1
+                self._loaded.move_to_end(key)
+                return entry.predictor
+            load_lock = self._load_locks.setdefault(key, threading.Lock())
+
+        # Load outside the registry lock so other models stay available, but only
+        # once per key even when several requests ask for the same cold model
+        with load_lock:
+            with self._lock:
+                entry = self._loaded.get(key)
+                if entry is not None:
+                    entry.refcount += 1
+                    self._loaded.move_to_end(key)
+                    return entry.predictor
+
+            name, version = key.split(':', 1)
+            logger.info(f"Loading model {key}")
+            predictor = self.loader(self.models[name][version])
+
+            with self._lock:
+                entry = _LoadedModel(predictor, getattr(predictor, 'memory_bytes', 0))
+                entry.refcount = 1
+                self._loaded[key] = entry
+                self._evict()
+
+            return predictor
+
+    def release(self, model_ref=None):
+        """Drop a reference taken by acquire()."""
+        key = self.resolve(model_ref)
+
+        with self._lock:
+            entry = self._loaded.get(key)
+            if entry is None or entry.refcount == 0:
+                logger.warning(f"Release of model {key} without a matching acquire")
+                return
+            entry.refcount -= 1
+            self._evict()
+
+    @contextmanager
+    def lease(self, model_ref=None):
+        """Context manager yielding a predictor that stays resident for the duration of the block."""
+        key = self.resolve(model_ref)
+        predictor = self.acquire(key)
+        try:
+            yield predictor
+        finally:
+            self.release(key)
+
+    def get_default(self):
+        """Return the pinned default predictor without taking a reference."""
+        with self._lock:
+            entry = self._loaded.get(self.default_key)
+            if entry is not None:
+                self._loaded.move_to_end(self.default_key)
+                return entry.predictor
+
+        # The default model is never evicted, so it can be handed out without holding a reference
+        with self.lease(self.default_key) as predictor:
+            return predictor
+
+    def resident_bytes(self):
+        """Total estimated memory of the loaded models."""
+        return sum(entry.memory_bytes for entry in self._loaded.values())
+
+    def list_models(self):
+        """Describe every declared model and whether it is currently loaded."""
+        with self._lock:
+            models = []
+            for name in sorted(self.models):
+                for version in sorted(self.models[name], key=_version_sort_key):
+                    key = f"{name}:{version}"
+                    entry = self._loaded.get(key)
+                    models.append({
+                        'model': key,
+                        'default': key == self.default_key,
+                        'loaded': entry is not None,
+                        'in_use': entry.refcount if entry else 0,
+                        'memory_mb': round(entry.memory_bytes / (1024 * 1024), 2) if entry else None
+                    })
+            return models
+
+    def _evict(self):
+        """Evict idle models, least recently used first, until within the memory budget."""
+        if self.memory_budget is None:
+            return
+
+        for key in list(self._loaded):
+            if self.resident_bytes() <= self.memory_budget:
+                return
+
+            entry = self._loaded[key]
+            if entry.refcount > 0 or key == self.default_key:
+                continue
+
+            del self._loaded[key]
+            logger.info(f"Evicted model {key} ({entry.memory_bytes / (1024 * 1024):.1f} MB) to stay within memory budget")
+
+        if self.resident_bytes() > self.memory_budget:
+            logger.warning("Models in use exceed the memory budget; nothing left to evict")
+
+
+def _load_predictor(spec, execution_mode='eager', compile_cache_dir=None):
+    """Build a HieroglyphPredictor for a registry spec."""
+    from app.services.ml_service import HieroglyphPredictor
+
+    return HieroglyphPredictor(
+        spec['path'],
+        num_classes=spec.get('num_classes', 253),
+        execution_mode=spec.get('execution_mode', execution_mode),
+        compile_cache_dir=compile_cache_dir
+    )
+
+
+def build_model_registry(config):
+    """
+    Build a model registry from a configuration mapping.
+
+    Args:
+        config: Flask app.config or any mapping with the same keys
+    """
+    # The configured classification model is always available as gardner:1
+    models = {'gardner': {'1': {'path': config['CLASSIFICATION_MODEL_PATH']}}}
+    for name, versions in config.get('MODEL_REGISTRY', {}).items():
+        models.setdefault(name, {}).update(versions)
+
+    return ModelRegistry(
+        models,
+        config.get('DEFAULT_MODEL', 'gardner:1'),
+        loader=partial(
+            _load_predictor,
+            execution_mode=config.get('INFERENCE_EXECUTION_MODE', 'eager'),
+            compile_cache_dir=config.get('INFERENCE_COMPILE_CACHE_DIR')
+        ),
+        memory_budget_mb=config.get('MODEL_MEMORY_BUDGET_MB')
+    )
+
+
+# Global registry instance
+registry = None
+
+
+def get_model_registry():
+    """Get or create the global model registry from the app configuration."""
+    global registry
+    if registry is None:
+        registry = build_model_registry(current_app.config)
+    return registry
@@ -0,0 +1,157 @@
+"""
+Streaming export of a user's scan history.
+
+Scans are read in keyset-paginated batches and written out as they arrive, so
+the first bytes leave as soon as the first batch is read and memory use does
+not grow with the size of the history. Formats: NDJSON (one scan per line),
+CSV, and a zip holding scans.ndjson plus the scan images, written by zipfile
+into an unseekable buffer that is drained after every write.
+"""
+
+import csv
+import io
+import json
+import os
+import time
+import zipfile
+from app.extensions import db
+from app.models.scan import Scan
+from app.utils.pagination import keyset_page
+
+EXPORT_FIELDS = ['id', 'user_uid', 'image_url', 'description', 'predicted_class', 'confidence_score', 'timestamp']
+
+# Text formats are sent in chunks of about this many characters; images are copied in blocks of this size
+_FLUSH_CHARS = 64 * 1024
+_COPY_CHUNK_BYTES = 64 * 1024
+
+
+def iter_scans(user_uid, batch_size):
+    """
+    Yield a user's scans as dictionaries, newest first.
+
+    Each batch is a separate indexed query and is dropped from the session
+    once serialized, so the identity map never holds more than one batch.
+    """
+    query = Scan.query.filter_by(user_uid=user_uid)
+    cursor = None
+    while True:
+        scans, cursor = keyset_page(query, (Scan.timestamp, Scan.id), batch_size, cursor)
+        for scan in scans:
+            yield scan.to_dict()
+            db.session.expunge(scan)
+        if cursor is None:
+            return
+
+
+def ndjson_chunks(scans):
+    """One JSON object per line, in chunks of about _FLUSH_CHARS."""
+    buffer = io.StringIO()
+    for scan in scans:
+        buffer.write(_json_line(scan))
+        if buffer.tell() >= _FLUSH_CHARS:
+            yield _take(buffer)
+    if buffer.tell():
+        yield _take(buffer)
+
+
+def csv_chunks(scans):
+    """A header row, then one row per scan, in chunks of about _FLUSH_CHARS."""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_FIELDS)
+    writer.writeheader()
+    yield _take(buffer)
+    for scan in scans:
+        writer.writerow(scan)
+        if buffer.tell() >= _FLUSH_CHARS:
+            yield _take(buffer)
+    if buffer.tell():
+        yield _take(buffer)
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only, unseekable stream that hands written bytes back in chunks."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def zip_chunks(user_uid, batch_size, upload_folder):
+    """
+    Yield a zip archive of a user's scans and their image files.
+
+    scans.ndjson comes first, deflated; images follow, stored as they are
+    already compressed, under their /uploads/ path, so each scan's image_url
+    names its file inside the archive. Images missing on disk or outside the
+    upload folder are left out.
+    """
+    sink = _ChunkSink()
+    with zipfile.ZipFile(sink, mode='w') as archive:
+        # The scan list's size is unknown until the end, so allow it to pass 4 GB
+        with archive.open(_zip_info('scans.ndjson', zipfile.ZIP_DEFLATED), mode='w', force_zip64=True) as member:
+            for scan in iter_scans(user_uid, batch_size):
+                member.write(_json_line(scan).encode('utf-8'))
+                yield from _drained(sink)
+
+        written = set()
+        for scan in iter_scans(user_uid, batch_size):
+            path = upload_path(scan['image_url'], upload_folder)
+            name = scan['image_url'].lstrip('/')
+            if path is None or name in written:
+                continue
+            written.add(name)
+            with open(path, 'rb') as source, archive.open(_zip_info(name, zipfile.ZIP_STORED), mode='w') as member:
+                while True:
+                    block = source.read(_COPY_CHUNK_BYTES)
+                    if not block:
+                        break
+                    member.write(block)
+                    yield from _drained(sink)
+            yield from _drained(sink)
+
+    yield from _drained(sink)
+
+
+def upload_path(file_url, upload_folder):
+    """Filesystem path of an /uploads/ URL, or None when it is missing or escapes the upload folder."""
+    if not file_url or not file_url.startswith('/uploads/'):
+        return None
+    root = os.path.realpath(upload_folder)
+    path = os.path.realpath(os.path.join(root, file_url[len('/uploads/'):]))
+    if not path.startswith(root + os.sep) or not os.path.isfile(path):
+        return None
+    return path
+
+
+def _take(buffer):
+    data = buffer.getvalue()
+    buffer.seek(0)
+    buffer.truncate()
+    return data
+
+
+def _drained(sink):
+    data = sink.drain()
+    if data:
+        yield data
+
+
+def _zip_info(name, compress_type):
+    info = zipfile.ZipInfo(name, date_time=time.localtime()[:6])
+    info.compress_type = compress_type
+    return info
+
+
+def _json_line(scan):
+    return json.dumps(scan, ensure_ascii=False) + '\n'
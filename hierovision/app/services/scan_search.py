@@ -0,0 +1,259 @@
+"""
+Full-text search over a user's scans.
+
+SQLite databases get an FTS5 index and PostgreSQL databases a tsvector column
+with a GIN index. Both cover each scan's description and the Gardner code of
+its predicted class, and both are kept in sync by database triggers on insert,
+update and delete, so the ORM code that writes scans does not change. Other
+databases fall back to substring matching in the route.
+
+The FTS5 index keeps the owner's id as an extra column and every query is
+restricted to it inside MATCH. The index intersects the owner's postings with
+the query terms, so a search costs about the same however many scans other
+users have.
+"""
+
+import html
+import logging
+import re
+from sqlalchemy import bindparam, text
+from app.models.gardner_sign import GardnerSign
+from app.models.types import UUIDKey
+from app.services.gardner import get_sign_catalog
+
+logger = logging.getLogger(__name__)
+
+_TERM_PATTERN = re.compile(r'\w+')
+
+# Relative weight of a match on the Gardner code versus the description
+CODE_WEIGHT = 5.0
+DESCRIPTION_WEIGHT = 1.0
+
+SNIPPET_START = '<mark>'
+SNIPPET_END = '</mark>'
+SNIPPET_TOKENS = 12
+
+# Private-use characters the database wraps matches in; the snippet is
+# HTML-escaped before they become SNIPPET_START/SNIPPET_END, since the
+# description is user text
+_MATCH_START = '\ue000'
+_MATCH_END = '\ue001'
+
+# Database flavour of the installed index: 'fts5', 'postgres' or None
+search_backend = None
+
+
+
+def _owner(column):
+    """Owner token of a user id column: its hex digits, whether the key is stored as text or 16 bytes."""
+    return f"replace(CASE typeof({column}) WHEN 'blob' THEN lower(hex({column})) ELSE {column} END, '-', '')"
+
+
+_SQLITE_SETUP = (
+    # Stable integer ids for the index; scans.rowid may change on VACUUM.
+    # scan_id holds scans.id as stored, text or 16-byte blob, so it has no type
+    """CREATE TABLE IF NOT EXISTS scan_search_docs (
+        doc_id INTEGER PRIMARY KEY,
+        scan_id NOT NULL UNIQUE
+    )""",
+    """CREATE VIRTUAL TABLE IF NOT EXISTS scans_fts USING fts5(
+        owner, code, description, tokenize = 'unicode61 remove_diacritics 2'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS scans_fts_insert AFTER INSERT ON scans BEGIN
+        INSERT INTO scan_search_docs (scan_id) VALUES (new.id);
+        INSERT INTO scans_fts (rowid, owner, code, description) VALUES (
+            (SELECT doc_id FROM scan_search_docs WHERE scan_id = new.id),
+            {_owner('new.user_uid')},
+            (SELECT code FROM gardner_signs WHERE class_index = new.predicted_class),
+            new.description
+        );
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS scans_fts_update AFTER UPDATE OF user_uid, description, predicted_class ON scans BEGIN
+        UPDATE scans_fts SET
+            owner = {_owner('new.user_uid')},
+            code = (SELECT code FROM gardner_signs WHERE class_index = new.predicted_class),
+            description = new.description
+        WHERE rowid = (SELECT doc_id FROM scan_search_docs WHERE scan_id = new.id);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS scans_fts_delete AFTER DELETE ON scans BEGIN
+        DELETE FROM scans_fts WHERE rowid = (SELECT doc_id FROM scan_search_docs WHERE scan_id = old.id);
+        DELETE FROM scan_search_docs WHERE scan_id = old.id;
+    END""",
+)
+
+_SQLITE_BACKFILL = (
+    """INSERT INTO scan_search_docs (scan_id)
+        SELECT id FROM scans WHERE id NOT IN (SELECT scan_id FROM scan_search_docs)""",
+    f"""INSERT INTO scans_fts (rowid, owner, code, description)
+        SELECT d.doc_id, {_owner('s.user_uid')}, g.code, s.description
+        FROM scans s
+        JOIN scan_search_docs d ON d.scan_id = s.id
+        LEFT JOIN gardner_signs g ON g.class_index = s.predicted_class
+        WHERE d.doc_id NOT IN (SELECT rowid FROM scans_fts)""",
+)
+
+_POSTGRES_SETUP = (
+    "ALTER TABLE scans ADD COLUMN IF NOT EXISTS search_vector tsvector",
+    "CREATE INDEX IF NOT EXISTS ix_scans_search_vector ON scans USING GIN (search_vector)",
+    """CREATE OR REPLACE FUNCTION scans_search_vector_update() RETURNS trigger AS $$
+    BEGIN
+        NEW.search_vector :=
+            setweight(to_tsvector('simple', coalesce(
+                (SELECT code FROM gardner_signs WHERE class_index = NEW.predicted_class), ''
+            )), 'A') ||
+            setweight(to_tsvector('english', coalesce(NEW.description, '')), 'B');
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql""",
+    "DROP TRIGGER IF EXISTS scans_search_vector ON scans",
+    """CREATE TRIGGER scans_search_vector BEFORE INSERT OR UPDATE OF description, predicted_class ON scans
+        FOR EACH ROW EXECUTE FUNCTION scans_search_vector_update()""",
+)
+
+_POSTGRES_BACKFILL = (
+    "UPDATE scans SET description = description WHERE search_vector IS NULL",
+)
+
+
+def _sync_gardner_signs(db):
+    """
+    Mirror the sign catalog into gardner_signs.
+
+    Returns:
+        bool: Whether any row changed
+    """
+    stored = {sign.class_index: (sign.code, sign.description) for sign in GardnerSign.query.all()}
+    wanted = {sign.class_index: (sign.code, sign.description) for sign in get_sign_catalog()}
+    if stored == wanted:
+        return False
+
+    GardnerSign.query.delete()
+    db.session.add_all(
+        GardnerSign(class_index=class_index, code=code, description=description)
+        for class_index, (code, description) in wanted.items()
+    )
+    db.session.commit()
+    return True
+
+
+def _fts5_available(db):
+    try:
+        with db.engine.connect() as conn:
+            conn.exec_driver_sql('CREATE VIRTUAL TABLE temp.fts5_probe USING fts5(x)')
+            conn.exec_driver_sql('DROP TABLE temp.fts5_probe')
+        return True
+    except Exception:
+        return False
+
+
+def install_scan_search(db):
+    """
+    Create or update the scan search index for the app's database.
+
+    Safe to call on every startup: objects are only created when missing,
+    existing scans are indexed once, and codes are re-indexed when the sign
+    catalog changes.
+    """
+    global search_backend
+    signs_changed = _sync_gardner_signs(db)
+    dialect = db.engine.dialect.name
+
+    if dialect == 'sqlite' and _fts5_available(db):
+        setup, backfill, backend = _SQLITE_SETUP, _SQLITE_BACKFILL, 'fts5'
+    elif dialect == 'postgresql':
+        setup, backfill, backend = _POSTGRES_SETUP, _POSTGRES_BACKFILL, 'postgres'
+    else:
+        logger.warning(f"No full-text index for {dialect}; scan search falls back to substring matching")
+        search_backend = None
+        return
+
+    with db.engine.begin() as conn:
+        for statement in setup + backfill:
+            conn.exec_driver_sql(statement)
+        if signs_changed:
+            # Re-run the triggers so indexed codes follow the catalog
+            conn.exec_driver_sql('UPDATE scans SET predicted_class = predicted_class WHERE predicted_class IS NOT NULL')
+
+    search_backend = backend
+
+
+def _terms(query):
+    return [term.lower() for term in _TERM_PATTERN.findall(query)]
+
+
+def _fts5_match(user_uid, terms):
+    """Every term as a prefix, all required, within the owner's scans."""
+    owner = user_uid.replace('-', '').lower()
+    words = ' '.join(f'"{term}"*' for term in terms)
+    return f'owner : "{owner}" AND {{code description}} : ({words})'
+
+
+def _postgres_query(terms):
+    return ' & '.join(f'{term}:*' for term in terms)
+
+
+def search(db, user_uid, query, limit, offset=0):
+    """
+    Rank a user's scans against a free-text query.
+
+    Returns:
+        list: (scan id, relevance score, highlighted description snippet), best first
+    """
+    terms = _terms(query)
+    if not terms:
+        return []
+
+    if search_backend == 'fts5':
+        rows = db.session.execute(text(f"""
+            SELECT d.scan_id,
+                   -bm25(scans_fts, 0.0, {CODE_WEIGHT}, {DESCRIPTION_WEIGHT}) AS score,
+                   snippet(scans_fts, 2, :start, :end, '…', {SNIPPET_TOKENS}) AS snippet
+            FROM scans_fts
+            JOIN scan_search_docs d ON d.doc_id = scans_fts.rowid
+            WHERE scans_fts MATCH :match
+            ORDER BY bm25(scans_fts, 0.0, {CODE_WEIGHT}, {DESCRIPTION_WEIGHT}), d.doc_id DESC
+            LIMIT :limit OFFSET :offset
+        """).columns(scan_id=UUIDKey), {
+            'match': _fts5_match(user_uid, terms), 'start': _MATCH_START, 'end': _MATCH_END,
+            'limit': limit, 'offset': offset
+        })
+    elif search_backend == 'postgres':
+        rows = db.session.execute(text(f"""
+            SELECT s.id AS scan_id,
+                   ts_rank_cd(s.search_vector, q) AS score,
+                   ts_headline('english', s.description, q,
+                               'StartSel={_MATCH_START}, StopSel={_MATCH_END}, MaxWords={SNIPPET_TOKENS}, MinWords=4') AS snippet
+            FROM scans s, to_tsquery('english', :query) q
+            WHERE s.user_uid = :user_uid AND s.search_vector @@ q
+            ORDER BY score DESC, s.timestamp DESC, s.id DESC
+            LIMIT :limit OFFSET :offset
+        """).bindparams(bindparam('user_uid', type_=UUIDKey)).columns(scan_id=UUIDKey), {'query': _postgres_query(terms), 'user_uid': user_uid, 'limit': limit, 'offset': offset})
+    else:
+        raise RuntimeError('Full-text scan search is not installed')
+
+    return [(scan_id, round(float(score), 4), _highlight(snippet)) for scan_id, score, snippet in rows]
+
+
+def _highlight(snippet):
+    """HTML-escape a snippet and mark its matches with SNIPPET_START/SNIPPET_END."""
+    if snippet is None:
+        return None
+    return html.escape(snippet).replace(_MATCH_START, SNIPPET_START).replace(_MATCH_END, SNIPPET_END)
+
+
+def count(db, user_uid, query):
+    """Count a user's scans matching a free-text query."""
+    terms = _terms(query)
+    if not terms:
+        return 0
+
+    if search_backend == 'fts5':
+        return db.session.execute(
+            text('SELECT count(*) FROM scans_fts WHERE scans_fts MATCH :match'),
+            {'match': _fts5_match(user_uid, terms)}
+        ).scalar()
+
+    return db.session.execute(text("""
+        SELECT count(*) FROM scans
+        WHERE user_uid = :user_uid AND search_vector @@ to_tsquery('english', :query)
+    """).bindparams(bindparam('user_uid', type_=UUIDKey)), {'user_uid': user_uid, 'query': _postgres_query(terms)}).scalar()
@@ -0,0 +1,223 @@
+"""
+Ranked search and type-ahead over the Gardner sign catalog.
+
+Queries and catalog text are folded the same way before matching, so a
+transliteration typed without diacritics ('hri', 'msa') finds 'ḥri' and 'mšʿ'.
+Everything is precomputed when the index is built; a query only touches the
+postings of its own tokens.
+"""
+
+import math
+import re
+import unicodedata
+from collections import defaultdict
+from app.services.gardner import get_sign_catalog
+
+# Transliteration letters that do not decompose into a base letter plus a combining mark
+_TRANSLITERATION_FOLDING = str.maketrans({
+    'ꜣ': '3', 'Ꜣ': '3', 'ȝ': '3', 'Ȝ': '3',  # aleph
+    'ʿ': 'a', 'ꜥ': 'a', 'Ꜥ': 'a',            # ayin
+    'ı': 'i', 'ʾ': '',
+})
+
+_WORD_PATTERN = re.compile(r'[^\W_]+')
+
+# Relative weight of a match on a sign's code versus a word of its description
+CODE_WEIGHT = 10.0
+DESCRIPTION_WEIGHT = 1.0
+
+# Discounts for partial matches of a query token
+PREFIX_FACTOR = 0.5
+FUZZY_FACTOR = 0.4
+MIN_FUZZY_SIMILARITY = 0.5
+
+# Completions kept on each trie node
+MAX_COMPLETIONS = 16
+
+
+def fold(text):
+    """Lower-case text and strip diacritics, mapping aleph to '3' and ayin to 'a'."""
+    text = unicodedata.normalize('NFD', text.translate(_TRANSLITERATION_FOLDING))
+    return ''.join(ch for ch in text if not unicodedata.combining(ch)).lower()
+
+
+def _trigrams(term):
+    padded = f"  {term} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class _TrieNode:
+    __slots__ = ('children', 'completions')
+
+    def __init__(self):
+        self.children = {}
+        self.completions = ()
+
+
+class SignSearchIndex:
+    """
+    Inverted index over sign codes and descriptions.
+
+    Holds postings per folded token, a trigram index over the vocabulary for
+    misspelled or partial tokens, and a prefix trie whose nodes keep their best
+    completions so type-ahead costs one walk down the prefix.
+    """
+
+    def __init__(self, catalog):
+        self.catalog = catalog
+        self._order = {}
+        self._postings = defaultdict(dict)
+        self._surface = {}
+        self._codes = {}
+
+        for position, sign in enumerate(catalog.in_gardner_order()):
+            self._order[sign.class_index] = position
+
+        for sign in catalog:
+            code = fold(sign.code)
+            self._postings[code][sign.class_index] = CODE_WEIGHT
+            self._surface.setdefault(code, sign.code)
+            self._codes[code] = sign.class_index
+
+            for word in _WORD_PATTERN.findall(sign.description):
+                term = fold(word)
+                if not term:
+                    continue
+                self._postings[term].setdefault(sign.class_index, DESCRIPTION_WEIGHT)
+                self._surface.setdefault(term, word.lower())
+
+        total = len(catalog) or 1
+        self._idf = {term: math.log(1 + total / len(docs)) for term, docs in self._postings.items()}
+
+        self._trigram_terms = defaultdict(list)
+        for term in self._postings:
+            if len(term) >= 3:
+                for trigram in _trigrams(term):
+                    self._trigram_terms[trigram].append(term)
+
+        self._trie = self._build_trie()
+
+    def _term_weight(self, term):
+        """How strongly a term is offered as a completion: codes first, then by document frequency."""
+        return (term in self._codes, len(self._postings[term]))
+
+    def _build_trie(self):
+        root = _TrieNode()
+        for term in self._postings:
+            node = root
+            for ch in term:
+                node = node.children.setdefault(ch, _TrieNode())
+            node.completions = (term,)
+
+        def collect(node):
+            candidates = list(node.completions)
+            for child in node.children.values():
+                candidates.extend(collect(child))
+            candidates.sort(key=lambda term: (tuple(-w for w in self._term_weight(term)), len(term), term))
+            node.completions = tuple(candidates[:MAX_COMPLETIONS])
+            return node.completions
+
+        collect(root)
+        return root
+
+    def _completions(self, prefix):
+        node = self._trie
+        for ch in prefix:
+            node = node.children.get(ch)
+            if node is None:
+                return ()
+        return node.completions
+
+    def _fuzzy_terms(self, token):
+        """Return (term, similarity) for vocabulary terms sharing enough trigrams with token."""
+        query_trigrams = _trigrams(token)
+        shared = defaultdict(int)
+        for trigram in query_trigrams:
+            for term in self._trigram_terms.get(trigram, ()):
+                shared[term] += 1
+
+        matches = []
+        for term, count in shared.items():
+            similarity = 2 * count / (len(query_trigrams) + len(term) + 1)
+            if similarity >= MIN_FUZZY_SIMILARITY:
+                matches.append((term, similarity))
+        return matches
+
+    def _match_token(self, token, allow_prefix):
+        """Score every sign matching one folded query token, keeping the best match per sign."""
+        scores = {}
+
+        def add(term, factor):
+            idf = self._idf[term]
+            for class_index, weight in self._postings[term].items():
+                score = weight * idf * factor
+                if score > scores.get(class_index, 0):
+                    scores[class_index] = score
+
+        if token in self._postings:
+            add(token, 1.0)
+
+        if allow_prefix:
+            for term in self._completions(token):
+                if term != token:
+                    add(term, PREFIX_FACTOR)
+
+        if not scores and len(token) >= 3:
+            for term, similarity in self._fuzzy_terms(token):
+                add(term, FUZZY_FACTOR * similarity)
+
+        return scores
+
+    def search(self, query, limit=20):
+        """
+        Rank signs against a free-text query.
+
+        The last query token also matches as a prefix, so results follow the user
+        while they type.
+
+        Returns:
+            list: (Sign, score) pairs, best first
+        """
+        tokens = [fold(word) for word in _WORD_PATTERN.findall(query)]
+        tokens = [token for token in tokens if token]
+        if not tokens:
+            return []
+
+        totals = defaultdict(float)
+        for position, token in enumerate(tokens):
+            for class_index, score in self._match_token(token, position == len(tokens) - 1).items():
+                totals[class_index] += score
+
+        ranked = sorted(totals.items(), key=lambda item: (-item[1], self._order[item[0]]))
+        return [(self.catalog.get(class_index), round(score, 4)) for class_index, score in ranked[:limit]]
+
+    def suggest(self, prefix, limit=10):
+        """
+        Complete the last word of prefix to Gardner codes and description words.
+
+        Returns:
+            list: Dicts with 'text', 'type' ('code' or 'word') and, for codes, 'class_index'
+        """
+        words = _WORD_PATTERN.findall(prefix)
+        if not words:
+            return []
+
+        suggestions = []
+        for term in self._completions(fold(words[-1]))[:limit]:
+            if term in self._codes:
+                suggestions.append({'text': self._surface[term], 'type': 'code', 'class_index': self._codes[term]})
+            else:
+                suggestions.append({'text': self._surface[term], 'type': 'word'})
+        return suggestions
+
+
+# Global search index instance
+search_index = None
+
+
+def get_sign_search_index():
+    """Get or build the process-wide sign search index."""
+    global search_index
+    if search_index is None:
+        search_index = SignSearchIndex(get_sign_catalog())
+    return search_index
@@ -0,0 +1,261 @@
+"""
+Translation backends for the English-to-hieroglyphs routes.
+
+'lexicon' translates with the local phrase lexicon only.
+'gemini' asks a Gemini-compatible generateContent endpoint and falls back to the
+lexicon whenever the model is unavailable, slow or returns something unusable.
+Model answers are kept in a SQLite cache keyed on the normalized text, and
+identical requests that arrive while one is in flight share its answer.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+import requests
+from concurrent.futures import Future, ThreadPoolExecutor
+from flask import current_app
+from requests.adapters import HTTPAdapter
+from app.services.lexicon import get_lexicon, normalize
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r'\s+')
+
+PROMPT = (
+    "Translate the following English text into Egyptian hieroglyphs written with "
+    "Unicode hieroglyph characters. Answer with a JSON object with the keys "
+    "'hieroglyphs' (the hieroglyphic text, words separated by spaces) and "
+    "'transliteration' (the Egyptological transliteration).\n\nText: {text}"
+)
+
+
+def cache_key(text):
+    """Normalize text so trivially different spellings share one cache entry."""
+    return _WHITESPACE.sub(' ', normalize(text)).strip()
+
+
+class TranslationBackend:
+    """
+    Base class for English-to-hieroglyphs translators.
+
+    translate returns the lexicon's result shape (hieroglyphs, transliteration,
+    confidence_score, unknown_words) plus 'source', naming what produced it.
+    """
+
+    name = None
+
+    def translate(self, text):
+        raise NotImplementedError
+
+    def translate_many(self, texts):
+        """Translate a list of texts, returning results in the same order."""
+        return [self.translate(text) for text in texts]
+
+
+class LexiconTranslationBackend(TranslationBackend):
+    """Translates with the local phrase lexicon."""
+
+    name = 'lexicon'
+
+    def translate(self, text):
+        result = get_lexicon().translate(text)
+        result['source'] = 'lexicon'
+        return result
+
+
+class TranslationCache:
+    """
+    Persistent cache of model translations in a SQLite file.
+
+    Rows are keyed on a hash of the model name and the normalized text, so
+    changing GEMINI_MODEL never serves answers from a different model.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS translations ('
+            'key TEXT PRIMARY KEY, text TEXT NOT NULL, result TEXT NOT NULL, created_at REAL NOT NULL)'
+        )
+
+    @staticmethod
+    def _digest(model, text):
+        return hashlib.sha256(f"{model}\0{text}".encode('utf-8')).hexdigest()
+
+    def get(self, model, text):
+        """Return the cached result for normalized text, or None."""
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT result FROM translations WHERE key = ?', (self._digest(model, text),)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put(self, model, text, result):
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO translations (key, text, result, created_at) VALUES (?, ?, ?, ?)',
+                (self._digest(model, text), text, json.dumps(result, ensure_ascii=False), time.time())
+            )
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM translations').fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class TranslationUnavailable(Exception):
+    """The model could not produce a usable translation."""
+
+
+class GeminiTranslationBackend(TranslationBackend):
+    """
+    Translates through the Gemini generateContent API.
+
+    Requests go through one requests.Session whose connection pool keeps
+    connections to the API alive between requests. Cache hits never reach the
+    network, and concurrent requests for the same normalized text wait on the
+    first one instead of each calling the model. Any failure falls back to the
+    lexicon; fallback results are not cached so the model is retried later.
+    """
+
+    name = 'gemini'
+
+    def __init__(self, api_url, api_key, model, cache=None, timeout=10.0, pool_size=16):
+        """
+        Args:
+            api_url: Base URL of the API, e.g. https://generativelanguage.googleapis.com
+            api_key: API key sent in the x-goog-api-key header
+            model: Model name, e.g. gemini-1.5-flash
+            cache: TranslationCache for model answers, or None to disable caching
+            timeout: Seconds allowed for one model call, including connecting
+            pool_size: Keep-alive connections kept open to the API
+        """
+        self.url = f"{api_url.rstrip('/')}/v1beta/models/{model}:generateContent"
+        self.model = model
+        self.cache = cache
+        self.timeout = timeout
+        self.pool_size = pool_size
+
+        self.session = requests.Session()
+        self.session.headers.update({'x-goog-api-key': api_key, 'Content-Type': 'application/json'})
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+        self._in_flight = {}
+        self._in_flight_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=pool_size, thread_name_prefix='translation')
+
+    def _call_model(self, text):
+        """Ask the model for one translation and return the parsed result."""
+        body = {
+            'contents': [{'parts': [{'text': PROMPT.format(text=text)}]}],
+            'generationConfig': {'responseMimeType': 'application/json', 'temperature': 0}
+        }
+        try:
+            response = self.session.post(self.url, json=body, timeout=self.timeout)
+            response.raise_for_status()
+            answer = response.json()['candidates'][0]['content']['parts'][0]['text']
+            parsed = json.loads(answer)
+        except requests.RequestException as e:
+            raise TranslationUnavailable(f"Translation request failed: {e}")
+        except (KeyError, IndexError, TypeError, ValueError) as e:
+            raise TranslationUnavailable(f"Unexpected translation response: {e}")
+
+        if not isinstance(parsed, dict) or not isinstance(parsed.get('hieroglyphs'), str) or not parsed['hieroglyphs'].strip():
+            raise TranslationUnavailable('Translation response has no hieroglyphs')
+
+        transliteration = parsed.get('transliteration')
+        return {
+            'hieroglyphs': parsed['hieroglyphs'].strip(),
+            'transliteration': transliteration.strip() if isinstance(transliteration, str) else '',
+            'confidence_score': 1.0,
+            'unknown_words': []
+        }
+
+    def _lookup(self, key):
+        """Return the model result for a normalized text, sharing in-flight calls."""
+        if self.cache is not None:
+            cached = self.cache.get(self.model, key)
+            if cached is not None:
+                return cached
+
+        with self._in_flight_lock:
+            future = self._in_flight.get(key)
+            leader = future is None
+            if leader:
+                future = self._in_flight[key] = Future()
+
+        if not leader:
+            return future.result(timeout=self.timeout)
+
+        try:
+            result = self._call_model(key)
+            if self.cache is not None:
+                self.cache.put(self.model, key, result)
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._in_flight_lock:
+                del self._in_flight[key]
+
+    def translate(self, text):
+        key = cache_key(text)
+        if not key:
+            return LexiconTranslationBackend().translate(text)
+
+        try:
+            result = dict(self._lookup(key))
+        except Exception as e:
+            logger.warning(f"Falling back to the lexicon: {e}")
+            return LexiconTranslationBackend().translate(text)
+
+        result['source'] = self.name
+        return result
+
+    def translate_many(self, texts):
+        """Translate texts concurrently over the connection pool, once per distinct text."""
+        distinct = list(dict.fromkeys(texts))
+        results = dict(zip(distinct, self._executor.map(self.translate, distinct)))
+        return [dict(results[text]) for text in texts]
+
+
+# Global translation backend instance
+backend = None
+
+
+def get_translation_backend():
+    """Get or create the translation backend selected by TRANSLATION_BACKEND."""
+    global backend
+    if backend is None:
+        config = current_app.config
+        if config.get('TRANSLATION_BACKEND', 'lexicon') == 'gemini':
+            cache_path = config.get('TRANSLATION_CACHE_PATH')
+            backend = GeminiTranslationBackend(
+                config['GEMINI_API_URL'],
+                config['GEMINI_API_KEY'],
+                config['GEMINI_MODEL'],
+                cache=TranslationCache(cache_path) if cache_path else None,
+                timeout=config.get('TRANSLATION_TIMEOUT', 10.0),
+                pool_size=config.get('TRANSLATION_POOL_SIZE', 16)
+            )
+        else:
+            backend = LexiconTranslationBackend()
+    return backend
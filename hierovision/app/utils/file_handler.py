@@ -3,6 +3,11 @@ import uuid
 from werkzeug.utils import secure_filename
 from flask import current_app
 
+# Pre-decoded upload format: tightly packed 224x224 RGB images, one byte per channel, row by row
+RAW_IMAGE_CONTENT_TYPE = 'application/x-hierovision-rgb8'
+RAW_IMAGE_SIZE = 224
+RAW_IMAGE_BYTES = RAW_IMAGE_SIZE * RAW_IMAGE_SIZE * 3
+
 
 def allowed_file(filename):
     """Check if the uploaded file has an allowed extension."""
@@ -106,3 +111,43 @@ def get_file_size(file_url):
         
     except Exception:
         return 0
+
+
+def raw_image_count(length):
+    """Return how many pre-decoded images a body of the given length holds, or raise ValueError."""
+    if not length or length % RAW_IMAGE_BYTES:
+        raise ValueError(
+            f"Body must hold whole {RAW_IMAGE_SIZE}x{RAW_IMAGE_SIZE} RGB images ({RAW_IMAGE_BYTES} bytes each)"
+        )
+    return length // RAW_IMAGE_BYTES
+
+
+def read_raw_images(stream, length, max_images):
+    """
+    Read a pre-decoded image body into a writable buffer.
+    
+    Args:
+        stream: Request body stream
+        length: Declared body length in bytes
+        max_images: Largest number of images accepted in one body
+    
+    Returns:
+        tuple: (buffer: bytearray, count: int)
+    
+    Raises:
+        ValueError: If the body is not a whole number of images or holds too many
+    """
+    count = raw_image_count(length)
+    if count > max_images:
+        raise ValueError(f"At most {max_images} images can be sent at once")
+    
+    buffer = bytearray(length)
+    view = memoryview(buffer)
+    filled = 0
+    while filled < length:
+        received = stream.readinto(view[filled:])
+        if not received:
+            raise ValueError('Body is shorter than its Content-Length')
+        filled += received
+    
+    return buffer, count
@@ -0,0 +1,114 @@
+import gzip
+import hashlib
+import threading
+from collections import OrderedDict
+from flask import request, current_app
+
+try:
+    import brotli
+except ImportError:  # Optional; without it bodies are offered gzip-compressed only
+    brotli = None
+
+# Bodies smaller than this are not worth compressing
+MIN_COMPRESS_SIZE = 256
+
+# Encodings offered to clients, most preferred first
+PREFERRED_ENCODINGS = ('br', 'gzip')
+
+
+class CachedBody:
+    """A serialized JSON body with its ETag and precompressed encodings."""
+
+    __slots__ = ('version', 'etag', 'encodings')
+
+    def __init__(self, version, body):
+        self.version = version
+        self.etag = hashlib.sha256(body).hexdigest()[:32]
+        self.encodings = {'identity': body}
+
+        if len(body) >= MIN_COMPRESS_SIZE:
+            compressed = gzip.compress(body, compresslevel=9, mtime=0)
+            if len(compressed) < len(body):
+                self.encodings['gzip'] = compressed
+            if brotli is not None:
+                compressed = brotli.compress(body, quality=11)
+                if len(compressed) < len(body):
+                    self.encodings['br'] = compressed
+
+
+class ResponseCache:
+    """
+    Keeps serialized response bodies for data that rarely changes.
+
+    Entries are keyed by route and arguments and remember the data version they
+    were built from, so a version change rebuilds them on the next request.
+    The least recently used entries are dropped beyond max_entries.
+    """
+
+    def __init__(self, max_entries=512):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, version, build):
+        """Return the CachedBody for key at version, calling build() for the payload when missing."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.version == version:
+                self._entries.move_to_end(key)
+                return entry
+
+        entry = CachedBody(version, current_app.json.dumps(build()).encode('utf-8'))
+
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+# Global response cache instance
+response_cache = ResponseCache()
+
+
+def cached_json_response(key, version, build, max_age=0):
+    """
+    Serve a JSON payload from the response cache with HTTP validators.
+
+    Args:
+        key: Hashable key identifying the route and its arguments
+        version: Marker that changes whenever the underlying data changes
+        build: Callable returning the payload; only called when the cache is stale
+        max_age: Seconds clients may reuse the body without revalidating
+
+    Returns:
+        Response: 304 when the client's ETag matches, otherwise the body in the
+        best encoding the client accepts
+    """
+    entry = response_cache.get(key, version, build)
+
+    offered = [encoding for encoding in PREFERRED_ENCODINGS if encoding in entry.encodings]
+    encoding = request.accept_encodings.best_match(offered, default='identity')
+
+    # Each content coding is a different representation, so it gets its own strong validator
+    etag = entry.etag if encoding == 'identity' else f"{entry.etag}-{encoding}"
+    headers = {
+        'ETag': f'"{etag}"',
+        'Cache-Control': f"public, max-age={max_age}" if max_age else 'no-cache',
+        'Vary': 'Accept-Encoding'
+    }
+
+    if request.if_none_match.contains_weak(etag):
+        return current_app.response_class(status=304, headers=headers)
+
+    if encoding != 'identity':
+        headers['Content-Encoding'] = encoding
+
+    return current_app.response_class(
+        entry.encodings[encoding], status=200, headers=headers, mimetype='application/json'
+    )
@@ -0,0 +1,132 @@
+"""
+Keyset (cursor) pagination.
+
+A page is fetched with WHERE (sort columns) < (values of the last row seen),
+which an index on the same columns answers without skipping rows, so every
+page costs the same however deep the client scrolls. The cursor handed to
+clients is the last row's sort values, base64-encoded.
+"""
+
+import base64
+import json
+import threading
+import time
+from datetime import datetime
+from sqlalchemy import DateTime, literal, tuple_
+
+
+class InvalidCursor(ValueError):
+    """The cursor was not produced by this paginator."""
+
+
+def encode_cursor(values):
+    """Encode sort-key values as an opaque, URL-safe cursor."""
+    payload = [value.isoformat() if isinstance(value, datetime) else value for value in values]
+    return base64.urlsafe_b64encode(json.dumps(payload, separators=(',', ':')).encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def _decode_values(cursor, count):
+    padded = cursor + '=' * (-len(cursor) % 4)
+    values = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    if not isinstance(values, list) or len(values) != count:
+        raise ValueError('wrong number of values')
+    return values
+
+
+def decode_cursor(cursor, columns):
+    """Decode a cursor back into values for the given sort columns."""
+    try:
+        values = _decode_values(cursor, len(columns))
+        return [
+            datetime.fromisoformat(value) if isinstance(column.type, DateTime) else value
+            for column, value in zip(columns, values)
+        ]
+    except (ValueError, TypeError, UnicodeError) as e:
+        raise InvalidCursor(f"Invalid cursor: {e}")
+
+
+def decode_offset_cursor(cursor):
+    """
+    Decode a cursor made with encode_cursor([offset]).
+
+    Used where results are ordered by a computed score, such as search
+    relevance, so there is no column to seek on.
+    """
+    try:
+        offset, = _decode_values(cursor, 1)
+        if not isinstance(offset, int) or offset < 0:
+            raise ValueError('bad offset')
+        return offset
+    except (ValueError, TypeError, UnicodeError) as e:
+        raise InvalidCursor(f"Invalid cursor: {e}")
+
+
+def keyset_page(query, columns, limit, cursor=None, descending=True):
+    """
+    Fetch one page of a query ordered by columns.
+
+    Args:
+        query: Query to page through, already filtered
+        columns: Model columns forming a unique sort key, e.g. (created_at, id)
+        limit: Rows per page
+        cursor: Cursor returned with the previous page, or None for the first page
+        descending: Newest (largest) first
+
+    Returns:
+        tuple: (rows, next cursor or None when this is the last page)
+
+    Raises:
+        InvalidCursor: The cursor cannot be decoded
+    """
+    if cursor:
+        # Bind each value with its column's type, so e.g. binary UUID keys compare as stored
+        values = decode_cursor(cursor, columns)
+        key, last = tuple_(*columns), tuple_(*(literal(value, column.type) for column, value in zip(columns, values)))
+        query = query.filter(key < last if descending else key > last)
+
+    ordering = [column.desc() if descending else column.asc() for column in columns]
+    rows = query.order_by(*ordering).limit(limit + 1).all()
+
+    if len(rows) <= limit:
+        return rows, None
+
+    rows = rows[:limit]
+    return rows, encode_cursor([getattr(rows[-1], column.key) for column in columns])
+
+
+class CountCache:
+    """
+    Remembers expensive COUNT(*) results so pages do not recount them.
+
+    Counts are grouped by owner (e.g. a user id) and keyed within it (e.g. a
+    search query). Entries expire after ttl seconds; writers call
+    invalidate(owner) after a commit that changes the owner's rows, so this
+    process sees its own writes at once. The cache is per process: callers
+    pass a version read from the database (e.g. the owner's row count) so
+    writes made through other workers are noticed as well.
+    """
+
+    def __init__(self, ttl=300, max_owners=10000):
+        self.ttl = ttl
+        self.max_owners = max_owners
+        self._owners = {}
+        self._lock = threading.Lock()
+
+    def get(self, owner, key, count, version=None):
+        """Return the cached count, calling count() when it is missing, expired or from another version."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._owners.get(owner, {}).get(key)
+            if entry is not None and entry[1] > now and entry[2] == version:
+                return entry[0]
+
+        value = count()
+        with self._lock:
+            if owner not in self._owners and len(self._owners) >= self.max_owners:
+                self._owners.clear()
+            self._owners.setdefault(owner, {})[key] = (value, now + self.ttl, version)
+        return value
+
+    def invalidate(self, owner):
+        with self._lock:
+            self._owners.pop(owner, None)
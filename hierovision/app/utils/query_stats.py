@@ -0,0 +1,166 @@
+"""
+Per-request SQL statement counting.
+
+Every statement the app's engines run is counted, with its time in the
+database, against the request (or count_queries() block) in progress on the
+same thread. A statement whose SQL text repeats within one request is reported
+as a suspected N+1 pattern: the same query run once per row of an earlier
+result, usually by a serializer lazy-loading a relationship. Routes declare
+how many statements they may run with @query_budget(n); going over is logged,
+and raises QueryBudgetExceeded when QUERY_BUDGET_STRICT is set, as in tests.
+
+Statements run while a streamed response body is being generated happen after
+the request's count is taken and are not included.
+"""
+
+import logging
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from flask import g, request
+from sqlalchemy import event
+
+logger = logging.getLogger(__name__)
+
+_local = threading.local()
+
+
+class QueryBudgetExceeded(AssertionError):
+    """A route ran more SQL statements than its @query_budget allows."""
+
+
+class QueryStats:
+    """Statements run during one request or capture block."""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.statements = Counter()
+
+    def record(self, statement, seconds):
+        self.count += 1
+        self.seconds += seconds
+        self.statements[' '.join(statement.split())] += 1
+
+    def repeated(self, threshold):
+        """Statements run at least threshold times, most repeated first, as (SQL text, times)."""
+        return [(statement, times) for statement, times in self.statements.most_common() if times >= threshold]
+
+    @property
+    def milliseconds(self):
+        return round(self.seconds * 1000, 2)
+
+
+def _collectors():
+    if not hasattr(_local, 'collectors'):
+        _local.collectors = []
+    return _local.collectors
+
+
+@contextmanager
+def count_queries():
+    """
+    Count the statements run on this thread inside the block.
+
+    Usage:
+        with count_queries() as stats:
+            client.get('/api/bookings', headers=headers)
+        assert stats.count <= 4
+    """
+    stats = QueryStats()
+    _collectors().append(stats)
+    try:
+        yield stats
+    finally:
+        _collectors().remove(stats)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._query_stats_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    collectors = getattr(_local, 'collectors', None)
+    if collectors:
+        seconds = time.perf_counter() - context._query_stats_start
+        for stats in collectors:
+            stats.record(statement, seconds)
+
+
+def instrument_engine(engine):
+    """Count the statements an engine runs; safe to call more than once."""
+    if not event.contains(engine, 'before_cursor_execute', _before_cursor_execute):
+        event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+
+
+def query_budget(limit):
+    """
+    Declare the most SQL statements a route may run per request.
+
+    Place it directly under the route decorator:
+        @landmarks_bp.route('/bookings', methods=['GET'])
+        @query_budget(4)
+        @jwt_required()
+        def get_bookings():
+    """
+    def decorator(f):
+        f.query_budget = limit
+        return f
+    return decorator
+
+
+def budget_for(app, endpoint):
+    """The @query_budget of an endpoint, or None."""
+    view = app.view_functions.get(endpoint)
+    return getattr(view, 'query_budget', None)
+
+
+def init_query_stats(app):
+    """
+    Count every request's statements and check them against the route's budget.
+
+    Must run after configure_sqlite(), so the read-only engine is instrumented too.
+    """
+    from app.extensions import db
+
+    with app.app_context():
+        instrument_engine(db.engine)
+    if app.extensions.get('sqlite_read_engine') is not None:
+        instrument_engine(app.extensions['sqlite_read_engine'])
+
+    @app.before_request
+    def _start_query_stats():
+        g.query_stats = QueryStats()
+        _collectors().append(g.query_stats)
+
+    @app.after_request
+    def _check_query_stats(response):
+        stats = g.pop('query_stats', None)
+        if stats is None:
+            return response
+        _collectors().remove(stats)
+
+        if app.config['QUERY_COUNT_HEADER']:
+            response.headers['X-Query-Count'] = str(stats.count)
+            response.headers['X-Query-Time-Ms'] = str(stats.milliseconds)
+
+        route = f"{request.method} {request.url_rule.rule if request.url_rule else request.path}"
+        for statement, times in stats.repeated(app.config['QUERY_REPEAT_THRESHOLD']):
+            logger.warning(f"Suspected N+1 in {route}: {times} x {statement[:200]}")
+
+        budget = budget_for(app, request.endpoint)
+        if budget is not None and stats.count > budget:
+            message = f"{route} ran {stats.count} SQL statements, over its budget of {budget}"
+            if app.config['QUERY_BUDGET_STRICT']:
+                raise QueryBudgetExceeded(message)
+            logger.warning(message)
+        return response
+
+    @app.teardown_request
+    def _drop_query_stats(exc):
+        # after_request does not run when the view raised
+        stats = g.pop('query_stats', None)
+        if stats is not None and stats in _collectors():
+            _collectors().remove(stats)
@@ -0,0 +1,178 @@
+"""
+In-place schema upgrades for databases created before a model gained new columns or indexes.
+
+db.create_all() only creates missing tables, so columns and indexes added to an
+existing model are applied here with ALTER TABLE ADD COLUMN and CREATE INDEX.
+New columns must be nullable or carry a server_default so existing rows stay valid.
+"""
+
+import logging
+import sqlite3
+import uuid
+from sqlalchemy import inspect
+from sqlalchemy.dialects import sqlite
+from sqlalchemy.schema import CreateIndex, CreateTable
+from app.models.types import UUIDKey
+
+logger = logging.getLogger(__name__)
+
+
+def _column_ddl(column, dialect):
+    ddl = f"{dialect.identifier_preparer.quote(column.name)} {column.type.compile(dialect=dialect)}"
+    if column.server_default is not None:
+        ddl += f" DEFAULT {column.server_default.arg}"
+    if not column.nullable:
+        ddl += ' NOT NULL'
+    return ddl
+
+
+def upgrade_schema(db):
+    """
+    Add columns and indexes that the models declare but the database lacks.
+
+    Returns:
+        list: (table name, column name) for every column that was added
+    """
+    engine = db.engine
+    added = []
+
+    with engine.begin() as conn:
+        # Inspect through the same connection: a second one would wait on this transaction's lock
+        inspector = inspect(conn)
+        existing_tables = set(inspector.get_table_names())
+        for table in db.metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+
+            columns = {column['name'] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in columns:
+                    continue
+                if not column.nullable and column.server_default is None:
+                    raise RuntimeError(f"Cannot add {table.name}.{column.name}: NOT NULL columns need a server_default")
+                conn.exec_driver_sql(
+                    f"ALTER TABLE {engine.dialect.identifier_preparer.quote(table.name)} "
+                    f"ADD COLUMN {_column_ddl(column, engine.dialect)}"
+                )
+                logger.info(f"Added column {table.name}.{column.name}")
+                added.append((table.name, column.name))
+
+            indexes = {index['name'] for index in inspector.get_indexes(table.name)}
+            for index in table.indexes:
+                if index.name not in indexes:
+                    conn.execute(CreateIndex(index))
+                    logger.info(f"Created index {index.name}")
+
+    return added
+
+
+# The scan search index keys on the stored scan ids; startup rebuilds it after a conversion
+_SEARCH_INDEX_OBJECTS = (
+    'DROP TRIGGER IF EXISTS scans_fts_insert',
+    'DROP TRIGGER IF EXISTS scans_fts_update',
+    'DROP TRIGGER IF EXISTS scans_fts_delete',
+    'DROP TABLE IF EXISTS scans_fts',
+    'DROP TABLE IF EXISTS scan_search_docs',
+)
+
+
+def _converter(target, table, column):
+    def convert(value):
+        if value is None:
+            return None
+        try:
+            if target == 'binary':
+                return value if isinstance(value, bytes) else uuid.UUID(value).bytes
+            return value if isinstance(value, str) else str(uuid.UUID(bytes=value))
+        except (ValueError, TypeError, AttributeError):
+            raise RuntimeError(f"{table}.{column} holds {value!r}, which is not a UUID") from None
+    return convert
+
+
+def convert_uuid_keys(database, metadata, target, batch_size=10000):
+    """
+    Rewrite every UUIDKey column of a SQLite database in the target storage.
+
+    Each table with such a column is renamed, recreated from the model and
+    copied over in batches, all in one transaction, so a failure leaves the
+    database as it was. The app must not be running.
+
+    Args:
+        database: Path of the SQLite database file
+        metadata: The models' MetaData
+        target: 'binary' or 'string'
+
+    Returns:
+        dict: Rows copied per table
+    """
+    previous = UUIDKey.storage
+    UUIDKey.storage = target
+    # A new dialect: type implementations are cached per dialect instance
+    dialect = sqlite.dialect()
+    quote = dialect.identifier_preparer.quote
+    connection = sqlite3.connect(database, isolation_level=None)
+    copied = {}
+
+    try:
+        connection.execute('PRAGMA foreign_keys = OFF')
+        # Keep references in other tables pointing at the original names while tables are swapped
+        connection.execute('PRAGMA legacy_alter_table = ON')
+        connection.execute('BEGIN IMMEDIATE')
+        broken_before = len(connection.execute('PRAGMA foreign_key_check').fetchall())
+        for statement in _SEARCH_INDEX_OBJECTS:
+            connection.execute(statement)
+
+        for table in metadata.sorted_tables:
+            keys = [column.name for column in table.columns if isinstance(column.type, UUIDKey)]
+            existing = {row[1] for row in connection.execute(f"PRAGMA table_info({quote(table.name)})")}
+            if not keys or not existing:
+                continue
+
+            old_name = quote(f"{table.name}__old")
+            indexes = connection.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = ? AND sql IS NOT NULL",
+                (table.name,)
+            ).fetchall()
+            for (index_name,) in indexes:
+                connection.execute(f"DROP INDEX {quote(index_name)}")
+            connection.execute(f"ALTER TABLE {quote(table.name)} RENAME TO {old_name}")
+            connection.execute(str(CreateTable(table).compile(dialect=dialect)))
+            for index in table.indexes:
+                connection.execute(str(CreateIndex(index).compile(dialect=dialect)))
+
+            columns = [column.name for column in table.columns if column.name in existing]
+            converters = [
+                _converter(target, table.name, name) if name in keys else None for name in columns
+            ]
+            column_list = ', '.join(quote(name) for name in columns)
+            insert = (
+                f"INSERT INTO {quote(table.name)} ({column_list}) "
+                f"VALUES ({', '.join('?' for _ in columns)})"
+            )
+            rows = connection.execute(f"SELECT {column_list} FROM {old_name}")
+            copied[table.name] = 0
+            while True:
+                batch = rows.fetchmany(batch_size)
+                if not batch:
+                    break
+                connection.executemany(insert, [
+                    tuple(convert(value) if convert else value for convert, value in zip(converters, row))
+                    for row in batch
+                ])
+                copied[table.name] += len(batch)
+            connection.execute(f"DROP TABLE {old_name}")
+            logger.info(f"Converted {table.name} ({copied[table.name]} rows) to {target} UUID keys")
+
+        violations = connection.execute('PRAGMA foreign_key_check').fetchall()
+        if len(violations) > broken_before:
+            raise RuntimeError(f"Foreign keys broken by the conversion: {violations[:5]}")
+        connection.execute('COMMIT')
+    except Exception:
+        if connection.in_transaction:
+            connection.execute('ROLLBACK')
+        UUIDKey.storage = previous
+        raise
+    finally:
+        connection.close()
+
+    return copied
@@ -0,0 +1,171 @@
+"""
+Query-plan audit for SQLite.
+
+Records every statement the app sends to the database while a block runs, then
+asks SQLite how it would execute each one (EXPLAIN QUERY PLAN). A statement
+fails the audit when it reads one of the large tables without an index
+(SCAN <table>) or sorts rows touching one through a temporary B-tree, unless an
+allow-list entry excuses it. Plans do not depend on how many rows the tables
+hold, so a small seeded database is enough to audit them.
+"""
+
+import re
+from collections import namedtuple
+from sqlalchemy import event
+
+# Tables that grow with the number of users; scanning them gets slower every day
+LARGE_TABLES = frozenset({
+    'users', 'scans', 'reviews', 'bookmarks', 'bookings', 'blacklisted_tokens', 'scan_daily_stats', 'scan_class_stats'
+})
+
+_SKIPPED_STATEMENTS = ('PRAGMA', 'EXPLAIN', 'BEGIN', 'COMMIT', 'ROLLBACK', 'SAVEPOINT', 'RELEASE', 'CREATE', 'DROP', 'ALTER')
+_SCAN_PATTERN = re.compile(r'^SCAN (\w+)(?: AS (\w+))?(.*)$')
+_SEARCH_PATTERN = re.compile(r'^SEARCH (\w+)(?: AS (\w+))?')
+
+PlanIssue = namedtuple('PlanIssue', ['kind', 'detail', 'statement'])
+AllowedPlan = namedtuple('AllowedPlan', ['route', 'detail', 'reason'])
+
+
+class RouteReport:
+    """Statements one route issued and the plan problems found in them."""
+
+    def __init__(self, route):
+        self.route = route
+        self.statements = []
+        self.issues = []
+        self.allowed = []
+
+    @property
+    def ok(self):
+        return not self.issues
+
+    def format(self, width=100):
+        status = '✅' if self.ok else f"❌ {len(self.issues)} issue{'s' if len(self.issues) != 1 else ''}"
+        lines = [f"{self.route:<48} {len(self.statements):>3} queries  {status}"]
+        for issue in self.issues:
+            lines.append(f"    {issue.kind}: {issue.detail}")
+            lines.append(f"        {_one_line(issue.statement)[:width]}")
+        for issue, reason in self.allowed:
+            lines.append(f"    allowed {issue.kind}: {issue.detail} ({reason})")
+        return '\n'.join(lines)
+
+
+class QueryPlanAudit:
+    """
+    Capture the statements an engine runs and check their query plans.
+
+    Usage:
+        audit = QueryPlanAudit(db.engine)
+        with audit.route('GET /api/scans/user'):
+            client.get('/api/scans/user', headers=headers)
+        print(audit.format_report())
+        audit.assert_clean()
+
+    Args:
+        engine: SQLAlchemy engine for a SQLite database
+        large_tables: Table names that must not be scanned or sorted without an index
+        allow: AllowedPlan entries; route is a route label or '*' and detail a
+            regular expression matched against the plan line
+        read_engine: Read-only engine for the same database, if the app has one
+    """
+
+    def __init__(self, engine, large_tables=LARGE_TABLES, allow=(), read_engine=None):
+        if engine.dialect.name != 'sqlite':
+            raise ValueError(f"Query-plan audit needs SQLite, not {engine.dialect.name}")
+        self.engine = engine
+        self.engines = [engine] + ([read_engine] if read_engine is not None else [])
+        self.large_tables = frozenset(large_tables)
+        self.allow = [AllowedPlan(route, re.compile(detail), reason) for route, detail, reason in allow]
+        self.reports = []
+        self._recording = None
+
+    def route(self, label):
+        """Context manager recording the statements issued inside it under label."""
+        return _Recording(self, label)
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if self._recording is None or statement.lstrip().upper().startswith(_SKIPPED_STATEMENTS):
+            return
+        if executemany:
+            parameters = parameters[0] if parameters else ()
+        self._recording.statements.append((statement, parameters))
+
+    def _check(self, report):
+        seen = set()
+        with self.engine.connect() as conn:
+            for statement, parameters in report.statements:
+                if statement in seen:
+                    continue
+                seen.add(statement)
+                plan = [row[3] for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)]
+                for issue in self.plan_issues(statement, plan):
+                    reason = self._allowed(report.route, issue)
+                    if reason is None:
+                        report.issues.append(issue)
+                    else:
+                        report.allowed.append((issue, reason))
+
+    def plan_issues(self, statement, plan):
+        """Problems in one statement's EXPLAIN QUERY PLAN detail lines."""
+        issues = []
+        touches_large_table = False
+        for detail in plan:
+            scan = _SCAN_PATTERN.match(detail)
+            search = _SEARCH_PATTERN.match(detail)
+            match = scan or search
+            if match is None or match.group(1) not in self.large_tables:
+                continue
+            touches_large_table = True
+            if scan and 'VIRTUAL TABLE' not in scan.group(3):
+                issues.append(PlanIssue('full scan', detail, statement))
+
+        if touches_large_table:
+            issues.extend(
+                PlanIssue('temp b-tree', detail, statement)
+                for detail in plan if detail.startswith('USE TEMP B-TREE')
+            )
+        return issues
+
+    def _allowed(self, route, issue):
+        for entry in self.allow:
+            if entry.route in ('*', route) and entry.detail.search(issue.detail):
+                return entry.reason
+        return None
+
+    @property
+    def issues(self):
+        return [(report.route, issue) for report in self.reports for issue in report.issues]
+
+    def format_report(self):
+        return '\n'.join(report.format() for report in self.reports)
+
+    def assert_clean(self):
+        """Raise AssertionError listing every route with an unexcused plan problem."""
+        failing = [report for report in self.reports if not report.ok]
+        if failing:
+            raise AssertionError('Query plans need an index:\n' + '\n'.join(report.format() for report in failing))
+
+
+class _Recording:
+    def __init__(self, audit, label):
+        self.audit = audit
+        self.report = RouteReport(label)
+
+    def __enter__(self):
+        self.audit._recording = self.report
+        for engine in self.audit.engines:
+            event.listen(engine, 'before_cursor_execute', self.audit._before_cursor_execute)
+        return self.report
+
+    def __exit__(self, exc_type, exc, tb):
+        for engine in self.audit.engines:
+            event.remove(engine, 'before_cursor_execute', self.audit._before_cursor_execute)
+        self.audit._recording = None
+        self.audit.reports.append(self.report)
+        if exc_type is None:
+            self.audit._check(self.report)
+        return False
+
+
+def _one_line(statement):
+    return ' '.join(statement.split())
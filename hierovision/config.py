@@ -1,3 +1,4 @@
+import json
 import os
 from datetime import timedelta
 
@@ -10,6 +11,50 @@ class Config:
     # Database
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or 'sqlite:///hierosecret.db'
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        'pool_size': int(os.environ.get('DB_POOL_SIZE') or 5),
+        'max_overflow': int(os.environ.get('DB_MAX_OVERFLOW') or 10),
+        'pool_timeout': float(os.environ.get('DB_POOL_TIMEOUT') or 30)
+    }
+    
+    # SQLite engine profile: 'tuned' (WAL, synchronous=NORMAL, read-only connections for reads) or 'default'
+    SQLITE_PROFILE = os.environ.get('SQLITE_PROFILE') or 'tuned'
+    SQLITE_BUSY_TIMEOUT_MS = int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS') or 10000)
+    SQLITE_CACHE_SIZE_MB = int(os.environ.get('SQLITE_CACHE_SIZE_MB') or 32)
+    SQLITE_MMAP_SIZE_MB = int(os.environ.get('SQLITE_MMAP_SIZE_MB') or 256)
+    SQLITE_READ_POOL_SIZE = int(os.environ.get('SQLITE_READ_POOL_SIZE') or 8)
+    
+    # UUID key storage for new databases: 'binary' (16 bytes, native uuid on PostgreSQL) or 'string' (VARCHAR(36)).
+    # Existing databases keep theirs until converted with scripts/migrate_uuid_keys.py
+    UUID_KEY_STORAGE = os.environ.get('UUID_KEY_STORAGE') or 'binary'
+    
+    # Per-request SQL statement counts: X-Query-Count / X-Query-Time-Ms response headers, the number of times one
+    # statement may repeat in a request before it is logged as a suspected N+1, and whether going over a route's
+    # @query_budget raises instead of logging
+    QUERY_COUNT_HEADER = (os.environ.get('QUERY_COUNT_HEADER') or 'False').lower() == 'true'
+    QUERY_REPEAT_THRESHOLD = int(os.environ.get('QUERY_REPEAT_THRESHOLD') or 5)
+    QUERY_BUDGET_STRICT = (os.environ.get('QUERY_BUDGET_STRICT') or 'False').lower() == 'true'
+    
+    # Database maintenance (ANALYZE, PRAGMA optimize, incremental vacuum); scripts/run_maintenance.py runs it from cron,
+    # MAINTENANCE_SCHEDULER=True runs it in a background thread of each worker while the worker is quiet
+    MAINTENANCE_SCHEDULER = (os.environ.get('MAINTENANCE_SCHEDULER') or 'False').lower() == 'true'
+    MAINTENANCE_CHECK_INTERVAL_SECONDS = int(os.environ.get('MAINTENANCE_CHECK_INTERVAL_SECONDS') or 60)
+    MAINTENANCE_MAX_REQUESTS_PER_MINUTE = int(os.environ.get('MAINTENANCE_MAX_REQUESTS_PER_MINUTE') or 30)
+    MAINTENANCE_OPTIMIZE_INTERVAL_HOURS = float(os.environ.get('MAINTENANCE_OPTIMIZE_INTERVAL_HOURS') or 6)
+    MAINTENANCE_OPTIMIZE_BUDGET_SECONDS = float(os.environ.get('MAINTENANCE_OPTIMIZE_BUDGET_SECONDS') or 10)
+    MAINTENANCE_ANALYZE_INTERVAL_HOURS = float(os.environ.get('MAINTENANCE_ANALYZE_INTERVAL_HOURS') or 168)
+    MAINTENANCE_ANALYZE_BUDGET_SECONDS = float(os.environ.get('MAINTENANCE_ANALYZE_BUDGET_SECONDS') or 120)
+    MAINTENANCE_VACUUM_INTERVAL_HOURS = float(os.environ.get('MAINTENANCE_VACUUM_INTERVAL_HOURS') or 24)
+    MAINTENANCE_VACUUM_BUDGET_SECONDS = float(os.environ.get('MAINTENANCE_VACUUM_BUDGET_SECONDS') or 60)
+    # Seconds any one write-locking statement of a scheduled run may take; well below the busy timeout other writers wait
+    MAINTENANCE_STATEMENT_BUDGET_SECONDS = float(
+        os.environ.get('MAINTENANCE_STATEMENT_BUDGET_SECONDS') or SQLITE_BUSY_TIMEOUT_MS / 4000
+    )
+    # Minutes before a run that did not complete (interrupted, timed out, failed) is retried, doubling per consecutive one
+    MAINTENANCE_RETRY_MINUTES = float(os.environ.get('MAINTENANCE_RETRY_MINUTES') or 10)
+    MAINTENANCE_VACUUM_MIN_FREE_RATIO = float(os.environ.get('MAINTENANCE_VACUUM_MIN_FREE_RATIO') or 0.2)
+    MAINTENANCE_ANALYSIS_LIMIT = int(os.environ.get('MAINTENANCE_ANALYSIS_LIMIT') or 400)
+    MAINTENANCE_HISTORY_DAYS = int(os.environ.get('MAINTENANCE_HISTORY_DAYS') or 90)
     
     # File uploads
     UPLOAD_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'uploads')
@@ -25,8 +70,55 @@ class Config:
     YOLO_MODEL_PATH = os.environ.get('YOLO_MODEL_PATH') or os.path.join(os.path.dirname(os.path.abspath(__file__)), 'Yolov8m_Best.pt')
     CLASSIFICATION_MODEL_PATH = os.environ.get('CLASSIFICATION_MODEL_PATH') or os.path.join(os.path.dirname(os.path.abspath(__file__)), 'Classification_Model.pt')
     
+    # Inference execution: 'eager', 'compile' (torch.compile) or 'onednn' (TorchScript + oneDNN graph fusion)
+    INFERENCE_EXECUTION_MODE = os.environ.get('INFERENCE_EXECUTION_MODE') or 'eager'
+    INFERENCE_COMPILE_CACHE_DIR = os.environ.get('INFERENCE_COMPILE_CACHE_DIR') or os.path.join(os.path.dirname(os.path.abspath(__file__)), 'instance', 'compile_cache')
+    
+    # Model registry: additional classifiers as JSON {"name": {"version": {"path": ..., "num_classes": ...}}}.
+    # The classification model above is always registered as gardner:1.
+    MODEL_REGISTRY = json.loads(os.environ.get('MODEL_REGISTRY') or '{}')
+    DEFAULT_MODEL = os.environ.get('DEFAULT_MODEL') or 'gardner:1'
+    MODEL_MEMORY_BUDGET_MB = int(os.environ.get('MODEL_MEMORY_BUDGET_MB') or 512)
+    
+    # Inference backend: 'local' runs the model in each web worker, 'ipc' uses inference_server.py
+    INFERENCE_BACKEND = os.environ.get('INFERENCE_BACKEND') or 'local'
+    INFERENCE_SOCKET_PATH = os.environ.get('INFERENCE_SOCKET_PATH') or os.path.join(os.path.dirname(os.path.abspath(__file__)), 'instance', 'inference.sock')
+    INFERENCE_SHARED_MEMORY = (os.environ.get('INFERENCE_SHARED_MEMORY') or 'True').lower() == 'true'
+    INFERENCE_TIMEOUT = float(os.environ.get('INFERENCE_TIMEOUT') or 30)
+    INFERENCE_MAX_BATCH_SIZE = int(os.environ.get('INFERENCE_MAX_BATCH_SIZE') or 32)
+    INFERENCE_MAX_BATCH_DELAY_MS = float(os.environ.get('INFERENCE_MAX_BATCH_DELAY_MS') or 5)
+    INFERENCE_DEFAULT_DEADLINE_MS = int(os.environ.get('INFERENCE_DEFAULT_DEADLINE_MS') or 10000)
+    INFERENCE_MAX_RAW_IMAGES = int(os.environ.get('INFERENCE_MAX_RAW_IMAGES') or 8)
+    
+    # HTTP caching: seconds clients may reuse catalog and landmark responses before revalidating
+    CATALOG_CACHE_MAX_AGE = int(os.environ.get('CATALOG_CACHE_MAX_AGE') or 86400)
+    LANDMARKS_CACHE_MAX_AGE = int(os.environ.get('LANDMARKS_CACHE_MAX_AGE') or 60)
+    
+    # Scans read per query while streaming /api/scans/export
+    SCAN_EXPORT_BATCH_SIZE = int(os.environ.get('SCAN_EXPORT_BATCH_SIZE') or 500)
+    
+    # Offline catalog: published versions kept for /catalog/delta
+    CATALOG_SNAPSHOT_RETENTION = int(os.environ.get('CATALOG_SNAPSHOT_RETENTION') or 20)
+    
+    # Largest number of texts accepted by the batch English-to-hieroglyphs endpoint
+    TRANSLATION_BATCH_LIMIT = int(os.environ.get('TRANSLATION_BATCH_LIMIT') or 1000)
+    
+    # English-to-hieroglyphs translation: 'lexicon' (local only) or 'gemini' (model with lexicon fallback)
+    TRANSLATION_BACKEND = os.environ.get('TRANSLATION_BACKEND') or 'lexicon'
+    TRANSLATION_CACHE_PATH = os.environ.get('TRANSLATION_CACHE_PATH') or os.path.join(os.path.dirname(os.path.abspath(__file__)), 'instance', 'translation_cache.sqlite3')
+    TRANSLATION_TIMEOUT = float(os.environ.get('TRANSLATION_TIMEOUT') or 10)
+    TRANSLATION_POOL_SIZE = int(os.environ.get('TRANSLATION_POOL_SIZE') or 16)
+    
+    # Server-side glyph rendering: font covering U+13000-U+1342F and the pixel sizes rasterized into atlases
+    GLYPH_FONT_PATH = os.environ.get('GLYPH_FONT_PATH') or os.path.join(os.path.dirname(os.path.abspath(__file__)), 'app', 'data', 'fonts', 'NotoSansEgyptianHieroglyphs-Regular.ttf')
+    GLYPH_SIZES = [int(size) for size in (os.environ.get('GLYPH_SIZES') or '32,48,96').split(',')]
+    GLYPH_RENDER_CACHE_MB = int(os.environ.get('GLYPH_RENDER_CACHE_MB') or 32)
+    GLYPH_RENDER_MAX_CHARS = int(os.environ.get('GLYPH_RENDER_MAX_CHARS') or 500)
+    
     # Gemini AI
     GEMINI_API_KEY = os.environ.get('GEMINI_API_KEY') or 'your-gemini-api-key-here'
+    GEMINI_API_URL = os.environ.get('GEMINI_API_URL') or 'https://generativelanguage.googleapis.com'
+    GEMINI_MODEL = os.environ.get('GEMINI_MODEL') or 'gemini-1.5-flash'
     
     # CORS
     CORS_ORIGINS = "*"  # Change this in production
@@ -35,6 +127,7 @@ class Config:
 class DevelopmentConfig(Config):
     """Development configuration."""
     DEBUG = True
+    QUERY_COUNT_HEADER = True
 
 
 class ProductionConfig(Config):
@@ -49,6 +142,8 @@ class TestingConfig(Config):
     """Testing configuration."""
     TESTING = True
     SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+    SQLALCHEMY_ENGINE_OPTIONS = {}  # In-memory SQLite uses a single static connection
+    QUERY_BUDGET_STRICT = True
 
 
 config = {
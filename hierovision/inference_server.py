@@ -0,0 +1,16 @@
+#!/usr/bin/env python3
+"""
+Standalone inference server.
+Owns the classification models and batches predictions for the Flask workers,
+which reach it over a Unix socket when INFERENCE_BACKEND=ipc.
+"""
+
+import logging
+from config import Config
+from app.services.inference_server import serve
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(name)s: %(message)s')
+
+    config = {key: getattr(Config, key) for key in dir(Config) if key.isupper()}
+    serve(config)
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Query-plan and query-count audit of the API routes.
+Calls every database-backed route through the Flask test client against a
+scratch SQLite database, runs EXPLAIN QUERY PLAN on each statement it issued
+and prints a per-route report. Exits with status 1 when a query on a large
+table does a full scan or a temp B-tree sort that ALLOWED_PLANS does not
+excuse, when a route runs more statements than its @query_budget, or when a
+statement repeats often enough to suggest an N+1 pattern, so CI can run it as
+a check.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import tempfile
+import uuid
+from datetime import datetime, timedelta
+from app import create_app
+from app.extensions import db
+from app.models.landmark import Landmark, Bookmark, Review, Booking
+from app.models.scan import Scan
+from app.models.user import User
+from app.utils.auth import generate_token, hash_password
+from app.utils.query_stats import budget_for, count_queries
+from app.utils.sql_audit import QueryPlanAudit
+from config import Config
+
+# (route label or '*', regex over the plan line, why it is acceptable)
+ALLOWED_PLANS = [
+    ('GET /api/landmarks/<landmark_id>/reviews', r'^USE TEMP B-TREE FOR GROUP BY$',
+     "summary=1 histogram groups one landmark's reviews, found through ix_reviews_landmark_created"),
+    ('GET /api/user/stats', r'^USE TEMP B-TREE FOR ORDER BY$',
+     "Top classes sort one user's scan_class_stats rows, at most one per Gardner class"),
+]
+
+PASSWORD = 'audit-password'
+
+# (method, path, JSON body); {placeholders} are filled from the seeded ids
+ROUTES = [
+    ('POST', '/api/auth/login', {'email': 'audit@example.com', 'password': PASSWORD}),
+    ('GET', '/api/auth/verify', None),
+    ('GET', '/api/user/profile', None),
+    ('GET', '/api/user/stats', None),
+    ('PUT', '/api/user/country', {'selectedCountry': 'Egypt'}),
+    ('GET', '/api/scans/user', None),
+    ('GET', '/api/scans/user?cursor=', None),
+    ('GET', '/api/scans/search?q=ankh', None),
+    ('GET', '/api/scans/recent', None),
+    ('GET', '/api/scans/{scan_id}', None),
+    ('PUT', '/api/scans/{scan_id}', {'description': 'ankh amulet, audited'}),
+    ('POST', '/api/scans/save', {'description': 'eye of horus', 'confidence': 0.9}),
+    ('GET', '/api/landmarks', None),
+    ('GET', '/api/landmarks?location=Luxor&location=Giza&sort=-rating&min_rating=1', None),
+    ('GET', '/api/landmarks?type=Temple&min_price=10&max_price=200&sort=price', None),
+    ('GET', '/api/landmarks/{landmark_id}', None),
+    ('GET', '/api/landmarks/{landmark_id}/reviews?summary=1', None),
+    ('POST', '/api/landmarks/{landmark_id}/reviews', {'rating': 4, 'comment': 'Worth the trip'}),
+    ('PUT', '/api/reviews/{review_id}', {'rating': 5, 'comment': 'Even better the second time'}),
+    ('GET', '/api/bookmarks', None),
+    ('POST', '/api/bookmarks', {'landmark_id': '{landmark_id}'}),
+    ('DELETE', '/api/bookmarks/{landmark_id}', None),
+    ('GET', '/api/bookings', None),
+    ('GET', '/api/bookings/{booking_id}', None),
+    ('PUT', '/api/bookings/{booking_id}', {'contact_phone': '+20 100 000 0000'}),
+    ('POST', '/api/bookings/{booking_id}/payment', {'payment_method': 'credit_card'}),
+    ('GET', '/api/catalog/snapshot', None),
+    ('DELETE', '/api/reviews/{review_id}', None),
+    ('DELETE', '/api/scans/{scan_id}', None),
+    ('POST', '/api/auth/logout', None),
+]
+
+
+def seed():
+    """Create a user with a little of everything the routes read."""
+    user = User(uid=str(uuid.uuid4()), full_name='Audit', email='audit@example.com', password_hash=hash_password(PASSWORD))
+    other = User(uid=str(uuid.uuid4()), full_name='Other', email='other@example.com', password_hash=hash_password(PASSWORD))
+    landmarks = [
+        Landmark(id=str(uuid.uuid4()), name=name, location='Luxor', type='temple', description=name,
+                 image='temple.jpg', hieroglyph_name='𓉟', price=100.0, tours=['Guided Tour'])
+        for name in ('Temple of Karnak', 'Luxor Temple', 'Valley of the Kings', 'Abu Simbel', 'Philae Temple', 'Edfu Temple')
+    ]
+    db.session.add_all([user, other] + landmarks)
+    db.session.flush()
+
+    start = datetime(2024, 1, 1)
+    scans = [
+        Scan(user_uid=owner.uid, image_url='scan.jpg', description=f"ankh scan {i}", predicted_class=i,
+             timestamp=start + timedelta(hours=i))
+        for owner in (user, other) for i in range(10)
+    ]
+    review = Review(id=str(uuid.uuid4()), user_id=other.uid, landmark_id=landmarks[0].id, rating=5, comment='Superb')
+    own_review = Review(id=str(uuid.uuid4()), user_id=user.uid, landmark_id=landmarks[0].id, rating=3, comment='Busy')
+    # One bookmark and booking per landmark, so a per-row lazy load repeats often enough to be reported
+    bookmarks = [Bookmark(id=str(uuid.uuid4()), user_id=user.uid, landmark_id=landmark.id) for landmark in landmarks[2:]]
+    bookings = [
+        Booking(id=str(uuid.uuid4()), user_id=user.uid, landmark_id=landmark.id, date=start, visitors=2,
+                tour_type='Guided Tour', total_price=200.0, contact_name='Audit', contact_email=user.email)
+        for landmark in landmarks
+    ]
+    db.session.add_all(scans + [review, own_review] + bookmarks + bookings)
+    db.session.commit()
+    Landmark.refresh_review_stats()
+
+    return user, {
+        'scan_id': scans[0].id,
+        'landmark_id': landmarks[1].id,
+        'review_id': own_review.id,
+        'booking_id': bookings[0].id,
+    }
+
+
+def fill(value, ids):
+    if isinstance(value, str):
+        return value.format(**ids)
+    if isinstance(value, dict):
+        return {key: fill(item, ids) for key, item in value.items()}
+    return value
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Fail when an API route scans a large table or runs too many queries')
+    parser.add_argument('--verbose', action='store_true', help='Print every route, not only the failing ones')
+    args = parser.parse_args()
+
+    database = os.path.join(tempfile.mkdtemp(), 'audit.db')
+
+    class AuditConfig(Config):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{database}"
+
+    app = create_app(AuditConfig)
+    with app.app_context():
+        user, ids = seed()
+        headers = {'Authorization': f"Bearer {generate_token(user.uid)}"}
+        audit = QueryPlanAudit(db.engine, allow=ALLOWED_PLANS, read_engine=app.extensions.get('sqlite_read_engine'))
+        client = app.test_client()
+        urls = app.url_map.bind('localhost')
+        count_problems = {}
+
+        for method, path, body in ROUTES:
+            path = fill(path, ids)
+            label = f"{method} {path.split('?')[0]}"
+            for key, value in ids.items():
+                label = label.replace(value, f"<{key}>")
+            with audit.route(label), count_queries() as stats:
+                response = client.open(path, method=method, json=fill(body, ids), headers=headers)
+            if response.status_code >= 400:
+                print(f"⚠️  {label} returned {response.status_code}; its queries may be incomplete")
+
+            problems = count_problems.setdefault(label, [])
+            budget = budget_for(app, urls.match(path.split('?')[0], method=method)[0])
+            if budget is not None and stats.count > budget:
+                problems.append(f"{stats.count} statements, over the route's budget of {budget}")
+            for statement, times in stats.repeated(app.config['QUERY_REPEAT_THRESHOLD']):
+                problems.append(f"suspected N+1, {times} x {statement[:100]}")
+
+    for report in audit.reports:
+        if args.verbose or not report.ok or count_problems[report.route]:
+            print(report.format())
+        for problem in count_problems[report.route]:
+            print(f"    ❌ {problem}")
+
+    failing = [report for report in audit.reports if not report.ok]
+    over_budget = [label for label, problems in count_problems.items() if problems]
+    if failing:
+        print(f"❌ {len(failing)} of {len(audit.reports)} routes run queries that need an index")
+    if over_budget:
+        print(f"❌ {len(over_budget)} of {len(audit.reports)} routes run too many queries")
+    if failing or over_budget:
+        sys.exit(1)
+    print(f"✅ {len(audit.reports)} routes audited, no full scans, temp B-tree sorts or excess queries")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Inference benchmark for the HieroVision classification model.
+Compares eager execution against the compiled execution modes at several batch sizes.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import statistics
+import time
+import torch
+from config import Config
+from app.services.ml_service import HieroglyphPredictor, EXECUTION_MODES
+
+
+def time_batches(predictor, batch_size, iterations, warmup):
+    """Return the median latency in milliseconds for one batch of the given size."""
+    batch = torch.randn(batch_size, 3, 224, 224)
+
+    for _ in range(warmup):
+        predictor.run_batch(batch)
+
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        predictor.run_batch(batch)
+        timings.append((time.perf_counter() - start) * 1000)
+
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark classification model execution modes')
+    parser.add_argument('--modes', default=','.join(EXECUTION_MODES), help='Comma-separated execution modes')
+    parser.add_argument('--batch-sizes', default='1,8,32', help='Comma-separated batch sizes')
+    parser.add_argument('--iterations', type=int, default=20, help='Timed iterations per batch size')
+    parser.add_argument('--warmup', type=int, default=3, help='Untimed iterations per batch size')
+    parser.add_argument('--model-path', default=Config.CLASSIFICATION_MODEL_PATH)
+    parser.add_argument('--cache-dir', default=Config.INFERENCE_COMPILE_CACHE_DIR)
+    parser.add_argument('--threads', type=int, default=None, help='Torch intra-op threads')
+    args = parser.parse_args()
+
+    if args.threads:
+        torch.set_num_threads(args.threads)
+
+    modes = [mode.strip() for mode in args.modes.split(',') if mode.strip()]
+    batch_sizes = [int(size) for size in args.batch_sizes.split(',')]
+
+    results = {}
+    for mode in modes:
+        start = time.perf_counter()
+        predictor = HieroglyphPredictor(args.model_path, execution_mode=mode, compile_cache_dir=args.cache_dir)
+        load_seconds = time.perf_counter() - start
+
+        if predictor.execution_mode != mode:
+            print(f"Skipping {mode}: not available in this environment")
+            continue
+
+        print(f"{mode}: loaded in {load_seconds:.2f}s")
+        results[mode] = {size: time_batches(predictor, size, args.iterations, args.warmup) for size in batch_sizes}
+
+    baseline = results.get('eager')
+
+    print()
+    print(f"{'mode':<10}{'batch':>7}{'median ms':>12}{'images/s':>12}{'speedup':>10}")
+    print("-" * 51)
+    for mode, timings in results.items():
+        for size, median_ms in timings.items():
+            throughput = size / (median_ms / 1000)
+            speedup = f"{baseline[size] / median_ms:.2f}x" if baseline else '-'
+            print(f"{mode:<10}{size:>7}{median_ms:>12.2f}{throughput:>12.1f}{speedup:>10}")
+
+
+if __name__ == '__main__':
+    main()
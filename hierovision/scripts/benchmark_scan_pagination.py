@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Scan history pagination benchmark.
+Fills a scratch SQLite database with one heavy user's scans and compares offset
+pagination (page/per_page) with cursor pagination at a shallow and a deep page.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import statistics
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+from app import create_app
+from app.extensions import db
+from app.models.scan import Scan
+from app.models.user import User
+from app.utils.pagination import keyset_page, encode_cursor
+from config import Config
+
+
+def median_ms(func, iterations):
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark offset against cursor pagination of scan history')
+    parser.add_argument('--scans', type=int, default=50000, help='Scans owned by the benchmark user')
+    parser.add_argument('--other-scans', type=int, default=50000, help='Scans owned by other users')
+    parser.add_argument('--per-page', type=int, default=20)
+    parser.add_argument('--pages', default='1,1000', help='Comma-separated page numbers to time')
+    parser.add_argument('--iterations', type=int, default=20)
+    args = parser.parse_args()
+
+    pages = [int(page) for page in args.pages.split(',')]
+    if max(pages) * args.per_page > args.scans:
+        parser.error('--scans is too small for the deepest page')
+
+    database = os.path.join(tempfile.mkdtemp(), 'benchmark.db')
+
+    class BenchmarkConfig(Config):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{database}"
+
+    app = create_app(BenchmarkConfig)
+    with app.app_context():
+        user = User(uid=str(uuid.uuid4()), full_name='Benchmark', email='benchmark@example.com', password_hash=b'-')
+        other = User(uid=str(uuid.uuid4()), full_name='Other', email='other@example.com', password_hash=b'-')
+        db.session.add_all([user, other])
+        db.session.commit()
+
+        start = datetime(2024, 1, 1)
+        rows = [
+            {'id': str(uuid.uuid4()), 'user_uid': owner, 'image_url': 'scan.jpg', 'description': f"Scan {i}",
+             'timestamp': start + timedelta(seconds=i)}
+            for owner, count in ((user.uid, args.scans), (other.uid, args.other_scans))
+            for i in range(count)
+        ]
+        db.session.execute(Scan.__table__.insert(), rows)
+        db.session.commit()
+        print(f"Seeded {len(rows)} scans in {database}")
+
+        query = Scan.query.filter_by(user_uid=user.uid)
+        ordered = query.order_by(Scan.timestamp.desc(), Scan.id.desc())
+
+        print(f"{'page':>6} {'offset + count':>16} {'offset':>10} {'cursor':>10}")
+        for page in pages:
+            # The cursor a client holds after reading the previous page
+            cursor = None
+            if page > 1:
+                last = ordered.offset((page - 1) * args.per_page - 1).first()
+                cursor = encode_cursor([last.timestamp, last.id])
+
+            offset_counted = median_ms(
+                lambda: ordered.paginate(page=page, per_page=args.per_page, error_out=False), args.iterations
+            )
+            offset_only = median_ms(
+                lambda: ordered.paginate(page=page, per_page=args.per_page, error_out=False, count=False), args.iterations
+            )
+            keyset = median_ms(
+                lambda: keyset_page(query, (Scan.timestamp, Scan.id), args.per_page, cursor), args.iterations
+            )
+            print(f"{page:>6} {offset_counted:>13.2f} ms {offset_only:>7.2f} ms {keyset:>7.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
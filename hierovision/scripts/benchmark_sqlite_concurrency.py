@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+SQLite concurrency benchmark.
+Runs several worker processes, each with its own app instance as under
+gunicorn, against one scratch database. Every worker saves and edits scans
+while reading scan history and landmark reviews through the test client.
+Compares SQLite's default settings with the tuned SQLITE_PROFILE: requests
+per second, latency and failed requests ("database is locked" surfaces as a 500).
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import multiprocessing
+import random
+import statistics
+import tempfile
+import time
+import uuid
+
+
+def make_config(database, profile):
+    from config import Config
+
+    class BenchmarkConfig(Config):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{database}"
+        SQLITE_PROFILE = profile
+
+    return BenchmarkConfig
+
+
+def seed(database, profile, workers):
+    """Create the database and one user per worker; returns (user ids, landmark id)."""
+    from app import create_app
+    from app.extensions import db
+    from app.models.landmark import Landmark
+    from app.models.user import User
+
+    app = create_app(make_config(database, profile))
+    with app.app_context():
+        users = [
+            User(uid=str(uuid.uuid4()), full_name=f"Worker {i}", email=f"worker{i}@example.com", password_hash=b'-')
+            for i in range(workers)
+        ]
+        db.session.add_all(users)
+        db.session.commit()
+        uids = [user.uid for user in users]
+        landmark_id = Landmark.query.first().id
+        db.engine.dispose()
+    return uids, landmark_id
+
+
+def worker(database, profile, uid, landmark_id, duration, write_ratio, results):
+    from app import create_app
+    from app.utils.auth import generate_token
+
+    app = create_app(make_config(database, profile))
+    with app.app_context():
+        headers = {'Authorization': f"Bearer {generate_token(uid)}"}
+    client = app.test_client()
+    rng = random.Random(uid)
+    latencies = {'read': [], 'write': []}
+    failures = {'read': 0, 'write': 0}
+    scan_ids = []
+
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        if rng.random() < write_ratio:
+            kind = 'write'
+            if scan_ids and rng.random() < 0.3:
+                request = ('PUT', f"/api/scans/{rng.choice(scan_ids)}", {'description': f"edited {rng.random()}"})
+            else:
+                request = ('POST', '/api/scans/save', {'description': f"ankh {rng.random()}", 'confidence': 0.9})
+        else:
+            kind = 'read'
+            if rng.random() < 0.5:
+                request = ('GET', '/api/scans/user?cursor=', None)
+            else:
+                request = ('GET', f"/api/landmarks/{landmark_id}/reviews", None)
+
+        method, path, body = request
+        start = time.perf_counter()
+        response = client.open(path, method=method, json=body, headers=headers)
+        latencies[kind].append((time.perf_counter() - start) * 1000)
+        if response.status_code >= 500:
+            failures[kind] += 1
+        elif method == 'POST':
+            scan_ids.append(response.get_json()['scan']['id'])
+
+    results.put((latencies, failures))
+
+
+def run(profile, args):
+    database = os.path.join(tempfile.mkdtemp(), 'benchmark.db')
+    uids, landmark_id = seed(database, profile, args.workers)
+
+    context = multiprocessing.get_context('spawn')
+    results = context.Queue()
+    processes = [
+        context.Process(target=worker, args=(database, profile, uid, landmark_id, args.duration, args.write_ratio, results))
+        for uid in uids
+    ]
+    for process in processes:
+        process.start()
+    collected = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+
+    summary = {}
+    for kind in ('read', 'write'):
+        timings = sorted(t for latencies, _ in collected for t in latencies[kind])
+        failed = sum(failures[kind] for _, failures in collected)
+        p99 = timings[int(len(timings) * 0.99)] if timings else 0.0
+        summary[kind] = (len(timings) / args.duration, statistics.median(timings) if timings else 0.0, p99, failed)
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark concurrent SQLite reads and writes from several app processes')
+    parser.add_argument('--workers', type=int, default=8, help='Worker processes, like gunicorn workers')
+    parser.add_argument('--duration', type=float, default=10.0, help='Seconds each worker runs')
+    parser.add_argument('--write-ratio', type=float, default=0.3, help='Fraction of requests that write')
+    parser.add_argument('--profiles', default='default,tuned', help='Comma-separated SQLITE_PROFILE values to compare')
+    args = parser.parse_args()
+
+    print(f"{args.workers} workers, {args.duration:.0f} s, {args.write_ratio:.0%} writes")
+    print(f"{'profile':>8} {'kind':>6} {'req/s':>8} {'p50':>9} {'p99':>10} {'failed':>7}")
+    for profile in args.profiles.split(','):
+        summary = run(profile, args)
+        for kind, (rate, p50, p99, failed) in summary.items():
+            print(f"{profile:>8} {kind:>6} {rate:>8.0f} {p50:>6.1f} ms {p99:>7.1f} ms {failed:>7}")
+
+
+if __name__ == '__main__':
+    main()
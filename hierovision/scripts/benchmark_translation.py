@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Translation benchmark for the 'gemini' translation backend.
+Runs a stub model server in-process and measures cold, cached and coalesced
+translations, reporting how many calls actually reached the model.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from app.services.translation import GeminiTranslationBackend, TranslationCache
+from scripts.llm_stub_server import StubServer
+
+SENTENCES = [
+    'The king of Egypt',
+    'Life and health to the pharaoh',
+    'The sun rises over the river',
+    'The priest writes in the temple',
+    'Great is the power of the gods',
+    'My heart is happy',
+    'The scribe counts the bread and beer',
+    'Water for the fields',
+]
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    func(*args)
+    return (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the cached, coalesced translation backend')
+    parser.add_argument('--latency-ms', type=float, default=200.0, help='Simulated model latency')
+    parser.add_argument('--concurrency', type=int, default=32, help='Simultaneous requests for the same text')
+    parser.add_argument('--repeat', type=int, default=200, help='Cached translations timed')
+    parser.add_argument('--cache-path', default=':memory:', help='SQLite cache file (default: in memory)')
+    args = parser.parse_args()
+
+    server = StubServer(('127.0.0.1', 0), latency_ms=args.latency_ms)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    backend = GeminiTranslationBackend(url, 'stub', 'stub-model', cache=TranslationCache(args.cache_path), pool_size=args.concurrency)
+
+    cold = [timed(backend.translate, sentence) for sentence in SENTENCES]
+    cold_calls = server.stats()['requests']
+    print(f"Cold:      median {statistics.median(cold):8.2f} ms  ({cold_calls} model calls for {len(SENTENCES)} texts)")
+
+    cached = [timed(backend.translate, SENTENCES[i % len(SENTENCES)].upper()) for i in range(args.repeat)]
+    print(f"Cached:    median {statistics.median(cached):8.2f} ms  ({server.stats()['requests'] - cold_calls} model calls for {args.repeat} texts)")
+
+    before = server.stats()['requests']
+    text = 'A new sentence nobody asked for yet'
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        start = time.perf_counter()
+        list(executor.map(backend.translate, [text] * args.concurrency))
+        elapsed = (time.perf_counter() - start) * 1000
+    print(f"Coalesced: {elapsed:8.2f} ms total  ({server.stats()['requests'] - before} model calls for {args.concurrency} concurrent requests)")
+
+    before = server.stats()['requests']
+    batch = [f"The king and the priest {i}" for i in range(args.concurrency)]
+    elapsed = timed(backend.translate_many, batch)
+    print(f"Batch:     {elapsed:8.2f} ms total  ({server.stats()['requests'] - before} model calls for {len(batch)} distinct texts)")
+
+    server.shutdown()
+    server.server_close()
+
+
+if __name__ == '__main__':
+    main()
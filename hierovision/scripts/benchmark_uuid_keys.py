@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+UUID key storage benchmark.
+Builds a scratch SQLite database with string (VARCHAR(36)) keys and millions of
+synthetic scans, converts a copy of it to binary keys with the same code as
+scripts/migrate_uuid_keys.py, and compares the two: the size of every
+scans/users B-tree (dbstat) and the time of key lookups.
+
+Lookups run through sqlite3 directly so the numbers are the database's own
+cost: a scan by id, a scan joined to its owner, and a user's newest page of
+history through ix_scans_user_timestamp. The two databases are timed in
+alternating rounds so background I/O does not favour either.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import random
+import shutil
+import sqlite3
+import statistics
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+
+LOOKUPS = {
+    'scan by id': 'SELECT * FROM scans WHERE id = ?',
+    'scan + owner': 'SELECT s.description, u.email FROM scans s JOIN users u ON u.uid = s.user_uid WHERE s.id = ?',
+    'history page': (
+        'SELECT id, description, timestamp FROM scans WHERE user_uid = ? '
+        'ORDER BY timestamp DESC, id DESC LIMIT 20'
+    ),
+}
+
+
+def make_config(database):
+    from config import Config
+
+    class BenchmarkConfig(Config):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{database}"
+        UUID_KEY_STORAGE = 'string'
+
+    return BenchmarkConfig
+
+
+def random_uuid(rng):
+    return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+
+def build(database, users, scans, rng):
+    """Create the schema with string keys and bulk-load synthetic users and scans."""
+    from app import create_app
+    from app.extensions import db
+
+    app = create_app(make_config(database))
+    with app.app_context():
+        metadata = db.metadata
+        db.engine.dispose()
+        read_engine = app.extensions.get('sqlite_read_engine')
+        if read_engine is not None:
+            read_engine.dispose()
+
+    connection = sqlite3.connect(database, isolation_level=None)
+    # The search index is not what is measured; keep it out of the bulk load
+    for trigger in ('scans_fts_insert', 'scans_fts_update', 'scans_fts_delete'):
+        connection.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+
+    uids = [random_uuid(rng) for _ in range(users)]
+    connection.execute('BEGIN')
+    connection.executemany(
+        'INSERT INTO users (uid, full_name, email, password_hash, scan_count) VALUES (?, ?, ?, ?, 0)',
+        ((uid, f"User {i}", f"user{i}@example.com", b'-') for i, uid in enumerate(uids))
+    )
+    start = datetime(2024, 1, 1)
+    batch = []
+    for i in range(scans):
+        timestamp = start + timedelta(seconds=rng.randrange(3 * 365 * 86400))
+        batch.append((
+            random_uuid(rng), rng.choice(uids), f"/uploads/scans/{i}.jpg", f"synthetic scan {i}",
+            rng.randrange(1000), rng.random(), timestamp.strftime('%Y-%m-%d %H:%M:%S.%f')
+        ))
+        if len(batch) == 50000 or i == scans - 1:
+            connection.executemany(
+                'INSERT INTO scans (id, user_uid, image_url, description, predicted_class, confidence_score, timestamp) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)', batch
+            )
+            batch = []
+    connection.execute('COMMIT')
+    # Compact the B-trees as the conversion's VACUUM does, so both sides are measured packed
+    connection.execute('VACUUM')
+    connection.execute('ANALYZE')
+    connection.close()
+    return metadata
+
+
+def btree_sizes(database):
+    """Bytes used by each table and index B-tree of scans and users."""
+    connection = sqlite3.connect(database)
+    objects = {
+        name: table for name, table in connection.execute(
+            "SELECT name, tbl_name FROM sqlite_master WHERE tbl_name IN ('scans', 'users') AND type IN ('table', 'index')"
+        )
+    }
+    sizes = {
+        name: size for name, size in connection.execute('SELECT name, SUM(pgsize) FROM dbstat GROUP BY name')
+        if name in objects
+    }
+    connection.close()
+    return sizes
+
+
+def sample_keys(database, samples, seed):
+    """Random scan and user ids of the string-keyed database."""
+    connection = sqlite3.connect(database)
+    rng = random.Random(seed)
+    scan_ids = [row[0] for row in connection.execute('SELECT id FROM scans')]
+    user_ids = [row[0] for row in connection.execute('SELECT uid FROM users')]
+    connection.close()
+    return rng.sample(scan_ids, min(samples, len(scan_ids))), rng.choices(user_ids, k=samples)
+
+
+def time_lookups(connection, keys):
+    """Microseconds per lookup for one pass over the sampled keys."""
+    scan_ids, user_ids = keys
+    timings = {}
+    for label, sql in LOOKUPS.items():
+        values = user_ids if 'user_uid = ?' in sql else scan_ids
+        start = time.perf_counter()
+        for value in values:
+            connection.execute(sql, (value,)).fetchall()
+        timings[label] = (time.perf_counter() - start) / len(values) * 1e6
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare string and binary UUID keys on a synthetic scan history')
+    parser.add_argument('--scans', type=int, default=2000000, help='Synthetic scans')
+    parser.add_argument('--users', type=int, default=20000, help='Synthetic users')
+    parser.add_argument('--samples', type=int, default=20000, help='Keys looked up per round')
+    parser.add_argument('--rounds', type=int, default=5, help='Timed rounds per database')
+    parser.add_argument('--seed', type=int, default=7, help='Random seed')
+    args = parser.parse_args()
+
+    from config import Config
+    from app.utils.schema import convert_uuid_keys
+
+    directory = tempfile.mkdtemp()
+    databases = {storage: os.path.join(directory, f"{storage}.db") for storage in ('string', 'binary')}
+    print(f"Building {args.scans:,} scans for {args.users:,} users in {directory}...")
+    start = time.perf_counter()
+    metadata = build(databases['string'], args.users, args.scans, random.Random(args.seed))
+    print(f"  built in {time.perf_counter() - start:.0f} s")
+
+    shutil.copyfile(databases['string'], databases['binary'])
+    start = time.perf_counter()
+    convert_uuid_keys(databases['binary'], metadata, 'binary')
+    connection = sqlite3.connect(databases['binary'], isolation_level=None)
+    connection.execute('VACUUM')
+    connection.execute('ANALYZE')
+    connection.close()
+    print(f"  converted a copy to binary keys in {time.perf_counter() - start:.0f} s")
+
+    # The same keys for both, bound in the form each database stores them
+    scan_ids, user_ids = sample_keys(databases['string'], args.samples, args.seed)
+    keys = {
+        'string': (scan_ids, user_ids),
+        'binary': ([uuid.UUID(key).bytes for key in scan_ids], [uuid.UUID(key).bytes for key in user_ids]),
+    }
+    connections, runs = {}, {}
+    for storage, database in databases.items():
+        connections[storage] = sqlite3.connect(database)
+        connections[storage].execute(f"PRAGMA cache_size = -{Config.SQLITE_CACHE_SIZE_MB * 1024}")
+        time_lookups(connections[storage], keys[storage])  # warm-up pass
+        runs[storage] = []
+    for _ in range(args.rounds):
+        for storage in databases:
+            runs[storage].append(time_lookups(connections[storage], keys[storage]))
+    for connection in connections.values():
+        connection.close()
+
+    string_sizes, binary_sizes = btree_sizes(databases['string']), btree_sizes(databases['binary'])
+    string_file, binary_file = os.path.getsize(databases['string']), os.path.getsize(databases['binary'])
+    string_times, binary_times = (
+        {label: statistics.median(run[label] for run in runs[storage]) for label in LOOKUPS}
+        for storage in ('string', 'binary')
+    )
+    print(f"\n{'B-tree':<32} {'string':>10} {'binary':>10} {'change':>8}")
+    for name in sorted(string_sizes):
+        before, after = string_sizes[name], binary_sizes.get(name, 0)
+        print(f"{name:<32} {before / 2**20:>7.1f} MB {after / 2**20:>7.1f} MB {(after - before) / before:>+8.0%}")
+    before, after = sum(string_sizes.values()), sum(binary_sizes.values())
+    print(f"{'scans + users total':<32} {before / 2**20:>7.1f} MB {after / 2**20:>7.1f} MB {(after - before) / before:>+8.0%}")
+    print(f"{'database file':<32} {string_file / 2**20:>7.1f} MB {binary_file / 2**20:>7.1f} MB "
+          f"{(binary_file - string_file) / string_file:>+8.0%}")
+
+    print(f"\n{'lookup':<32} {'string':>10} {'binary':>10} {'change':>8}")
+    for label in LOOKUPS:
+        before, after = string_times[label], binary_times[label]
+        print(f"{label:<32} {before:>7.1f} µs {after:>7.1f} µs {(after - before) / before:>+8.0%}")
+
+
+if __name__ == '__main__':
+    main()
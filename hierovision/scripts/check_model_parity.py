@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Parity and latency harness for the classification model's inference variants.
+
+Runs a fixed folder of labeled glyph images through every execution mode of
+HieroglyphPredictor and compares each against the float32 eager reference.
+Images are expected in one sub-folder per Gardner code, e.g. images/A1/001.jpg;
+images directly in the root folder are compared without a label.
+
+Top-1 agreement is the share of images whose best class matches the reference;
+top-5 agreement is the mean overlap between the variant's and the reference's
+five best classes.
+
+Exits with status 1 when any variant's agreement falls below the configured
+floor, so it can gate deployments.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import json
+import time
+from PIL import Image
+from config import Config
+from app.services.gardner import get_sign_catalog
+from app.services.ml_service import HieroglyphPredictor, EXECUTION_MODES
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.gif', '.bmp', '.webp')
+
+
+def collect_images(root):
+    """Return (path, gardner_code or None) pairs for every image under root, in a stable order."""
+    images = []
+    for dirpath, _, filenames in sorted(os.walk(root)):
+        label = None if os.path.samefile(dirpath, root) else os.path.basename(dirpath)
+        for filename in sorted(filenames):
+            if filename.lower().endswith(IMAGE_EXTENSIONS):
+                images.append((os.path.join(dirpath, filename), label))
+    return images
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a list of numbers."""
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def run_variant(predictor, inputs):
+    """Return per-image probabilities and latencies (ms) for one predictor."""
+    probabilities = []
+    latencies = []
+    for input_tensor in inputs:
+        start = time.perf_counter()
+        probs = predictor.run_batch(input_tensor)[0]
+        latencies.append((time.perf_counter() - start) * 1000)
+        probabilities.append(probs.float().cpu())
+    return probabilities, latencies
+
+
+def summarize(name, probabilities, latencies, reference, labels):
+    """Compare a variant's outputs with the reference outputs and the folder labels."""
+    top1_agree = 0
+    top5_overlap = 0.0
+    max_diff = 0.0
+    correct_top1 = 0
+    correct_top5 = 0
+    labeled = 0
+
+    for probs, ref_probs, label in zip(probabilities, reference, labels):
+        top5 = probs.topk(5).indices.tolist()
+        ref_top5 = ref_probs.topk(5).indices.tolist()
+
+        top1_agree += top5[0] == ref_top5[0]
+        top5_overlap += len(set(top5) & set(ref_top5)) / 5
+        max_diff = max(max_diff, (probs - ref_probs).abs().max().item())
+
+        if label is not None:
+            labeled += 1
+            correct_top1 += top5[0] == label
+            correct_top5 += label in top5
+
+    count = len(probabilities)
+    return {
+        'variant': name,
+        'images': count,
+        'top1_agreement': top1_agree / count,
+        'top5_agreement': top5_overlap / count,
+        'max_probability_diff': max_diff,
+        'top1_accuracy': correct_top1 / labeled if labeled else None,
+        'top5_accuracy': correct_top5 / labeled if labeled else None,
+        'latency_ms': {
+            'p50': percentile(latencies, 50),
+            'p90': percentile(latencies, 90),
+            'p99': percentile(latencies, 99)
+        }
+    }
+
+
+def format_ratio(value):
+    return '-' if value is None else f"{value * 100:.2f}%"
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Check inference variants against the float32 reference')
+    parser.add_argument('images', help='Folder of glyph images, one sub-folder per Gardner code')
+    parser.add_argument('--variants', default=','.join(mode for mode in EXECUTION_MODES if mode != 'eager'),
+                        help='Comma-separated execution modes to compare against eager')
+    parser.add_argument('--min-top1-agreement', type=float, default=0.99)
+    parser.add_argument('--min-top5-agreement', type=float, default=0.95)
+    parser.add_argument('--require-all', action='store_true', help='Fail when a variant is unavailable')
+    parser.add_argument('--model-path', default=Config.CLASSIFICATION_MODEL_PATH)
+    parser.add_argument('--cache-dir', default=Config.INFERENCE_COMPILE_CACHE_DIR)
+    parser.add_argument('--json', dest='json_path', help='Also write the report to this file')
+    args = parser.parse_args()
+
+    images = collect_images(args.images)
+    if not images:
+        print(f"No images found in {args.images}")
+        sys.exit(2)
+
+    reference_predictor = HieroglyphPredictor(args.model_path, execution_mode='eager')
+    catalog = get_sign_catalog()
+    signs = [catalog.by_code(label) if label is not None else None for _, label in images]
+
+    unknown_labels = sorted({label for (_, label), sign in zip(images, signs) if label is not None and sign is None})
+    if unknown_labels:
+        print(f"Ignoring labels that are not Gardner codes: {', '.join(unknown_labels)}")
+
+    labels = [sign.class_index if sign else None for sign in signs]
+    inputs = []
+    for path, _ in images:
+        with Image.open(path) as image:
+            inputs.append(reference_predictor.transform(image.convert('RGB')).unsqueeze(0))
+
+    print(f"Comparing {len(inputs)} images ({sum(label is not None for label in labels)} labeled)")
+
+    reference, reference_latencies = run_variant(reference_predictor, inputs)
+    reports = [summarize('eager', reference, reference_latencies, reference, labels)]
+    failures = []
+
+    for variant in [v.strip() for v in args.variants.split(',') if v.strip()]:
+        predictor = HieroglyphPredictor(args.model_path, execution_mode=variant, compile_cache_dir=args.cache_dir)
+        if predictor.execution_mode != variant:
+            print(f"Variant {variant} is not available in this environment")
+            if args.require_all:
+                failures.append(f"{variant}: unavailable")
+            continue
+
+        probabilities, latencies = run_variant(predictor, inputs)
+        report = summarize(variant, probabilities, latencies, reference, labels)
+        reports.append(report)
+
+        if report['top1_agreement'] < args.min_top1_agreement:
+            failures.append(f"{variant}: top-1 agreement {format_ratio(report['top1_agreement'])} below {format_ratio(args.min_top1_agreement)}")
+        if report['top5_agreement'] < args.min_top5_agreement:
+            failures.append(f"{variant}: top-5 agreement {format_ratio(report['top5_agreement'])} below {format_ratio(args.min_top5_agreement)}")
+
+    print()
+    print(f"{'variant':<10}{'top1 agr':>10}{'top5 agr':>10}{'max diff':>11}{'top1 acc':>10}{'top5 acc':>10}{'p50 ms':>9}{'p90 ms':>9}{'p99 ms':>9}")
+    print("-" * 88)
+    for report in reports:
+        latency = report['latency_ms']
+        print(f"{report['variant']:<10}{format_ratio(report['top1_agreement']):>10}{format_ratio(report['top5_agreement']):>10}"
+              f"{report['max_probability_diff']:>11.2e}{format_ratio(report['top1_accuracy']):>10}{format_ratio(report['top5_accuracy']):>10}"
+              f"{latency['p50']:>9.2f}{latency['p90']:>9.2f}{latency['p99']:>9.2f}")
+
+    if args.json_path:
+        with open(args.json_path, 'w') as f:
+            json.dump({'reports': reports, 'failures': failures}, f, indent=2)
+
+    print()
+    if failures:
+        for failure in failures:
+            print(f"❌ {failure}")
+        sys.exit(1)
+
+    print("✅ All variants within agreement floor")
+
+
+if __name__ == '__main__':
+    main()
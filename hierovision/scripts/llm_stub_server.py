@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the Gemini generateContent API.
+Answers translation prompts from the English lexicon so the 'gemini' translation
+backend can be exercised and benchmarked offline.
+
+    python scripts/llm_stub_server.py --port 8765 --latency-ms 300
+    TRANSLATION_BACKEND=gemini GEMINI_API_URL=http://127.0.0.1:8765 python run.py
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from app.services.lexicon import get_lexicon
+
+_GENERATE_PATH = re.compile(r'/v1beta/models/([^/:]+):generateContent')
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # Keep connections alive like the real API
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == '/stats':
+            self._send_json(200, self.server.stats())
+        else:
+            self._send_json(404, {'error': {'code': 404, 'message': 'Not found'}})
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length)
+
+        if not _GENERATE_PATH.fullmatch(self.path):
+            self._send_json(404, {'error': {'code': 404, 'message': 'Not found'}})
+            return
+
+        self.server.count_request()
+        if self.server.latency:
+            time.sleep(self.server.latency)
+
+        if random.random() < self.server.error_rate:
+            self._send_json(503, {'error': {'code': 503, 'message': 'The model is overloaded'}})
+            return
+
+        try:
+            prompt = json.loads(body)['contents'][0]['parts'][0]['text']
+        except (KeyError, IndexError, TypeError, ValueError):
+            self._send_json(400, {'error': {'code': 400, 'message': 'Invalid request'}})
+            return
+
+        text = prompt.rsplit('Text:', 1)[-1].strip()
+        translation = get_lexicon().translate(text)
+        answer = json.dumps({
+            'hieroglyphs': translation['hieroglyphs'],
+            'transliteration': translation['transliteration']
+        }, ensure_ascii=False)
+        self._send_json(200, {'candidates': [{'content': {'parts': [{'text': answer}], 'role': 'model'}}]})
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128
+
+    def __init__(self, address, latency_ms=0.0, error_rate=0.0, verbose=False):
+        super().__init__(address, StubHandler)
+        self.latency = latency_ms / 1000
+        self.error_rate = error_rate
+        self.verbose = verbose
+        self._requests = 0
+        self._lock = threading.Lock()
+
+    def count_request(self):
+        with self._lock:
+            self._requests += 1
+
+    def stats(self):
+        with self._lock:
+            return {'requests': self._requests}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve a local stand-in for the Gemini translation API')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency-ms', type=float, default=0.0, help='Delay added to every answer')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Share of requests answered with 503')
+    parser.add_argument('--verbose', action='store_true', help='Log every request')
+    args = parser.parse_args()
+
+    get_lexicon()
+    server = StubServer((args.host, args.port), args.latency_ms, args.error_rate, args.verbose)
+    print(f"✅ Translation stub listening on http://{args.host}:{args.port} (GET /stats for request counts)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Convert the UUID keys of an existing SQLite database between 'string'
+(VARCHAR(36)) and 'binary' (16-byte) storage.
+
+Stop the app first. Every table with a UUID key or UUID foreign key is rebuilt in one
+transaction, the file is vacuumed to hand back the freed pages, and the scan
+search index is rebuilt. Set UUID_KEY_STORAGE to the same value afterwards so
+new databases match. Back up the database before running this.
+
+PostgreSQL is not converted automatically; there, for every UUID key column:
+    ALTER TABLE <table> ALTER COLUMN <column> TYPE uuid USING <column>::uuid;
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import sqlite3
+import time
+from app import create_app
+from app.extensions import db
+from app.models.types import stored_uuid_key_storage
+from app.utils.schema import convert_uuid_keys
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Convert UUID key columns between string and binary storage')
+    parser.add_argument('--to', choices=['binary', 'string'], required=True, help='Target storage')
+    parser.add_argument('--batch-size', type=int, default=10000, help='Rows copied per batch')
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        engine = db.engine
+        if engine.dialect.name != 'sqlite' or not engine.url.database or engine.url.database == ':memory:':
+            print(f"❌ Only SQLite database files are converted automatically (this is {engine.dialect.name}); see the notes in this script")
+            sys.exit(1)
+
+        database = os.path.abspath(engine.url.database)
+        current = stored_uuid_key_storage(engine)
+        if current == args.to:
+            print(f"✅ {database} already stores UUID keys as {args.to}")
+            return
+
+        metadata = db.metadata
+        db.session.remove()
+        engine.dispose()
+        read_engine = app.extensions.get('sqlite_read_engine')
+        if read_engine is not None:
+            read_engine.dispose()
+
+    print(f"Converting {database} from {current} to {args.to} UUID keys...")
+    size_before = os.path.getsize(database)
+    start = time.perf_counter()
+    try:
+        copied = convert_uuid_keys(database, metadata, args.to, batch_size=args.batch_size)
+    except Exception as e:
+        print(f"❌ Conversion failed, database left unchanged: {e}")
+        sys.exit(1)
+    for table, rows in copied.items():
+        print(f"  {table}: {rows} rows")
+
+    connection = sqlite3.connect(database, isolation_level=None)
+    connection.execute('VACUUM')
+    connection.close()
+    print(f"  database size: {size_before / 2**20:.1f} MB -> {os.path.getsize(database) / 2**20:.1f} MB")
+
+    # Starting the app again rebuilds the scan search index dropped by the conversion
+    create_app()
+    print(f"✅ Converted to {args.to} UUID keys in {time.perf_counter() - start:.1f} s")
+
+
+if __name__ == '__main__':
+    main()
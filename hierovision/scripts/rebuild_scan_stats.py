@@ -0,0 +1,32 @@
+#!/usr/bin/env python3
+"""
+Rebuild per-user scan statistics (users.scan_count, scan_daily_stats, scan_class_stats)
+from the scans table. Saving and deleting scans keeps them up to date; run this
+to backfill after importing scans with bulk SQL, restoring a backup or editing
+scans by hand.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+from app import create_app
+from app.models.scan_stats import refresh_scan_stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Rebuild per-user scan counters and daily/class rollups')
+    parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        drift = refresh_scan_stats()
+
+    for uid, stored, actual in drift:
+        print(f"Fixed {uid}: scan count {stored} -> {actual}")
+    print(f"✅ Rebuilt scan statistics ({len(drift)} user totals were wrong)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+"""
+Recompute landmark review aggregates (review_count, rating_sum, average_rating) from the reviews table.
+The review routes keep them up to date; run this after editing reviews by hand
+or restoring a backup.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+from app import create_app
+from app.models.landmark import Landmark
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Recompute landmark review counts and rating sums')
+    parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        drift = Landmark.refresh_review_stats()
+
+    if not drift:
+        print("✅ All landmark review aggregates are correct")
+        return
+
+    for landmark_id, stored, actual in drift:
+        print(f"Fixed {landmark_id}: count/sum {stored[0]}/{stored[1]} -> {actual[0]}/{actual[1]}")
+    print(f"✅ Repaired {len(drift)} landmarks")
+
+
+if __name__ == '__main__':
+    main()
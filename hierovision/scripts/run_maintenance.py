@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Run database maintenance tasks (PRAGMA optimize, ANALYZE, incremental vacuum).
+
+The full ANALYZE and a full VACUUM only run from here; the in-process
+scheduler leaves them to this script.
+
+Without arguments every task that is due runs, so the script can be called
+from cron as often as convenient; name tasks to run only those, and add
+--force to run them even if they ran recently. --status lists when each task
+last ran, how long it took and when it is next due.
+
+Examples:
+    python scripts/run_maintenance.py
+    python scripts/run_maintenance.py vacuum --force --budget 0
+    python scripts/run_maintenance.py --status
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+from app import create_app
+from app.services.maintenance import maintenance_status, run_task
+
+TASK_NAMES = ['optimize', 'analyze', 'vacuum']
+
+
+def print_status(config):
+    for name, entry in maintenance_status(config).items():
+        last = entry['last_run']
+        due = f"next due {entry['next_due']}" if entry['next_due'] else 'due now'
+        if last is None:
+            print(f"{name:<10} never run, {due}")
+        else:
+            duration = f"{last['duration_ms'] / 1000:.1f} s" if last['duration_ms'] is not None else '-'
+            print(f"{name:<10} {last['status']:<12} {last['started_at']} ({last['trigger']}, {duration}), {due}")
+            if last['detail']:
+                print(f"{'':<10} {last['detail']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run SQLite maintenance tasks that are due')
+    parser.add_argument('tasks', nargs='*', metavar='TASK', help=f"Tasks to run: {', '.join(TASK_NAMES)} (default: all)")
+    parser.add_argument('--force', action='store_true', help='Run even if the task ran within its interval')
+    parser.add_argument('--budget', type=float, help='Seconds each task may take, overriding the config (0 for no limit)')
+    parser.add_argument('--status', action='store_true', help='Show the last run of every task and exit')
+    args = parser.parse_args()
+    unknown = set(args.tasks) - set(TASK_NAMES)
+    if unknown:
+        parser.error(f"unknown task: {', '.join(sorted(unknown))}")
+
+    app = create_app()
+    with app.app_context():
+        if args.status:
+            print_status(app.config)
+            return
+
+        failed = False
+        for name in args.tasks or TASK_NAMES:
+            run = run_task(name, app.config, trigger='cli', force=args.force, budget_seconds=args.budget)
+            if run is None:
+                print(f"⏭️  {name}: not due")
+                continue
+            marker = '✅' if run['status'] == 'ok' else '❌' if run['status'] == 'failed' else '⚠️ '
+            print(f"{marker} {name}: {run['status']} in {run['duration_ms'] / 1000:.1f} s - {run['detail']}")
+            failed = failed or run['status'] == 'failed'
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()